@@ -0,0 +1,134 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Set
+from apis.scheduler import Priority
+from apis.serp import SerpApi
+from models.flight import FlightSearchParams
+
+logger = logging.getLogger(__name__)
+
+class ReturnPrefetcher:
+    """
+    Speculatively fetches return legs for round-trip outbound results.
+
+    After an upstream outbound search, the ``departure_token`` of each of the
+    ``top_n`` first itineraries is looked up in the background at background
+    priority, so a follow-up ``get_flights(departure_token=...)`` is answered
+    from the cache (or joins the fetch still in flight). Prefetches are
+    capped at ``budget_per_hour`` over a sliding hour.
+
+    A prefetch counts as a hit when its token is requested, and as wasted
+    when its cache entry expires unused.
+    """
+
+    def __init__(
+        self,
+        serp: SerpApi,
+        top_n: int = 3,
+        budget_per_hour: int = 60,
+        concurrency: int = 2,
+        max_tracked: int = 10000
+    ) -> None:
+        self.serp: SerpApi = serp
+        self.top_n: int = top_n
+        self.budget_per_hour: int = budget_per_hour
+        self.max_tracked: int = max_tracked
+        self.issued: int = 0
+        self.failed: int = 0
+        self.skipped: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.wasted: int = 0
+        # token -> time the prefetch was issued, oldest first
+        self._pending: "OrderedDict[str, float]" = OrderedDict()
+        self._calls: Deque[float] = deque()
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._tasks: Set["asyncio.Task[Any]"] = set()
+
+    @classmethod
+    def from_env(cls, serp: SerpApi) -> Optional["ReturnPrefetcher"]:
+        """Build a prefetcher from the ``PREFETCH_*`` environment variables, or None when disabled."""
+        if os.getenv("PREFETCH_ENABLED", "false").lower() != "true":
+            return None
+        return cls(
+            serp=serp,
+            top_n=int(os.getenv("PREFETCH_TOP_N", "3")),
+            budget_per_hour=int(os.getenv("PREFETCH_BUDGET_PER_HOUR", "60")),
+            concurrency=int(os.getenv("PREFETCH_CONCURRENCY", "2"))
+        )
+
+    def _budget_left(self, now: float) -> int:
+        while self._calls and now - self._calls[0] >= 3600:
+            self._calls.popleft()
+        return self.budget_per_hour - len(self._calls)
+
+    def _expire(self, now: float) -> None:
+        """Count prefetches whose cache entry has lapsed unused as wasted."""
+        ttl: float = self.serp.cache.ttl + self.serp.cache.stale_ttl if self.serp.cache is not None else 0.0
+        while self._pending:
+            token, issued_at = next(iter(self._pending.items()))
+            if now - issued_at < ttl and len(self._pending) <= self.max_tracked:
+                break
+            del self._pending[token]
+            self.wasted += 1
+
+    def prefetch(self, params: FlightSearchParams, flights: List[Dict[str, Any]]) -> None:
+        """Queue return-leg lookups for an outbound result. Registered as a ``SerpApi`` listener."""
+        if params.departure_token is not None or params.return_date is None:
+            return
+        now: float = time.time()
+        self._expire(now)
+
+        for row in flights[:self.top_n]:
+            token: Optional[str] = row.get("departure_token")
+            if not token or token in self._pending:
+                continue
+            if self._budget_left(now) <= 0:
+                self.skipped += 1
+                continue
+            leg: FlightSearchParams = params.model_copy(update={"departure_token": token})
+            if self.serp.cache is not None and self.serp.cache.peek(leg.cache_key()) is not None:
+                continue
+
+            self._calls.append(now)
+            self._pending[token] = now
+            self.issued += 1
+            task: asyncio.Task[Any] = asyncio.get_running_loop().create_task(self._fetch(leg))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, leg: FlightSearchParams) -> None:
+        async with self._semaphore:
+            try:
+                await self.serp.refresh(leg, client_id="prefetch", priority=Priority.BACKGROUND)
+            except Exception as e:
+                self.failed += 1
+                self._pending.pop(leg.departure_token, None)
+                logger.warning("Return-leg prefetch failed: %s", e)
+
+    def track(self, params: FlightSearchParams, key: str) -> None:
+        """Score return-leg lookups against prefetches. Registered as a ``SerpApi`` observer."""
+        if params.departure_token is None:
+            return
+        if self._pending.pop(params.departure_token, None) is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        self._expire(time.time())
+        lookups: int = self.hits + self.misses
+        return {
+            "issued": self.issued,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "wasted": self.wasted,
+            "pending": len(self._pending),
+            "failed": self.failed,
+            "skipped_over_budget": self.skipped,
+            "budget_left": self._budget_left(time.time()),
+        }
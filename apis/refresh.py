@@ -0,0 +1,158 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+from apis.scheduler import Priority
+from apis.serp import SerpApi
+from data.cache import CacheEntry
+from models.flight import FlightSearchParams
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class _Route:
+    params: FlightSearchParams
+    score: float
+    seen_at: float
+
+class RefreshScheduler:
+    """
+    Keeps the most requested searches warm in the cache.
+
+    Every lookup bumps an exponentially decaying popularity score for its
+    search. A background task wakes every ``interval`` seconds (plus random
+    jitter), picks the ``top_k`` most popular searches and refreshes those
+    whose cache entry is missing or goes stale within ``lead`` seconds.
+    Upstream calls are capped at ``budget_per_hour`` over a sliding hour.
+    """
+
+    def __init__(
+        self,
+        serp: SerpApi,
+        top_k: int = 20,
+        interval: float = 60.0,
+        lead: float = 120.0,
+        budget_per_hour: int = 120,
+        jitter: float = 5.0,
+        half_life: float = 3600.0,
+        max_routes: int = 5000
+    ) -> None:
+        self.serp: SerpApi = serp
+        self.top_k: int = top_k
+        self.interval: float = interval
+        self.lead: float = lead
+        self.budget_per_hour: int = budget_per_hour
+        self.jitter: float = jitter
+        self.half_life: float = half_life
+        self.max_routes: int = max_routes
+        self.refreshed: int = 0
+        self.failed: int = 0
+        self.over_budget: int = 0
+        self._routes: Dict[str, _Route] = {}
+        self._calls: Deque[float] = deque()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, serp: SerpApi) -> Optional["RefreshScheduler"]:
+        """Build a scheduler from the ``REFRESH_*`` environment variables, or None when disabled."""
+        if os.getenv("REFRESH_ENABLED", "false").lower() != "true" or serp.cache is None:
+            return None
+        return cls(
+            serp=serp,
+            top_k=int(os.getenv("REFRESH_TOP_K", "20")),
+            interval=float(os.getenv("REFRESH_INTERVAL", "60")),
+            lead=float(os.getenv("REFRESH_LEAD", "120")),
+            budget_per_hour=int(os.getenv("REFRESH_BUDGET_PER_HOUR", "120")),
+            jitter=float(os.getenv("REFRESH_JITTER", "5")),
+            half_life=float(os.getenv("REFRESH_HALF_LIFE", "3600")),
+            max_routes=int(os.getenv("REFRESH_MAX_ROUTES", "5000"))
+        )
+
+    def _score(self, route: _Route, now: float) -> float:
+        return route.score * 0.5 ** ((now - route.seen_at) / self.half_life)
+
+    def track(self, params: FlightSearchParams, key: str) -> None:
+        """Count one lookup of a search. Registered as a ``SerpApi`` observer."""
+        if params.departure_token is not None:
+            return
+        now: float = time.time()
+        route: Optional[_Route] = self._routes.get(key)
+        if route is None:
+            if len(self._routes) >= self.max_routes:
+                coldest: str = min(self._routes, key=lambda k: self._score(self._routes[k], now))
+                del self._routes[coldest]
+            self._routes[key] = _Route(params=params, score=1.0, seen_at=now)
+        else:
+            route.score = self._score(route, now) + 1.0
+            route.seen_at = now
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def hot_routes(self) -> List[str]:
+        """Keys of the ``top_k`` most popular searches, hottest first."""
+        now: float = time.time()
+        ranked: List[str] = sorted(self._routes, key=lambda k: self._score(self._routes[k], now), reverse=True)
+        return ranked[:self.top_k]
+
+    def _due(self, key: str, now: float) -> bool:
+        entry: Optional[CacheEntry] = self.serp.cache.peek(key)
+        return entry is None or entry.stale_at - now <= self.lead
+
+    def _budget_left(self, now: float) -> int:
+        while self._calls and now - self._calls[0] >= 3600:
+            self._calls.popleft()
+        return self.budget_per_hour - len(self._calls)
+
+    async def tick(self) -> int:
+        """
+        Refresh the hot searches that are due, within the hourly budget.
+
+        Returns:
+            int: Number of searches refreshed.
+        """
+        refreshed: int = 0
+        for key in self.hot_routes():
+            params: FlightSearchParams = self._routes[key].params
+            now: float = time.time()
+            if not self._due(key, now):
+                continue
+            if self._budget_left(now) <= 0 or (
+                self.serp.scheduler is not None and not self.serp.scheduler.allows(Priority.BACKGROUND)
+            ):
+                self.over_budget += 1
+                break
+
+            # Spread refreshes out so they do not hit upstream in one burst.
+            await asyncio.sleep(random.uniform(0, self.jitter))
+            self._calls.append(time.time())
+            try:
+                await self.serp.refresh(params, priority=Priority.BACKGROUND)
+            except Exception as e:
+                self.failed += 1
+                logger.warning("Refresh of %s failed: %s", key, e)
+            else:
+                self.refreshed += 1
+                refreshed += 1
+        return refreshed
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval + random.uniform(0, self.jitter))
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Refresh scheduler tick failed")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "routes": len(self._routes),
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "over_budget": self.over_budget,
+            "budget_left": self._budget_left(time.time()),
+        }
@@ -0,0 +1,175 @@
+import os
+import time
+import random
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+class UpstreamError(RuntimeError):
+    """
+    A failed SerpAPI call.
+
+    ``transient`` errors (timeouts, dropped connections, throttling, 5xx)
+    may succeed when retried; permanent ones (bad key, bad query) will not.
+    """
+
+    def __init__(self, message: str, transient: bool, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.transient: bool = transient
+        self.status: Optional[int] = status
+
+class CircuitOpenError(UpstreamError):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+    def __init__(self, retry_in: float) -> None:
+        super().__init__(
+            f"SerpAPI is unavailable; not retrying for another {retry_in:.0f}s.", transient=False
+        )
+        self.retry_in: float = retry_in
+
+# Phrases of SerpAPI "error" fields that are worth retrying.
+_TRANSIENT_MESSAGES = ("timed out", "timeout", "try again", "temporarily", "too many requests", "internal error")
+
+def classify_status(status: int) -> bool:
+    """Whether an HTTP status from upstream is transient."""
+    return status == 408 or status == 429 or status >= 500
+
+def classify_message(message: str) -> bool:
+    """Whether a SerpAPI ``error`` message describes a transient failure."""
+    lowered: str = message.lower()
+    return any(phrase in lowered for phrase in _TRANSIENT_MESSAGES)
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    Attempt ``n`` (0-based) waits a random time between 0 and
+    ``min(max_delay, base_delay * multiplier ** n)`` before retrying.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        multiplier: float = 2.0
+    ) -> None:
+        if attempts < 1:
+            raise ValueError(f"Invalid attempts '{attempts}'. Must be at least 1.")
+        self.attempts: int = attempts
+        self.base_delay: float = base_delay
+        self.max_delay: float = max_delay
+        self.multiplier: float = multiplier
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """Build a policy from the ``SERP_RETRY_*`` environment variables."""
+        return cls(
+            attempts=int(os.getenv("SERP_RETRY_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("SERP_RETRY_BASE_DELAY", "0.5")),
+            max_delay=float(os.getenv("SERP_RETRY_MAX_DELAY", "8"))
+        )
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * self.multiplier ** attempt))
+
+class LatencyTracker:
+    """Sliding window of recent successful upstream latencies."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self.min_samples: int = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """The ``q`` quantile of the window, or None until ``min_samples`` are in."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+class CircuitBreaker:
+    """
+    Stops calling upstream after repeated transient failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast. Once ``reset_timeout`` seconds pass, one trial call is
+    let through (half-open); its success closes the circuit, its failure
+    opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.state: str = self.CLOSED
+        self.failures: int = 0
+        self.opened: int = 0
+        self.rejected: int = 0
+        self._opened_at: float = 0.0
+        self._trial_running: bool = False
+        self._trial_started: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> Optional["CircuitBreaker"]:
+        """Build a breaker from the ``SERP_BREAKER_*`` environment variables, or None when disabled."""
+        threshold: int = int(os.getenv("SERP_BREAKER_THRESHOLD", "5"))
+        if threshold <= 0:
+            return None
+        return cls(
+            failure_threshold=threshold,
+            reset_timeout=float(os.getenv("SERP_BREAKER_RESET_TIMEOUT", "30"))
+        )
+
+    def retry_in(self) -> float:
+        """Seconds until the next trial call, 0 when calls are allowed."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(self._opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now. Reserves the trial slot when half-open."""
+        if self.state == self.OPEN and self.retry_in() == 0.0:
+            self.state = self.HALF_OPEN
+            self._trial_running = False
+        if self.state == self.HALF_OPEN:
+            # A trial that never reported back (e.g. it was cancelled) is
+            # given up on after another reset_timeout.
+            now: float = time.monotonic()
+            if self._trial_running and now - self._trial_started < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self._trial_running = True
+            self._trial_started = now
+            return True
+        if self.state == self.OPEN:
+            self.rejected += 1
+            return False
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(self.retry_in(), 1),
+        }
@@ -0,0 +1,291 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from enum import IntEnum
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from data.db import QuotaStore, data_path
+from utils.rate_limit import RateLimiter
+
+ANONYMOUS_CLIENT: str = "anonymous"
+
+class Priority(IntEnum):
+    """Upstream call priority. Lower values are served first."""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+class QuotaExceeded(RuntimeError):
+    """Raised when the upstream call budget for the current period is spent."""
+
+class QuotaBudget:
+    """
+    Daily or monthly cap on upstream calls.
+
+    The last ``background_reserve`` fraction of the budget is kept for
+    interactive calls, so background refreshes stop first. Usage is kept in
+    a ``QuotaStore`` when one is given, otherwise in memory. The store is
+    only touched on a worker thread: ``load()`` reads a period's usage once
+    and ``consume()`` counts each call, taking the stored total so workers
+    sharing the file stay in step.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        period: str = "month",
+        background_reserve: float = 0.1,
+        store: Optional[QuotaStore] = None
+    ) -> None:
+        if period not in ("day", "month"):
+            raise ValueError(f"Invalid quota period '{period}'. Must be one of ['day', 'month'].")
+        self.limit: int = limit
+        self.period: str = period
+        self.background_reserve: float = background_reserve
+        self.store: Optional[QuotaStore] = store
+        self._period_key: str = self.period_key()
+        self._used: int = 0
+        self._loaded: bool = store is None
+
+    @classmethod
+    def from_env(cls) -> Optional["QuotaBudget"]:
+        """Build a budget from the ``SERP_QUOTA_*`` environment variables, or None when unlimited."""
+        limit: int = int(os.getenv("SERP_QUOTA_LIMIT", "0"))
+        if limit <= 0:
+            return None
+        path: str = os.getenv("SERP_QUOTA_DB_PATH", data_path("serp_quota.db"))
+        return cls(
+            limit=limit,
+            period=os.getenv("SERP_QUOTA_PERIOD", "month"),
+            background_reserve=float(os.getenv("SERP_QUOTA_BACKGROUND_RESERVE", "0.1")),
+            store=QuotaStore(path) if path else None
+        )
+
+    def period_key(self) -> str:
+        """Label of the current UTC period, e.g. "2025-06" or "2025-06-14"."""
+        return datetime.now(timezone.utc).strftime("%Y-%m" if self.period == "month" else "%Y-%m-%d")
+
+    async def load(self) -> None:
+        """Read the current period's stored usage, once per period."""
+        key: str = self.period_key()
+        if key != self._period_key or not self._loaded:
+            self._used = await asyncio.to_thread(self.store.get, key)
+            self._period_key = key
+            self._loaded = True
+
+    @property
+    def used(self) -> int:
+        key: str = self.period_key()
+        if key != self._period_key:
+            # A new period; ``load()`` or the next ``consume()`` picks up what other workers already spent.
+            self._period_key = key
+            self._used = 0
+            self._loaded = self.store is None
+        return self._used
+
+    @property
+    def remaining(self) -> int:
+        return max(self.limit - self.used, 0)
+
+    def allows(self, priority: Priority) -> bool:
+        if priority == Priority.BACKGROUND:
+            return self.remaining > self.limit * self.background_reserve
+        return self.remaining > 0
+
+    async def consume(self) -> None:
+        key: str = self.period_key()
+        if self.store is not None:
+            self._used = await asyncio.to_thread(self.store.increment, key)
+            self._period_key = key
+            self._loaded = True
+        else:
+            self._used = self.used + 1
+
+    def check(self, priority: Priority) -> None:
+        """Raise ``QuotaExceeded`` unless a call at ``priority`` fits the budget."""
+        if not self.allows(priority):
+            raise QuotaExceeded(
+                f"SerpAPI quota exhausted for {self.period_key()} ({self.used}/{self.limit} calls"
+                f"{', background reserve reached' if priority == Priority.BACKGROUND and self.remaining else ''}). "
+                f"Only cached searches are available until it resets."
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {"period": self.period_key(), "limit": self.limit, "used": self.used, "remaining": self.remaining}
+
+class UpstreamScheduler:
+    """
+    Admission control in front of every upstream SerpAPI call.
+
+    Callers wait in one queue per priority; within a priority, clients are
+    served round-robin so one busy client cannot starve the others. A single
+    dispatcher hands out permits at the token-bucket rate, always to the
+    highest-priority waiter, and charges each permit against the quota.
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: Optional[int] = None,
+        quota: Optional[QuotaBudget] = None,
+        max_queue: int = 1000
+    ) -> None:
+        self.limiter: RateLimiter = RateLimiter(rate=rate, burst=burst)
+        self.quota: Optional[QuotaBudget] = quota
+        self.max_queue: int = max_queue
+        self.granted: int = 0
+        self.rejected: int = 0
+        self.max_depth: int = 0
+        self._queues: Dict[Priority, "OrderedDict[str, Deque[asyncio.Future]]"] = {p: OrderedDict() for p in Priority}
+        self._depth: int = 0
+        self._waits: Deque[float] = deque(maxlen=1000)
+        self._ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "UpstreamScheduler":
+        """Build a scheduler from the ``SERP_RATE``/``SERP_BURST``/``SERP_QUEUE_MAX`` and quota variables."""
+        return cls(
+            rate=float(os.getenv("SERP_RATE", "5")),
+            burst=int(os.getenv("SERP_BURST", "10")),
+            quota=QuotaBudget.from_env(),
+            max_queue=int(os.getenv("SERP_QUEUE_MAX", "1000"))
+        )
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    def allows(self, priority: Priority) -> bool:
+        """Whether the quota leaves room for a call at ``priority``."""
+        return self.quota is None or self.quota.allows(priority)
+
+    async def acquire(self, client_id: Optional[str] = None, priority: Priority = Priority.INTERACTIVE) -> None:
+        """
+        Wait for permission to make one upstream call.
+
+        Raises:
+            QuotaExceeded: The quota has no room for this call.
+            RuntimeError: The queue is full.
+        """
+        if self.quota is not None:
+            await self.quota.load()
+            self.quota.check(priority)
+        if self._depth >= self.max_queue:
+            self.rejected += 1
+            raise RuntimeError(f"Upstream queue is full ({self.max_queue} waiting). Try again shortly.")
+
+        if self._ready is None:
+            self._ready = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._dispatch())
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(client_id or ANONYMOUS_CLIENT, deque()).append(future)
+        self._depth += 1
+        self.max_depth = max(self.max_depth, self._depth)
+        self._ready.set()
+
+        enqueued: float = time.monotonic()
+        try:
+            await future
+        finally:
+            if future.cancelled() or not future.done():
+                # Cancelled while queued; the dispatcher skips it.
+                future.cancel()
+                self._depth -= 1
+        self._waits.append(time.monotonic() - enqueued)
+
+    def _next_waiter(self) -> Optional[Tuple[asyncio.Future, Priority]]:
+        """Pop the next live waiter: highest priority first, round-robin over clients."""
+        for priority in Priority:
+            clients = self._queues[priority]
+            while clients:
+                client_id, waiters = next(iter(clients.items()))
+                future: asyncio.Future = waiters.popleft()
+                if waiters:
+                    clients.move_to_end(client_id)
+                else:
+                    del clients[client_id]
+                if not future.done():
+                    return future, priority
+        return None
+
+    def _has_waiters(self) -> bool:
+        return any(self._queues[p] for p in Priority)
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self._has_waiters():
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            # Pick the waiter only once a token is in hand, so a higher
+            # priority arrival during the wait goes first.
+            await self.limiter.acquire()
+            waiter: Optional[Tuple[asyncio.Future, Priority]] = self._next_waiter()
+            if waiter is None:
+                continue
+            future, priority = waiter
+            self._depth -= 1
+            if self.quota is not None:
+                # The budget may have run out while this caller was queued.
+                try:
+                    self.quota.check(priority)
+                except QuotaExceeded as e:
+                    future.set_exception(e)
+                    continue
+                await self.quota.consume()
+            self.granted += 1
+            future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        waits: List[float] = sorted(self._waits)
+        return {
+            "queue_depth": self._depth,
+            "queue_depth_by_priority": {
+                p.name.lower(): sum(len(w) for w in self._queues[p].values()) for p in Priority
+            },
+            "max_queue_depth": self.max_depth,
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "wait_ms": {
+                "avg": round(1000 * sum(waits) / len(waits), 1) if waits else 0.0,
+                "p95": round(1000 * waits[int(0.95 * (len(waits) - 1))], 1) if waits else 0.0,
+                "max": round(1000 * waits[-1], 1) if waits else 0.0,
+            },
+            "quota": self.quota.stats() if self.quota is not None else None,
+        }
+
+def connection_key(ctx: Any) -> Optional[str]:
+    """
+    Stable ID of the connection a request arrived on, or None.
+
+    ``ctx.session_id`` is minted afresh per request by stateless protocol
+    versions, so it cannot identify anything. Over HTTP the MCP session ID
+    (the ``mcp-session-id`` header, or the SSE ``session_id``) is stable; a
+    stdio server serves a single client for its whole life. Stateless HTTP
+    requests have no connection at all.
+    """
+    if ctx.transport in (None, "stdio"):
+        return "local"
+    request: Any = ctx.request_context.request if ctx.request_context is not None else None
+    if request is None:
+        return None
+    return request.headers.get("mcp-session-id") or request.query_params.get("session_id")
+
+def client_key(ctx: Any) -> Optional[str]:
+    """
+    Fair-queue identity of an MCP request: its client ID, else its connection.
+
+    Stateless HTTP requests without a ``client_id`` in ``_meta`` have neither
+    and share the anonymous queue, so they are served first come, first
+    served among themselves.
+    """
+    if ctx is None:
+        return None
+    try:
+        return ctx.client_id or connection_key(ctx)
+    except RuntimeError:
+        return None
@@ -1,19 +1,322 @@
-from serpapi import GoogleSearch
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
-from models.flight import Flight, LayOver, FlightSearchParams, FlightSearchResult, FlightSearchResponse
+import os
+import json
+import time
+import asyncio
+import logging
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Callable, Set, Tuple
+from urllib.parse import urlsplit
+from apis.resilience import (
+    CircuitBreaker, CircuitOpenError, LatencyTracker, RetryPolicy, UpstreamError,
+    classify_message, classify_status
+)
+from apis.scheduler import Priority, UpstreamScheduler
+from data.cache import CacheEntry, FlightCache
+from data.shared import SharedFlight
+from models.flight import FlightSearchParams
+from utils.metrics import metrics
+from utils.singleflight import SingleFlight
+
+SERP_API_URL: str = "https://serpapi.com/search.json"
+
+logger = logging.getLogger(__name__)
+
+# Called with the search and its raw rows after every upstream fetch.
+ResultListener = Callable[[FlightSearchParams, List[Dict[str, Any]]], None]
+
+# Called with the search and its cache key on every lookup, hit or miss.
+SearchObserver = Callable[[FlightSearchParams, str], None]
+
+@dataclass
+class FlightLookup:
+    """Flights for one search plus where they came from."""
+    flights: List[Dict[str, Any]]
+    cache_hit: bool = False
+    age: float = 0.0
+    coalesced: bool = False
+    stale: bool = False
 
 class SerpApi:
-    def __init__(self, api_key: str) -> None:
+    """
+    Asynchronous client for the SerpAPI Google Flights engine.
+
+    By default requests go through a pooled keep-alive ``httpx.AsyncClient`` so
+    a slow search never blocks the event loop. The ``"thread"`` transport keeps
+    the legacy ``GoogleSearch`` client and runs it on a bounded thread pool.
+
+    Failures are raised as ``UpstreamError`` classified as transient or
+    permanent. Transient ones are retried per ``retry``; with ``hedge`` set a
+    duplicate request is fired once a call outlives the recent
+    ``hedge_quantile`` latency and the first answer wins. A ``breaker`` fails
+    calls fast while upstream keeps failing. With ``shared`` set, identical
+    searches are also coalesced across worker processes.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = SERP_API_URL,
+        transport: str = "http",
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        max_workers: int = 8,
+        cache: Optional[FlightCache] = None,
+        scheduler: Optional[UpstreamScheduler] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 0.0,
+        shared: Optional[SharedFlight] = None
+    ) -> None:
+        if transport not in ("http", "thread"):
+            raise ValueError(f"Invalid transport '{transport}'. Must be one of ['http', 'thread'].")
+
         self.api_key: str = api_key
-    
+        self.base_url: str = base_url
+        self.transport: str = transport
+        self.timeout: float = timeout
+        self.limits: httpx.Limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.max_workers: int = max_workers
+        self.cache: Optional[FlightCache] = cache
+        self.scheduler: Optional[UpstreamScheduler] = scheduler
+        self.retry: RetryPolicy = retry if retry is not None else RetryPolicy(attempts=1)
+        self.breaker: Optional[CircuitBreaker] = breaker
+        self.hedge: bool = hedge
+        self.hedge_quantile: float = hedge_quantile
+        self.hedge_min_delay: float = hedge_min_delay
+        self.latency: LatencyTracker = LatencyTracker()
+        self.retries: int = 0
+        self.hedged: int = 0
+        self.hedge_wins: int = 0
+        self.singleflight: SingleFlight = SingleFlight()
+        self.shared: Optional[SharedFlight] = shared
+        self.listeners: List[ResultListener] = []
+        self.observers: List[SearchObserver] = []
+        self._refreshes: Set["asyncio.Task[Any]"] = set()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls, api_key: str) -> "SerpApi":
+        """Build a client configured from the ``SERP_*`` environment variables."""
+        return cls(
+            api_key=api_key,
+            base_url=os.getenv("SERP_API_URL", SERP_API_URL),
+            transport=os.getenv("SERP_TRANSPORT", "http"),
+            max_connections=int(os.getenv("SERP_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("SERP_MAX_KEEPALIVE_CONNECTIONS", "10")),
+            keepalive_expiry=float(os.getenv("SERP_KEEPALIVE_EXPIRY", "30")),
+            timeout=float(os.getenv("SERP_TIMEOUT", "30")),
+            max_workers=int(os.getenv("SERP_THREAD_WORKERS", "8")),
+            cache=FlightCache.from_env() if os.getenv("FLIGHT_CACHE_ENABLED", "true").lower() == "true" else None,
+            scheduler=UpstreamScheduler.from_env() if os.getenv("SERP_SCHEDULER_ENABLED", "true").lower() == "true" else None,
+            retry=RetryPolicy.from_env(),
+            breaker=CircuitBreaker.from_env(),
+            hedge=os.getenv("SERP_HEDGE_ENABLED", "false").lower() == "true",
+            hedge_quantile=float(os.getenv("SERP_HEDGE_QUANTILE", "0.95")),
+            hedge_min_delay=float(os.getenv("SERP_HEDGE_MIN_DELAY", "1")),
+            shared=SharedFlight.from_env()
+        )
+
+    def add_listener(self, listener: ResultListener) -> None:
+        """Register a callback for fresh upstream results (not cache hits)."""
+        self.listeners.append(listener)
+
+    def add_observer(self, observer: SearchObserver) -> None:
+        """Register a callback for every search lookup, including cache hits."""
+        self.observers.append(observer)
+
+    def _build_params(self, data: FlightSearchParams) -> Dict[str, Any]:
+        """Map search parameters onto SerpAPI query parameters."""
+        params: Dict[str, Any] = {
+            "engine": "google_flights",
+            "departure_id": data.departure_id,
+            "arrival_id": data.arrival_id,
+            "outbound_date": data.departure_date,
+            "adults": data.adults,
+            "children": data.children,
+            "infants_in_seat": data.infants_in_seat,
+            "infants_in_lap": data.infants_in_lap,
+            "type": data.type,
+            "cabin_class": data.cabin_class,
+            "stops": data.stops,
+            "bags": data.bags,
+            "search_location": data.search_location,
+            "api_key": self.api_key
+        }
+
+        if data.return_date:
+            params["return_date"] = data.return_date
+        if data.max_price:
+            params["max_price"] = data.max_price
+        if data.departure_token:
+            params["departure_token"] = data.departure_token
+        if data.booking_token:
+            params["booking_token"] = data.booking_token
+
+        return params
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Lazily create the shared keep-alive HTTP client."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        return self._client
+
+    async def _fetch_http(self, params: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Run a search over the pooled HTTP client."""
+        try:
+            with metrics.span("upstream"):
+                response: httpx.Response = await self._get_client().get(
+                    self.base_url, params=params, timeout=timeout
+                )
+        except httpx.TransportError as e:
+            raise UpstreamError(f"SerpAPI Error: {type(e).__name__}: {e}", transient=True) from e
+
+        try:
+            with metrics.span("decode"):
+                results: Dict[str, Any] = response.json()
+        except ValueError:
+            raise UpstreamError(
+                f"SerpAPI Error: HTTP {response.status_code} returned a non-JSON body",
+                transient=response.status_code >= 400 and classify_status(response.status_code),
+                status=response.status_code
+            )
+        if response.status_code >= 400 and not results.get("error"):
+            raise UpstreamError(
+                f"SerpAPI Error: HTTP {response.status_code}",
+                transient=classify_status(response.status_code),
+                status=response.status_code
+            )
+        if results.get("error"):
+            raise UpstreamError(
+                f"SerpAPI Error: {results['error']}",
+                transient=classify_status(response.status_code) or classify_message(results["error"]),
+                status=response.status_code
+            )
+        return results
+
+    def _legacy_search(self, params: Dict[str, Any], timeout: float) -> Tuple[int, Dict[str, Any]]:
+        """Run a blocking search with the legacy ``GoogleSearch`` client; returns ``(status, body)``."""
+        from serpapi import GoogleSearch
+
+        url = urlsplit(self.base_url)
+        search = GoogleSearch(dict(params, output="json"))
+        search.BACKEND = f"{url.scheme}://{url.netloc}"
+        search.timeout = timeout
+        response = search.get_response()
+        return response.status_code, json.loads(response.text)
+
+    async def _fetch_threaded(self, params: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Run a search with the legacy blocking client on the thread pool."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="serpapi")
+
+        loop = asyncio.get_running_loop()
+        # The worker thread cannot be interrupted; on timeout or cancellation
+        # the caller stops waiting and the late result is discarded.
+        try:
+            # Network time and JSON decoding both happen on the worker thread.
+            with metrics.span("upstream"):
+                status, results = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, self._legacy_search, params, timeout),
+                    timeout=timeout
+                )
+        except (asyncio.TimeoutError, OSError, ValueError) as e:
+            # requests' connection errors are OSErrors; a truncated body is a ValueError.
+            raise UpstreamError(f"SerpAPI Error: {type(e).__name__}: {e}", transient=True) from e
+        if results.get("error"):
+            raise UpstreamError(
+                f"SerpAPI Error: {results['error']}",
+                transient=classify_status(status) or classify_message(results["error"]),
+                status=status
+            )
+        return results
+
+    async def _request(
+        self,
+        params: Dict[str, Any],
+        timeout: float,
+        client_id: Optional[str],
+        priority: Priority
+    ) -> Dict[str, Any]:
+        """One upstream request through the scheduler and the configured transport."""
+        if self.scheduler is not None:
+            with metrics.span("queue"):
+                await self.scheduler.acquire(client_id, priority)
+        metrics.increment("upstream_requests")
+        # Cancelling the awaiting task (e.g. an aborted MCP call) propagates
+        # straight into the transport and releases the pooled connection.
+        if self.transport == "thread":
+            return await self._fetch_threaded(params, timeout)
+        return await self._fetch_http(params, timeout)
+
+    async def _hedged_request(
+        self,
+        params: Dict[str, Any],
+        timeout: float,
+        client_id: Optional[str],
+        priority: Priority
+    ) -> Dict[str, Any]:
+        """
+        ``_request``, plus a duplicate once the first outlives the hedge delay.
+
+        The first successful answer wins and the other request is cancelled.
+        No hedge is sent until enough latencies are known or when the quota
+        has no room for background calls.
+        """
+        threshold: Optional[float] = self.latency.quantile(self.hedge_quantile) if self.hedge else None
+        if threshold is None:
+            return await self._request(params, timeout, client_id, priority)
+
+        primary: asyncio.Task = asyncio.ensure_future(self._request(params, timeout, client_id, priority))
+        pending: Set[asyncio.Task] = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=max(threshold, self.hedge_min_delay))
+            if done:
+                return primary.result()
+            if self.scheduler is not None and not self.scheduler.allows(Priority.BACKGROUND):
+                return await primary
+
+            self.hedged += 1
+            metrics.increment("hedged_requests")
+            hedge: asyncio.Task = asyncio.ensure_future(self._request(params, timeout, client_id, priority))
+            pending.add(hedge)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.hedge_wins += task is hedge
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def get_flights(
         self,
-        data: FlightSearchParams
+        data: FlightSearchParams,
+        timeout: Optional[float] = None,
+        client_id: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE
     ) -> List[Dict[str, Any]]:
         """
         Get flights from Google Flights via SerpAPI.
 
+        Transient failures are retried with jittered exponential backoff;
+        while the circuit breaker is open the call fails fast with
+        ``CircuitOpenError``.
+
         Args:
             departure_id (str): IATA code of the departure airport.
             arrival_id (str): IATA code of the arrival airport.
@@ -29,38 +332,180 @@ class SerpApi:
             bags (Optional[int], optional): Number of bags. Defaults to 0.
             max_price (Optional[float], optional): Maximum price filter. Defaults to unlimited.
             search_location (Optional[str], optional): Search location (e.g., "us", "uk"). Defaults to "us".
+            timeout (Optional[float], optional): Per-request timeout in seconds. Defaults to the client timeout.
+            client_id (Optional[str], optional): Caller identity for fair queueing. Defaults to None.
+            priority (Priority, optional): Upstream queue priority. Defaults to Priority.INTERACTIVE.
 
         Returns:
             Dict[str, Any]: Dictionary containing search results with outbound and return flights
+
+        Raises:
+            UpstreamError: The search failed; ``transient`` tells whether a later retry may succeed.
         """
-        
-        params: Dict[str, Any] = {
-            "engine": "google_flights",
-            "departure_id": data.departure_id,
-            "arrival_id": data.arrival_id,
-            "outbound_date": data.departure_date,
-            "adults": data.adults,
-            "children": data.children,
-            "infants_in_seat": data.infants_in_seat,
-            "infants_in_lap": data.infants_in_lap,
-            "type": data.type,
-            "cabin_class": data.cabin_class,
-            "stops": data.stops,
-            "bags": data.bags,
-            "search_location": data.search_location,
-            "api_key": self.api_key
-        }
-        
-        if data.return_date:
-            params["return_date"] = data.return_date
-        if data.max_price:
-            params["max_price"] = data.max_price
-        
-        search = GoogleSearch(params)
-        results: Dict[Any, Any] = search.get_dict()
-        if results.get("error"):
-            raise RuntimeError(f"SerpAPI Error: {results['error']}")
-        
+
+        params: Dict[str, Any] = self._build_params(data)
+        request_timeout: float = timeout if timeout is not None else self.timeout
+
+        attempt: int = 0
+        while True:
+            if self.breaker is not None and not self.breaker.allow():
+                raise CircuitOpenError(self.breaker.retry_in())
+
+            start: float = time.monotonic()
+            try:
+                results: Dict[Any, Any] = await self._hedged_request(params, request_timeout, client_id, priority)
+            except UpstreamError as e:
+                metrics.increment("upstream_errors_transient" if e.transient else "upstream_errors_permanent")
+                if not e.transient:
+                    # Upstream answered; a bad query says nothing about its health.
+                    if self.breaker is not None:
+                        self.breaker.record_success()
+                    raise
+                if self.breaker is not None:
+                    self.breaker.record_failure()
+                attempt += 1
+                if attempt >= self.retry.attempts:
+                    raise
+                self.retries += 1
+                delay: float = self.retry.delay(attempt - 1)
+                logger.info("Transient SerpAPI failure (%s), retry %d in %.2fs", e, attempt, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            self.latency.add(time.monotonic() - start)
+            if self.breaker is not None:
+                self.breaker.record_success()
+            break
+
         all_flights: List[Dict[str, Any]] = results.get("best_flights", []) + results.get("other_flights", [])
-        
+
         return all_flights
+
+    async def search_flights(
+        self,
+        data: FlightSearchParams,
+        client_id: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> FlightLookup:
+        """
+        Get flights for a search, answering from the cache when possible.
+
+        Once the upstream quota is spent, or while the circuit breaker is
+        open, only cached (including stale) searches can be answered; a miss
+        raises ``QuotaExceeded`` or ``CircuitOpenError``.
+
+        Args:
+            data (FlightSearchParams): Search parameters.
+            client_id (Optional[str], optional): Caller identity for fair queueing. Defaults to None.
+            priority (Priority, optional): Upstream queue priority. Defaults to Priority.INTERACTIVE.
+
+        Returns:
+            FlightLookup: Flights plus whether they were served from cache and their age in seconds.
+        """
+        key: str = data.cache_key()
+        for observer in self.observers:
+            try:
+                observer(data, key)
+            except Exception:
+                logger.exception("Search observer %r failed", observer)
+
+        if self.cache is not None:
+            with metrics.span("cache"):
+                entry: Optional[CacheEntry] = await self.cache.get(key, allow_stale=True)
+            if entry is not None:
+                if entry.stale:
+                    # Stale-while-revalidate: answer now, refresh in the background.
+                    self.refresh_in_background(data)
+                return FlightLookup(flights=entry.value, cache_hit=True, age=entry.age, stale=entry.stale)
+
+        # Identical searches already in flight share one upstream request.
+        coalesced: bool = self.singleflight.is_in_flight(key)
+        flights: List[Dict[str, Any]] = await self.refresh(data, client_id, priority)
+        return FlightLookup(flights=flights, coalesced=coalesced)
+
+    async def _fetch_and_store(
+        self,
+        key: str,
+        data: FlightSearchParams,
+        client_id: Optional[str],
+        priority: Priority
+    ) -> List[Dict[str, Any]]:
+        """Fetch from upstream, or join another worker's fetch of the same search."""
+        if self.shared is None:
+            return await self._fetch_and_publish(key, data, client_id, priority)
+        flights, published = await self.shared.do(key, lambda: self._fetch_and_publish(key, data, client_id, priority))
+        if published is None:
+            return flights
+        # The worker that fetched it already notified its listeners.
+        value, stored_at, expires_at = published
+        if self.cache is not None:
+            self.cache.adopt(key, value, stored_at, expires_at)
+        return value
+
+    async def _fetch_and_publish(
+        self,
+        key: str,
+        data: FlightSearchParams,
+        client_id: Optional[str],
+        priority: Priority
+    ) -> List[Dict[str, Any]]:
+        """Fetch from upstream, update the cache and notify listeners."""
+        flights: List[Dict[str, Any]] = await self.get_flights(data, client_id=client_id, priority=priority)
+        if self.cache is not None:
+            await self.cache.set(key, flights)
+        elif self.shared is not None:
+            await self.shared.publish(key, flights)
+        for listener in self.listeners:
+            try:
+                listener(data, flights)
+            except Exception:
+                logger.exception("Result listener %r failed", listener)
+        return flights
+
+    async def refresh(
+        self,
+        data: FlightSearchParams,
+        client_id: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch a search from upstream, bypassing the cache, and store the result.
+
+        Joins a fetch for the same search that is already in flight.
+        """
+        key: str = data.cache_key()
+        return await self.singleflight.do(key, lambda: self._fetch_and_store(key, data, client_id, priority))
+
+    def refresh_in_background(self, data: FlightSearchParams) -> Optional["asyncio.Task[Any]"]:
+        """
+        Start ``refresh`` without waiting for it. Errors are logged, not raised.
+
+        Returns None when a fetch for the same search is already running, the
+        circuit breaker is open or the quota has no room for background calls.
+        """
+        if self.singleflight.is_in_flight(data.cache_key()):
+            return None
+        if self.breaker is not None and self.breaker.retry_in() > 0:
+            return None
+        if self.scheduler is not None and not self.scheduler.allows(Priority.BACKGROUND):
+            return None
+        task: asyncio.Task[Any] = asyncio.create_task(self.refresh(data, priority=Priority.BACKGROUND))
+        self._refreshes.add(task)
+        task.add_done_callback(self._refresh_done)
+        return task
+
+    def _refresh_done(self, task: "asyncio.Task[Any]") -> None:
+        self._refreshes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background refresh failed: %s", task.exception())
+
+    async def aclose(self) -> None:
+        """Close pooled connections and the fallback thread pool."""
+        for task in list(self._refreshes):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,110 @@
+"""
+The process-wide SerpAPI client, built on first use.
+
+Every tool shares one ``SerpApi`` (one connection pool, cache, scheduler and
+circuit breaker) plus the optional refresh scheduler, return-leg
+prefetcher and the price watcher wired to it. Nothing is constructed, and ``apis.serp`` with its
+HTTP stack is not imported, until the first search needs it, so starting
+the server stays cheap. With ``SERP_WARMUP`` set, ``warm()`` does that
+work on a background thread while the client is still in the MCP
+handshake; it competes with the handshake for the GIL, so it only pays off
+for sessions that sit idle before their first search.
+"""
+import os
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+if TYPE_CHECKING:
+    from apis.prefetch import ReturnPrefetcher
+    from apis.refresh import RefreshScheduler
+    from apis.serp import SerpApi
+
+_serp: Optional["SerpApi"] = None
+_refresher: Optional["RefreshScheduler"] = None
+_prefetcher: Optional["ReturnPrefetcher"] = None
+_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+def get_serp() -> "SerpApi":
+    """Return the shared client, building and wiring it on the first call."""
+    if _serp is not None:
+        return _serp
+    with _lock:
+        return _serp if _serp is not None else _build()
+
+def _build() -> "SerpApi":
+    global _serp, _refresher, _prefetcher
+    from apis.prefetch import ReturnPrefetcher
+    from apis.refresh import RefreshScheduler
+    from apis.serp import SerpApi
+    from apis.watch import watcher
+    from data.history import history
+    from data.snapshots import snapshots
+
+    api_key: str | None = os.getenv("SERP_API_KEY")
+    if api_key is None:
+        raise ValueError("SERP_API_KEY environment variable not set")
+
+    serp = SerpApi.from_env(api_key=api_key)
+    if history is not None:
+        serp.add_listener(history.record)
+    serp.add_listener(snapshots.update)
+    # Any fresh result for a watched route doubles as a price-watch poll
+    serp.add_listener(watcher.observe)
+
+    # Keep popular searches warm (REFRESH_ENABLED)
+    _refresher = RefreshScheduler.from_env(serp)
+    if _refresher is not None:
+        serp.add_observer(_refresher.track)
+
+    # Fetch return legs for top outbound results ahead of time (PREFETCH_ENABLED)
+    _prefetcher = ReturnPrefetcher.from_env(serp)
+    if _prefetcher is not None:
+        serp.add_listener(_prefetcher.prefetch)
+        serp.add_observer(_prefetcher.track)
+
+    _serp = serp
+    return serp
+
+def _warm() -> None:
+    try:
+        get_serp()
+        # httpx imports its connection pool lazily, when the first AsyncClient is created.
+        import httpcore  # noqa: F401
+    except Exception:
+        logger.debug("Upstream warm-up failed; the first search will retry", exc_info=True)
+
+def warm() -> None:
+    """Build the shared client on a daemon thread when ``SERP_WARMUP`` is true."""
+    if _serp is None and os.getenv("SERP_WARMUP", "false").lower() == "true":
+        threading.Thread(target=_warm, name="serp-warmup", daemon=True).start()
+
+def current() -> Optional["SerpApi"]:
+    """The shared client if a search has built it, without building one."""
+    return _serp
+
+def refresher() -> Optional["RefreshScheduler"]:
+    return _refresher
+
+def prefetcher() -> Optional["ReturnPrefetcher"]:
+    return _prefetcher
+
+async def aclose() -> None:
+    """Close the shared client so the next ``get_serp()`` builds a fresh one."""
+    global _serp, _refresher, _prefetcher
+    if _serp is not None:
+        await _serp.aclose()
+    _serp = _refresher = _prefetcher = None
+
+@asynccontextmanager
+async def lifespan() -> AsyncIterator[None]:
+    """Write the fare history still queued by the result listeners when the server stops."""
+    try:
+        yield
+    finally:
+        from data.history import history
+        if history is not None:
+            await history.stop()
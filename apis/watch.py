@@ -0,0 +1,445 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import secrets
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Set, Tuple
+from apis.scheduler import Priority
+from data.db import WatchStore
+from data.subscriptions import subscriptions
+from models.flight import FlightSearchParams
+from utils.validation import earliest_departure
+
+if TYPE_CHECKING:
+    from apis.serp import SerpApi
+    from data.cache import CacheEntry
+
+logger = logging.getLogger(__name__)
+
+def _timestamp(value: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(value, tz=timezone.utc).isoformat(timespec="seconds") if value is not None else None
+
+def watch_uri(watch_id: str) -> str:
+    """Resource URI of a watch; its subscribers get resource-updated notifications when it fires."""
+    return f"watches://{watch_id}"
+
+def _min_price(flights: List[Dict[str, Any]]) -> Optional[float]:
+    prices: List[float] = [f["price"] for f in flights if f.get("price")]
+    return min(prices) if prices else None
+
+@dataclass
+class Watch:
+    watch_id: str
+    owner: str
+    params: FlightSearchParams
+    threshold: float
+    created_at: float
+    durable: bool = True
+    last_price: Optional[float] = None
+    checked_at: Optional[float] = None
+    triggered_at: Optional[float] = None
+
+    @property
+    def below(self) -> bool:
+        return self.last_price is not None and self.last_price <= self.threshold
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "watch_id": self.watch_id,
+            "uri": watch_uri(self.watch_id),
+            "departure_id": self.params.departure_id,
+            "arrival_id": self.params.arrival_id,
+            "departure_date": self.params.departure_date,
+            "return_date": self.params.return_date,
+            "threshold": self.threshold,
+            "last_price": self.last_price,
+            "below_threshold": self.below,
+            "checked_at": _timestamp(self.checked_at),
+            "triggered_at": _timestamp(self.triggered_at),
+            "created_at": _timestamp(self.created_at),
+        }
+
+@dataclass
+class _Route:
+    params: FlightSearchParams
+    watch_ids: Set[str] = field(default_factory=set)
+    next_poll_at: float = 0.0
+    last_price: Optional[float] = None
+    stable_polls: int = 0
+    polling: bool = False
+
+class PriceWatcher:
+    """
+    Polls watched searches and alerts when a price drops to a threshold.
+
+    Watches are grouped by their normalized search (``cache_key``), so one
+    poll serves every watcher of a route, and any upstream result for a
+    watched search (from get_flights, a refresh, another watch) counts as a
+    poll too. A poll is answered from the cache while it is fresh and only
+    otherwise goes upstream, at background priority and within
+    ``budget_per_hour`` calls.
+
+    The interval between polls of a route goes from ``min_interval`` on the
+    departure day up to ``max_interval`` at ``horizon_days`` or more out,
+    and grows by ``backoff`` for each poll in a row (up to four) whose
+    lowest price moved less than ``stable_change``.
+
+    A watch fires when the lowest price crosses from above its threshold to
+    at or below it, then re-arms once the price rises above it again. An
+    alert is a resource-updated notification for the watch's ``watch_uri``,
+    sent to its subscribers; MCP log messages can only ride a request's own
+    stream, so they cannot carry it. Watches are dropped once validation
+    stops accepting their departure date (``earliest_departure``, in UTC).
+
+    Only durable watches, whose owner outlives its connection, are stored
+    and resumed on restart. The others live until ``attach``'s connection
+    closes, since nobody could reach them afterwards.
+    """
+
+    def __init__(
+        self,
+        store: Optional[WatchStore] = None,
+        min_interval: float = 1800.0,
+        max_interval: float = 43200.0,
+        horizon_days: float = 60.0,
+        stable_change: float = 0.01,
+        backoff: float = 1.5,
+        budget_per_hour: int = 60,
+        max_watches: int = 1000,
+        max_per_owner: int = 20,
+        tick: float = 60.0
+    ) -> None:
+        self.store: Optional[WatchStore] = store
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.horizon_days: float = horizon_days
+        self.stable_change: float = stable_change
+        self.backoff: float = backoff
+        self.budget_per_hour: int = budget_per_hour
+        self.max_watches: int = max_watches
+        self.max_per_owner: int = max_per_owner
+        self.tick_interval: float = tick
+        self.polls: int = 0
+        self.upstream_calls: int = 0
+        self.observed: int = 0
+        self.alerts: int = 0
+        self.released: int = 0
+        self.failed: int = 0
+        self.over_budget: int = 0
+        self._watches: Dict[str, Watch] = {}
+        self._routes: Dict[str, _Route] = {}
+        self._attached: Set[str] = set()
+        self._calls: Deque[float] = deque()
+        self._loaded: bool = False
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_env(cls) -> "PriceWatcher":
+        """Build a watcher from the ``WATCH_*`` environment variables; an empty ``WATCH_DB_PATH`` keeps watches in memory."""
+        path: str = os.getenv("WATCH_DB_PATH", "price_watches.db")
+        return cls(
+            store=WatchStore(path) if path else None,
+            min_interval=float(os.getenv("WATCH_MIN_INTERVAL", "1800")),
+            max_interval=float(os.getenv("WATCH_MAX_INTERVAL", "43200")),
+            horizon_days=float(os.getenv("WATCH_HORIZON_DAYS", "60")),
+            stable_change=float(os.getenv("WATCH_STABLE_CHANGE", "0.01")),
+            backoff=float(os.getenv("WATCH_BACKOFF", "1.5")),
+            budget_per_hour=int(os.getenv("WATCH_BUDGET_PER_HOUR", "60")),
+            max_watches=int(os.getenv("WATCH_MAX", "1000")),
+            max_per_owner=int(os.getenv("WATCH_MAX_PER_CLIENT", "20")),
+            tick=float(os.getenv("WATCH_TICK", "60"))
+        )
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        """Load stored watches once and start the polling task; repeat calls are no-ops."""
+        if not self._loaded:
+            self._loaded = True
+            stored: List[Dict[str, Any]] = await asyncio.to_thread(self.store.load) if self.store is not None else []
+            now: float = time.time()
+            for row in stored:
+                watch: Watch = Watch(
+                    watch_id=row["watch_id"],
+                    owner=row["owner"],
+                    params=FlightSearchParams(**row["params"]),
+                    threshold=row["threshold"],
+                    created_at=row["created_at"],
+                    last_price=row["last_price"],
+                    checked_at=row["checked_at"],
+                    triggered_at=row["triggered_at"]
+                )
+                # Spread the first polls after a restart instead of firing them all at once
+                self._add(watch, now + random.uniform(0, self.tick_interval))
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # Watches
+
+    def attach(self, owner: str, connection: Any) -> None:
+        """Tie ``owner``'s non-durable watches to ``connection``: they are dropped when it closes."""
+        if owner not in self._attached:
+            self._attached.add(owner)
+            connection.exit_stack.callback(self._release, owner)
+
+    def _release(self, owner: str) -> None:
+        self._attached.discard(owner)
+        watches: List[Watch] = [w for w in self._watches.values() if w.owner == owner and not w.durable]
+        self.released += len(watches)
+        self._forget(watches)
+
+    def _add(self, watch: Watch, next_poll_at: float) -> None:
+        self._watches[watch.watch_id] = watch
+        key: str = watch.params.cache_key()
+        route: Optional[_Route] = self._routes.get(key)
+        if route is None:
+            route = self._routes[key] = _Route(params=watch.params, next_poll_at=next_poll_at, last_price=watch.last_price)
+        route.watch_ids.add(watch.watch_id)
+
+    async def create(self, owner: str, params: FlightSearchParams, threshold: float, durable: bool = True) -> Watch:
+        """
+        Watch ``params`` for ``owner`` until the lowest price is at or below ``threshold``.
+
+        A watch that is not ``durable`` is kept in memory only; see ``attach``.
+
+        Raises:
+            ValueError: When the owner or the server is at its watch limit.
+        """
+        await self.start()
+        if sum(1 for w in self._watches.values() if w.owner == owner) >= self.max_per_owner:
+            raise ValueError(f"Too many price watches. Cancel one first; the limit is {self.max_per_owner} per client.")
+        if len(self._watches) >= self.max_watches:
+            raise ValueError(f"Too many price watches on this server. The limit is {self.max_watches}.")
+
+        watch: Watch = Watch(
+            watch_id=f"W-{secrets.token_hex(6)}", owner=owner, params=params, threshold=threshold,
+            created_at=time.time(), durable=durable
+        )
+        key: str = params.cache_key()
+        route: Optional[_Route] = self._routes.get(key)
+        if route is not None and route.last_price is not None:
+            # The route is already polled; start from its latest price, and fire now if that already qualifies
+            self._add(watch, route.next_poll_at)
+            self._update(key, route.last_price, time.time(), [watch])
+        else:
+            self._add(watch, time.time())
+            self._wake.set()
+        if self.store is not None and durable:
+            await asyncio.to_thread(self.store.add, {
+                "watch_id": watch.watch_id,
+                "owner": owner,
+                "search_key": key,
+                "params": params.model_dump(mode="json"),
+                "threshold": threshold,
+                "created_at": watch.created_at,
+                "last_price": watch.last_price,
+                "checked_at": watch.checked_at,
+                "triggered_at": watch.triggered_at,
+            })
+        return watch
+
+    def get(self, owner: str, watch_id: str) -> Optional[Watch]:
+        watch: Optional[Watch] = self._watches.get(watch_id)
+        return watch if watch is not None and watch.owner == owner else None
+
+    def list(self, owner: str) -> List[Watch]:
+        return [w for w in self._watches.values() if w.owner == owner]
+
+    def next_poll_in(self, watch: Watch) -> Optional[float]:
+        route: Optional[_Route] = self._routes.get(watch.params.cache_key())
+        return max(route.next_poll_at - time.time(), 0.0) if route is not None else None
+
+    async def cancel(self, owner: str, watch_id: str) -> bool:
+        """Remove ``owner``'s watch ``watch_id``; returns whether it existed."""
+        await self.start()
+        watch: Optional[Watch] = self.get(owner, watch_id)
+        if watch is None:
+            return False
+        await self._drop([watch])
+        return True
+
+    async def _drop(self, watches: List[Watch]) -> None:
+        self._forget(watches)
+        stored: List[str] = [w.watch_id for w in watches if w.durable]
+        if self.store is not None and stored:
+            await asyncio.to_thread(self.store.remove, stored)
+
+    def _forget(self, watches: List[Watch]) -> None:
+        for watch in watches:
+            self._watches.pop(watch.watch_id, None)
+            key: str = watch.params.cache_key()
+            route: Optional[_Route] = self._routes.get(key)
+            if route is not None:
+                route.watch_ids.discard(watch.watch_id)
+                if not route.watch_ids:
+                    del self._routes[key]
+
+    # Observations
+
+    def observe(self, params: FlightSearchParams, flights: List[Dict[str, Any]]) -> None:
+        """Result listener: an upstream result for a watched search counts as a poll."""
+        key: str = params.cache_key()
+        route: Optional[_Route] = self._routes.get(key)
+        if route is None or route.polling:
+            return
+        self.observed += 1
+        self._record(key, route, _min_price(flights))
+
+    def _record(self, key: str, route: _Route, price: Optional[float]) -> None:
+        """Take one observation of a route's lowest price and schedule its next poll."""
+        now: float = time.time()
+        if price is not None and route.last_price is not None:
+            changed: bool = abs(price - route.last_price) > self.stable_change * route.last_price
+            route.stable_polls = 0 if changed else route.stable_polls + 1
+        if price is not None:
+            route.last_price = price
+        route.next_poll_at = now + self._interval(route)
+        self._update(key, price, now, [self._watches[w] for w in route.watch_ids])
+
+    def _update(self, key: str, price: Optional[float], now: float, watches: List[Watch]) -> None:
+        """Apply an observed price to ``watches``, alerting on each downward threshold crossing."""
+        for watch in watches:
+            if price is None:
+                watch.checked_at = now
+                continue
+            was_below: bool = watch.below
+            watch.last_price, watch.checked_at = price, now
+            if watch.below and not was_below:
+                watch.triggered_at = now
+                self.alerts += 1
+                self._spawn(subscriptions.notify(watch_uri(watch.watch_id)))
+        stored: List[Watch] = [w for w in watches if w.durable]
+        if self.store is not None and stored:
+            self._spawn(asyncio.to_thread(
+                self.store.update_prices, [(w.last_price, now, w.triggered_at, w.watch_id) for w in stored]
+            ))
+
+    def _interval(self, route: _Route) -> float:
+        today: date = datetime.now(timezone.utc).date()
+        days: int = (date.fromisoformat(route.params.departure_date) - today).days
+        interval: float = self.min_interval + (self.max_interval - self.min_interval) * min(max(days, 0) / self.horizon_days, 1.0)
+        return min(interval * self.backoff ** min(route.stable_polls, 4), self.max_interval)
+
+    def _spawn(self, coro: Any) -> None:
+        task: asyncio.Task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # Polling
+
+    def _budget_left(self, now: float) -> int:
+        while self._calls and now - self._calls[0] >= 3600:
+            self._calls.popleft()
+        return self.budget_per_hour - len(self._calls)
+
+    async def _fetch(self, serp: "SerpApi", key: str, route: _Route) -> None:
+        self._calls.append(time.time())
+        self.upstream_calls += 1
+        # The listener would see this result too; record it once, here
+        route.polling = True
+        try:
+            flights: List[Dict[str, Any]] = await serp.refresh(route.params, priority=Priority.BACKGROUND)
+        finally:
+            route.polling = False
+        self._record(key, route, _min_price(flights))
+
+    async def tick(self) -> int:
+        """
+        Poll every route that is due, within the hourly budget.
+
+        A route with a fresh cache entry is answered from it; the others
+        are fetched upstream until the budget or the scheduler's background
+        capacity runs out, and the rest wait for the next tick.
+
+        Returns:
+            int: Number of routes polled.
+        """
+        from apis.upstream import get_serp
+
+        # Same UTC cut-off as validation, so a watch lives exactly as long as its search is accepted
+        earliest: str = earliest_departure().isoformat()
+        departed: List[Watch] = [w for w in self._watches.values() if w.params.departure_date < earliest]
+        if departed:
+            await self._drop(departed)
+
+        now: float = time.time()
+        due: List[Tuple[str, _Route]] = sorted(
+            ((k, r) for k, r in self._routes.items() if r.next_poll_at <= now), key=lambda item: item[1].next_poll_at
+        )
+        if not due:
+            return 0
+        serp: "SerpApi" = get_serp()
+        polled: int = 0
+        for key, route in due:
+            if key not in self._routes:
+                continue
+            # peek, not get: polls must not count as cache hits or misses in the user-facing stats
+            entry: Optional["CacheEntry"] = serp.cache.peek(key) if serp.cache is not None else None
+            if entry is not None and not entry.stale:
+                # Someone searched this recently; the cached result costs nothing
+                self._record(key, route, _min_price(entry.value))
+                self.polls += 1
+                polled += 1
+                continue
+            if self._budget_left(time.time()) <= 0 or (
+                serp.scheduler is not None and not serp.scheduler.allows(Priority.BACKGROUND)
+            ):
+                self.over_budget += 1
+                break
+            try:
+                await self._fetch(serp, key, route)
+            except Exception as e:
+                self.failed += 1
+                route.next_poll_at = time.time() + self.min_interval
+                logger.warning("Price watch poll of %s failed: %s", key, e)
+            else:
+                self.polls += 1
+                polled += 1
+        return polled
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Price watch tick failed")
+            upcoming: List[float] = [r.next_poll_at for r in self._routes.values()]
+            delay: float = min([self.tick_interval] + [max(t - time.time(), 1.0) for t in upcoming])
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "watches": len(self._watches),
+            "routes": len(self._routes),
+            "polls": self.polls,
+            "upstream_calls": self.upstream_calls,
+            "observed": self.observed,
+            "alerts": self.alerts,
+            "released": self.released,
+            "failed": self.failed,
+            "over_budget": self.over_budget,
+            "budget_left": self._budget_left(time.time()),
+        }
+
+# Shared by the watch tools and the upstream result listener.
+watcher: PriceWatcher = PriceWatcher.from_env()
@@ -0,0 +1,127 @@
+"""
+Load-test the multi-worker deployment (cluster.py) end to end.
+
+Starts the local fake SerpAPI, the key-value stand-in (benchmarks.fake_kv)
+and ``cluster.py`` with ``--workers`` worker processes behind the session
+router, then drives it with the same MCP clients as bench_load over
+streamable HTTP. Every client keeps one session for all its calls, so a
+routing mistake shows up as errors.
+
+Runs once per backend: with "memory" every worker has its own cache and
+the same search is fetched once per worker; with "redis" (the stand-in)
+workers share the cache and in-flight calls, so each distinct search
+should reach upstream about once.
+
+Usage:
+    python -m benchmarks.bench_cluster --workers 4 --clients 40 --calls 10 --routes 10 [--backend redis] [--json out.json]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import socket
+import argparse
+import subprocess
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.bench_load import _drive
+from benchmarks.fake_kv import FakeKeyValue
+from benchmarks.fake_serp import FakeSerpApi
+from benchmarks import fixtures
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(router: str, workers: int, timeout: float = 60.0) -> None:
+    """Wait until the router answers and every worker accepts connections."""
+    deadline: float = time.monotonic() + timeout
+    port: int = int(router.rsplit(":", 1)[1])
+    pending: List[int] = [port] + [port + 1 + i for i in range(workers)]
+    while pending:
+        try:
+            with socket.create_connection(("127.0.0.1", pending[0]), timeout=1):
+                pending.pop(0)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"cluster did not start within {timeout:.0f}s")
+            time.sleep(0.2)
+
+
+def run(
+    backend: str = "redis",
+    workers: int = 4,
+    clients: int = 40,
+    calls: int = 10,
+    latency: float = 0.2,
+    routes: int = 10,
+    fixture: str = "medium"
+) -> Dict[str, Any]:
+    """Run one load test against a fresh cluster and return its measurements."""
+    port: int = _free_port()
+    router: str = f"http://127.0.0.1:{port}"
+    with FakeSerpApi(latency=latency, response=fixtures.load(fixture)) as fake, FakeKeyValue() as kv:
+        env: Dict[str, str] = {
+            **os.environ,
+            "PYTHONPATH": ROOT,
+            "SERP_API_KEY": os.environ.get("SERP_API_KEY", "benchmark"),
+            "SERP_API_URL": fake.url,
+            "SERP_RATE": "100000",
+            "SERP_BURST": "100000",
+            "SERP_QUOTA_LIMIT": "0",
+            "FLIGHT_CACHE_DB_PATH": "",
+            "FARE_HISTORY_DB_PATH": "",
+            "SERP_WARMUP": "true",
+            "MCP_PORT": str(port),
+            "MCP_WORKERS": str(workers),
+            "SHARED_BACKEND": backend,
+            "SHARED_URL": kv.url,
+            "SHARED_PREFIX": f"bench-{port}:",
+        }
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT, "cluster.py")], env=env)
+        try:
+            _wait_ready(router, workers)
+            results: Dict[str, Any] = asyncio.run(_drive(f"{router}/mcp", clients, calls, routes))
+            results["upstream_calls"] = fake.request_count
+            results["router"] = dict(
+                line.split() for line in httpx.get(f"{router}/_router").text.splitlines()
+            )
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return {"backend": backend, "workers": workers, **results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["memory", "redis"], action="append", help="default: both")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=40)
+    parser.add_argument("--calls", type=int, default=10, help="calls per client")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake upstream latency in seconds")
+    parser.add_argument("--routes", type=int, default=10, help="distinct searches to cycle through")
+    parser.add_argument("--fixture", default="medium", choices=list(fixtures.SIZES))
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {}
+    for backend in args.backend or ["memory", "redis"]:
+        results[backend] = run(backend, args.workers, args.clients, args.calls, args.latency, args.routes, args.fixture)
+        print(f"[{backend}]")
+        for key, value in results[backend].items():
+            print(f"  {key:<16} {value}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
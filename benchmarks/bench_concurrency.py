@@ -0,0 +1,52 @@
+"""
+Show that concurrent ``SerpApi.get_flights`` calls overlap instead of queueing.
+
+Runs N searches at once against the local fake SerpAPI and compares the wall
+time with a single search. With a non-blocking transport both are roughly one
+upstream latency.
+
+Usage:
+    python -m benchmarks.bench_concurrency --calls 20 --latency 0.5 --transport http
+"""
+import argparse
+import asyncio
+import time
+
+from apis.serp import SerpApi
+from benchmarks.fake_serp import FakeSerpApi
+from models.flight import FlightSearchParams
+
+
+async def _run(url: str, calls: int, transport: str) -> tuple[float, float]:
+    serp = SerpApi(api_key="fake", base_url=url, transport=transport, max_connections=calls)
+    params = FlightSearchParams(departure_id="JFK", arrival_id="LAX", departure_date="2026-11-20")
+    try:
+        start: float = time.perf_counter()
+        await serp.get_flights(params)
+        single: float = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.gather(*(serp.get_flights(params) for _ in range(calls)))
+        concurrent: float = time.perf_counter() - start
+    finally:
+        await serp.aclose()
+    return single, concurrent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--transport", choices=["http", "thread"], default="http")
+    args = parser.parse_args()
+
+    with FakeSerpApi(latency=args.latency) as fake:
+        single, concurrent = asyncio.run(_run(fake.url, args.calls, args.transport))
+
+    print(f"transport={args.transport} latency={args.latency:.2f}s")
+    print(f"1 call:        {single:.3f}s")
+    print(f"{args.calls} concurrent: {concurrent:.3f}s ({concurrent / single:.2f}x one call)")
+
+
+if __name__ == "__main__":
+    main()
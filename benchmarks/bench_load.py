@@ -0,0 +1,133 @@
+"""
+Load-test the FastMCP server with many concurrent MCP clients.
+
+Each client opens its own MCP session and calls ``get_flights`` back to back,
+cycling through ``--routes`` distinct searches (fewer routes means more cache
+hits and coalescing). By default the server runs in-process against the
+local fake SerpAPI with ``--latency`` seconds per upstream call; pass
+``--url`` to drive an already running server over streamable HTTP instead.
+
+Reports throughput, latency percentiles, error count, upstream calls and the
+process' memory high-water mark.
+
+Usage:
+    python -m benchmarks.bench_load --clients 50 --calls 20 --latency 0.2 --routes 10 --fixture medium [--json out.json]
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import resource
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_serp import FakeSerpApi
+from benchmarks import fixtures
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux.
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+async def _drive(target: Any, clients: int, calls: int, routes: int) -> Dict[str, Any]:
+    from fastmcp import Client
+
+    latencies: List[float] = []
+    errors: int = 0
+
+    async def client(index: int) -> None:
+        nonlocal errors
+        async with Client(target) as session:
+            for call in range(calls):
+                day: int = 1 + (index * calls + call) % routes
+                arguments: Dict[str, Any] = {
+                    "departure_id": "JFK",
+                    "arrival_id": "LAX",
+                    "departure_date": f"2026-12-{day:02d}",
+                    "adults": 1,
+                }
+                start: float = time.perf_counter()
+                try:
+                    result = await session.call_tool("get_flights", arguments)
+                    content: Optional[Dict[str, Any]] = result.structured_content
+                    if content is None or not content.get("success"):
+                        errors += 1
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+    start: float = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    wall: float = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(1000 * _percentile(latencies, 0.50), 1),
+        "p95_ms": round(1000 * _percentile(latencies, 0.95), 1),
+        "p99_ms": round(1000 * _percentile(latencies, 0.99), 1),
+        "max_ms": round(1000 * latencies[-1], 1) if latencies else 0.0,
+    }
+
+
+def run(
+    clients: int = 20,
+    calls: int = 10,
+    latency: float = 0.2,
+    routes: int = 10,
+    fixture: str = "medium",
+    url: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run one load test and return its measurements."""
+    if url is not None:
+        results: Dict[str, Any] = asyncio.run(_drive(url, clients, calls, routes))
+        results["peak_rss_mib"] = None  # the server runs in another process
+        return results
+
+    with FakeSerpApi(latency=latency, response=fixtures.load(fixture)) as fake:
+        os.environ.update({
+            "SERP_API_KEY": os.environ.get("SERP_API_KEY", "benchmark"),
+            "SERP_API_URL": fake.url,
+            "SERP_RATE": os.environ.get("SERP_RATE", "100000"),
+            "SERP_BURST": os.environ.get("SERP_BURST", "100000"),
+            "SERP_QUOTA_LIMIT": "0",
+            "FLIGHT_CACHE_DB_PATH": "",
+            "FARE_HISTORY_DB_PATH": "",
+        })
+        import server
+
+        results = asyncio.run(_drive(server.mcp, clients, calls, routes))
+        results["upstream_calls"] = fake.request_count
+    results["peak_rss_mib"] = _peak_rss_mib()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--calls", type=int, default=10, help="calls per client")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake upstream latency in seconds")
+    parser.add_argument("--routes", type=int, default=10, help="distinct searches to cycle through")
+    parser.add_argument("--fixture", default="medium", choices=list(fixtures.SIZES))
+    parser.add_argument("--url", help="drive a running server (e.g. http://127.0.0.1:8000/mcp) instead")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = run(args.clients, args.calls, args.latency, args.routes, args.fixture, args.url)
+    for key, value in results.items():
+        print(f"{key:<16} {value}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
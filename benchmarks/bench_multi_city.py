@@ -0,0 +1,100 @@
+"""
+Compare ways of combining per-leg options into multi-city itineraries.
+
+Each leg has ``--per-leg`` synthetic one-way options (random prices,
+departures spread over the day) and a combination is valid only when every
+leg departs at least two hours after the previous one lands, as
+search_multi_city requires:
+
+* product:  every combination from itertools.product, filtered, then the
+            cheapest ``--top`` kept with heapq.nsmallest
+* beam:     utils.beam.beam_combine with ``--width`` partial trips per leg
+
+Reports time per call, combinations (or partial trips) evaluated, and how
+many of the beam's results match the exhaustive answer.
+
+Usage:
+    python -m benchmarks.bench_multi_city --legs 2 3 4 5 --per-leg 30 --width 50 --top 5
+"""
+import time
+import heapq
+import random
+import argparse
+import itertools
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from utils.beam import beam_combine
+
+CONNECTION: timedelta = timedelta(minutes=120)
+
+
+def _legs(count: int, per_leg: int, seed: int = 7) -> List[List[Dict[str, Any]]]:
+    rng = random.Random(seed)
+    day: datetime = datetime(2026, 12, 1)
+    legs: List[List[Dict[str, Any]]] = []
+    for _ in range(count):
+        options: List[Dict[str, Any]] = []
+        for _ in range(per_leg):
+            departure: datetime = day + timedelta(minutes=rng.randrange(5 * 60, 22 * 60, 15))
+            options.append({
+                "price": float(rng.randint(79, 900)),
+                "departure": departure,
+                "arrival": departure + timedelta(minutes=rng.randint(60, 420)),
+            })
+        legs.append(options)
+        day += timedelta(days=1) if rng.random() < 0.5 else timedelta()
+    return legs
+
+
+def _compatible(previous: Dict[str, Any], following: Dict[str, Any]) -> bool:
+    return following["departure"] >= previous["arrival"] + CONNECTION
+
+
+def _product(legs: List[List[Dict[str, Any]]], top: int) -> Tuple[List[float], int]:
+    evaluated: int = 0
+
+    def valid():
+        nonlocal evaluated
+        for combo in itertools.product(*legs):
+            evaluated += 1
+            if all(_compatible(combo[i], combo[i + 1]) for i in range(len(combo) - 1)):
+                yield sum(option["price"] for option in combo)
+
+    return heapq.nsmallest(top, valid()), evaluated
+
+
+def _beam(legs: List[List[Dict[str, Any]]], top: int, width: int) -> Tuple[List[float], int]:
+    combined, evaluated = beam_combine(legs, cost=lambda o: o["price"], compatible=_compatible, width=width, top_k=top)
+    return [total for total, _ in combined], evaluated
+
+
+def _time(fn, repeat: int) -> Tuple[float, Any]:
+    start: float = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--legs", type=int, nargs="+", default=[2, 3, 4])
+    parser.add_argument("--per-leg", type=int, default=30)
+    parser.add_argument("--width", type=int, default=50)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.per_leg} options per leg, beam width {args.width}, top {args.top}")
+    print(f"{'legs':<5} {'path':<8} {'ms/call':>10} {'evaluated':>12} {'matches':>8}")
+    for count in args.legs:
+        legs: List[List[Dict[str, Any]]] = _legs(count, args.per_leg)
+        product_ms, (exact, product_evaluated) = _time(lambda: _product(legs, args.top), args.repeat)
+        beam_ms, (found, beam_evaluated) = _time(lambda: _beam(legs, args.top, args.width), args.repeat)
+        matches: int = sum(1 for a, b in zip(found, exact) if a == b)
+        print(f"{count:<5} {'product':<8} {product_ms:10.2f} {product_evaluated:12d} {'':>8}")
+        print(f"{count:<5} {'beam':<8} {beam_ms:10.2f} {beam_evaluated:12d} {matches:>5}/{len(exact)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Replay fixtures through the whole search pipeline and time each step.
+
+For every fixture size the same response is served by the local fake
+SerpAPI (no added latency) and pushed through:
+
+* fetch:    SerpApi.get_flights (HTTP round trip plus JSON decoding)
+* direct:   serialize_flight(row) for every row
+* validated: the same dicts round-tripped through FlightSearchResult
+* tool:     the get_flights tool end to end, one page of 10
+
+Reports median milliseconds per step and peak traced allocation.
+
+Usage:
+    python -m benchmarks.bench_pipeline --sizes small medium large xlarge --repeat 5 [--json out.json]
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.fake_serp import FakeSerpApi
+from benchmarks import fixtures
+
+PARAMS: Dict[str, Any] = {"departure_id": "JFK", "arrival_id": "LAX", "departure_date": "2026-11-20", "adults": 1}
+
+
+def _configure(url: str) -> None:
+    """Point the server at the fake upstream with caching, queueing and history off."""
+    os.environ.update({
+        "SERP_API_KEY": os.environ.get("SERP_API_KEY", "benchmark"),
+        "SERP_API_URL": url,
+        "FLIGHT_CACHE_ENABLED": "false",
+        "SERP_SCHEDULER_ENABLED": "false",
+        "FARE_HISTORY_DB_PATH": "",
+    })
+
+
+async def _time(fn: Callable[[], Awaitable[Any]], repeat: int) -> Dict[str, float]:
+    samples: List[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        await fn()
+        samples.append(1000 * (time.perf_counter() - start))
+
+    tracemalloc.start()
+    await fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"median_ms": round(statistics.median(samples), 3), "peak_kib": round(peak / 1024, 1)}
+
+
+async def run(sizes: List[str], repeat: int) -> Dict[str, Any]:
+    """Benchmark each fixture size; returns ``{size: {step: {median_ms, peak_kib}}}``."""
+    results: Dict[str, Any] = {}
+    with FakeSerpApi(latency=0.0) as fake:
+        _configure(fake.url)
+        from models.flight import FlightSearchParams, FlightSearchResult
+        from models.itinerary import serialize_flight
+        from tools import flights as tool_module
+        from apis import upstream
+
+        serp = upstream.get_serp()
+        get_flights = getattr(tool_module.get_flights, "fn", tool_module.get_flights)
+        params = FlightSearchParams(**PARAMS)
+
+        for size in sizes:
+            fake.response = fixtures.load(size)
+            rows: List[Dict[str, Any]] = await serp.get_flights(params)
+
+            async def fetch() -> None:
+                await serp.get_flights(params)
+
+            async def direct() -> None:
+                [serialize_flight(row) for row in rows]
+
+            async def validated() -> None:
+                [FlightSearchResult.model_validate(serialize_flight(row)).model_dump(mode="json") for row in rows]
+
+            async def tool() -> None:
+                response: Dict[str, Any] = await get_flights(**PARAMS)
+                if not response.get("success"):
+                    raise RuntimeError(response.get("error"))
+
+            results[size] = {"rows": len(rows)}
+            for step, fn in (("fetch", fetch), ("direct", direct), ("validated", validated), ("tool", tool)):
+                results[size][step] = await _time(fn, repeat)
+        await upstream.aclose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=list(fixtures.SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = asyncio.run(run(args.sizes, args.repeat))
+    for size, steps in results.items():
+        print(f"{size} ({steps['rows']} rows)")
+        for step, value in steps.items():
+            if step != "rows":
+                print(f"  {step:<10} {value['median_ms']:>10.3f} ms   peak {value['peak_kib']:>9.1f} KiB")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
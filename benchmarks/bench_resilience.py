@@ -0,0 +1,96 @@
+"""
+Exercise retries, hedged requests and the circuit breaker against injected faults.
+
+Runs three scenarios against the local fake SerpAPI, each with the feature
+off and on:
+
+- flaky:  a fraction of requests fail with HTTP 503; compares success rates.
+- tail:   a fraction of requests are slow; compares p50/p99 latency with hedging.
+- outage: every request fails; compares how long callers wait with a breaker.
+
+Usage:
+    python -m benchmarks.bench_resilience --calls 100 --latency 0.05
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+
+from apis.resilience import CircuitBreaker, RetryPolicy
+from apis.serp import SerpApi
+from benchmarks.fake_serp import FakeSerpApi
+from models.flight import FlightSearchParams
+
+PARAMS = FlightSearchParams(departure_id="JFK", arrival_id="LAX", departure_date="2026-11-20")
+
+
+async def _calls(serp: SerpApi, calls: int, concurrency: int = 10) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures: int = 0
+
+    async def one() -> None:
+        nonlocal failures
+        async with semaphore:
+            start: float = time.perf_counter()
+            try:
+                await serp.get_flights(PARAMS)
+            except RuntimeError:
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+
+    try:
+        await asyncio.gather(*(one() for _ in range(calls)))
+    finally:
+        await serp.aclose()
+    latencies.sort()
+    return {
+        "ok": calls - failures,
+        "failed": failures,
+        "p50_ms": round(1000 * latencies[len(latencies) // 2], 1),
+        "p99_ms": round(1000 * latencies[min(int(0.99 * len(latencies)), len(latencies) - 1)], 1),
+        "total_s": round(sum(latencies), 2),
+    }
+
+
+def _report(name: str, off: Dict[str, Any], on: Dict[str, Any]) -> None:
+    print(f"{name}:")
+    print(f"  off: {off}")
+    print(f"  on:  {on}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with FakeSerpApi(latency=args.latency, error_rate=0.3, seed=args.seed) as fake:
+        off = asyncio.run(_calls(SerpApi("fake", base_url=fake.url), args.calls))
+        retry = RetryPolicy(attempts=4, base_delay=0.01, max_delay=0.1)
+        on = asyncio.run(_calls(SerpApi("fake", base_url=fake.url, retry=retry), args.calls))
+    _report("flaky (30% HTTP 503), retries", off, on)
+
+    with FakeSerpApi(latency=args.latency, slow_rate=0.05, slow_latency=20 * args.latency, seed=args.seed) as fake:
+        off = asyncio.run(_calls(SerpApi("fake", base_url=fake.url), args.calls))
+        hedging = SerpApi("fake", base_url=fake.url, hedge=True, hedge_quantile=0.9)
+        for _ in range(hedging.latency.min_samples):
+            hedging.latency.add(args.latency)
+        on = asyncio.run(_calls(hedging, args.calls))
+        print(f"  hedged={hedging.hedged} hedge_wins={hedging.hedge_wins}")
+    _report("tail (5% at 20x latency), hedging", off, on)
+
+    with FakeSerpApi(latency=args.latency, outage=True) as fake:
+        retry = RetryPolicy(attempts=3, base_delay=0.05, max_delay=0.2)
+        off = asyncio.run(_calls(SerpApi("fake", base_url=fake.url, retry=retry), args.calls))
+        upstream_off: int = fake.request_count
+        breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+        on = asyncio.run(_calls(SerpApi("fake", base_url=fake.url, retry=retry, breaker=breaker), args.calls))
+        upstream_on: int = fake.request_count - upstream_off
+    _report("outage, circuit breaker", off, on)
+    print(f"  upstream calls: off={upstream_off} on={upstream_on}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Measure get_flights response size per response_format.
+
+Every fixture is served by the local fake SerpAPI and requested through
+the get_flights tool with ``response_format`` "full" and "compact", at each
+page size. Reports the JSON bytes as sent over MCP, approximate LLM tokens
+(tiktoken's cl100k_base when installed, else four characters per token)
+and median milliseconds per call. A final run with ``--max-tokens`` shows
+how many itineraries each format fits in that budget.
+
+Recorded fixtures carry real SerpAPI tokens; the synthetic ones have short
+placeholders, so they understate what the token handles save.
+
+Usage:
+    python -m benchmarks.bench_response --sizes small medium large --page-sizes 10 50 --max-tokens 2000 [--json out.json]
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Any, Callable, Dict, List
+
+from benchmarks.bench_pipeline import PARAMS, _configure
+from benchmarks.fake_serp import FakeSerpApi
+from benchmarks import fixtures
+
+FORMATS: List[str] = ["full", "compact"]
+
+
+def _token_counter() -> Callable[[str], int]:
+    try:
+        import tiktoken
+    except ImportError:
+        from models.compact import estimate_tokens
+        return estimate_tokens
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text))
+
+
+async def run(sizes: List[str], page_sizes: List[int], max_tokens: int, repeat: int) -> Dict[str, Any]:
+    """Measure each fixture, page size and format; returns ``{size: {page: {format: measurements}}}``."""
+    count_tokens: Callable[[str], int] = _token_counter()
+    results: Dict[str, Any] = {}
+    with FakeSerpApi(latency=0.0) as fake:
+        _configure(fake.url)
+        os.environ["FLIGHT_CACHE_ENABLED"] = "true"
+        from models.compact import compact_json
+        from tools import flights as tool_module
+        from apis import upstream
+
+        get_flights = getattr(tool_module.get_flights, "fn", tool_module.get_flights)
+        for size in sizes:
+            fake.response = fixtures.load(size)
+            await upstream.aclose()
+            results[size] = {}
+            for page_size in page_sizes + ["budget"]:
+                results[size][page_size] = {}
+                for response_format in FORMATS:
+                    arguments: Dict[str, Any] = {**PARAMS, "response_format": response_format}
+                    if page_size == "budget":
+                        arguments.update(page_size=max(page_sizes), max_tokens=max_tokens)
+                    else:
+                        arguments["page_size"] = page_size
+                    samples: List[float] = []
+                    for _ in range(repeat):
+                        start: float = time.perf_counter()
+                        response: Dict[str, Any] = await get_flights(**arguments)
+                        samples.append(1000 * (time.perf_counter() - start))
+                    if not response.get("success"):
+                        raise RuntimeError(response.get("error"))
+                    text: str = compact_json(response)
+                    flights: Any = response["flights"]
+                    results[size][page_size][response_format] = {
+                        "itineraries": len(flights["rows"] if response_format == "compact" else flights),
+                        "bytes": len(text.encode()),
+                        "tokens": count_tokens(text),
+                        "median_ms": round(statistics.median(samples), 3),
+                    }
+        await upstream.aclose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["small", "medium", "large"])
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--max-tokens", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = asyncio.run(run(args.sizes, args.page_sizes, args.max_tokens, args.repeat))
+    for size, pages in results.items():
+        print(f"{size}")
+        for page, formats in pages.items():
+            label: str = f"budget {args.max_tokens}" if page == "budget" else f"page {page}"
+            full, compact = formats["full"], formats["compact"]
+            for name, value in formats.items():
+                print(
+                    f"  {label:<12} {name:<8} {value['itineraries']:>4} itineraries {value['bytes']:>8} B"
+                    f" {value['tokens']:>7} tokens {value['median_ms']:>8.3f} ms"
+                )
+            if page != "budget":
+                print(f"  {'':<12} saved    {1 - compact['bytes'] / full['bytes']:>21.0%} {1 - compact['tokens'] / full['tokens']:>15.0%}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Measure cold-start cost: importing the server and serving the first tool call.
+
+Every run is a fresh interpreter (like a serverless cold start or a stdio
+spawn per session). It first builds a bare FastMCP server with one trivial
+tool and calls it, which pays fastmcp's own import and first-call costs,
+then does the same for this server. Reported (medians):
+
+* floor_import_ms: importing fastmcp and registering one trivial tool
+* import_ms:       ``import server`` on top of that (tool modules, registration)
+* floor_call_ms:   first in-memory client session and call to the trivial tool
+* first_call_ms:   first ``get_flights`` call against the local fake SerpAPI,
+                   which builds the shared upstream client
+
+import_ms and first_call_ms are the parts this repo controls. Registering
+the tools (FastMCP builds a JSON schema per tool) is most of import_ms;
+``MCP_TOOLS`` trims it. Importing httpx and opening the TLS context is most
+of first_call_ms.
+
+Targets (checked with --check), about 20% above the medians measured when
+the shared lazy client landed (import 140 ms, first call 160 ms; before it,
+import took 250 ms):
+    import_ms     <= 170
+    first_call_ms <= 200
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5 [--check] [--json out.json]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from typing import Any, Dict, List
+
+from benchmarks.fake_serp import FakeSerpApi
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS: Dict[str, float] = {"import_ms": 170.0, "first_call_ms": 200.0}
+
+CHILD: str = """
+import sys, json, time, asyncio
+start = time.perf_counter()
+from fastmcp import FastMCP, Client
+
+async def echo(value: int) -> dict:
+    return {"value": value}
+
+floor = FastMCP("floor")
+floor.tool()(echo)
+floor_done = time.perf_counter()
+import server
+import_done = time.perf_counter()
+
+async def call(mcp, name, arguments):
+    async with Client(mcp) as client:
+        result = await client.call_tool(name, arguments)
+        assert not result.is_error, result
+
+asyncio.run(call(floor, "echo", {"value": 1}))
+floor_call_done = time.perf_counter()
+asyncio.run(call(server.mcp, "get_flights", {
+    "departure_id": "JFK", "arrival_id": "LAX", "departure_date": "2026-12-01", "adults": 1,
+}))
+done = time.perf_counter()
+print(json.dumps({
+    "floor_import_ms": 1000 * (floor_done - start),
+    "import_ms": 1000 * (import_done - floor_done),
+    "floor_call_ms": 1000 * (floor_call_done - import_done),
+    "first_call_ms": 1000 * (done - floor_call_done),
+}))
+"""
+
+
+def _once(url: str) -> Dict[str, float]:
+    env: Dict[str, str] = {
+        **os.environ,
+        "PYTHONPATH": ROOT,
+        "SERP_API_KEY": os.environ.get("SERP_API_KEY", "benchmark"),
+        "SERP_API_URL": url,
+        "FLIGHT_CACHE_DB_PATH": "",
+        "FARE_HISTORY_DB_PATH": "",
+        "SERP_QUOTA_LIMIT": "0",
+    }
+    output: str = subprocess.run(
+        [sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs: int = 5) -> Dict[str, Any]:
+    """Median of each measurement over ``runs`` fresh interpreters."""
+    samples: List[Dict[str, float]] = []
+    with FakeSerpApi(latency=0.0) as fake:
+        for _ in range(runs):
+            samples.append(_once(fake.url))
+    return {
+        key: round(statistics.median(s[key] for s in samples), 1)
+        for key in ("floor_import_ms", "import_ms", "floor_call_ms", "first_call_ms")
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="exit 1 when a median misses its target")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = run(args.runs)
+    missed: List[str] = []
+    for key, value in results.items():
+        target: str = ""
+        if key in TARGETS:
+            ok: bool = value <= TARGETS[key]
+            target = f"  target <= {TARGETS[key]:.0f} {'ok' if ok else 'MISSED'}"
+            if not ok:
+                missed.append(key)
+        print(f"{key:<14} {value:>8.1f} ms{target}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.check and missed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measure serialize_flight, the path every tool uses to build result dicts.
+
+Each path turns the same raw SerpAPI rows into response dicts:
+
+* direct:    serialize_flight(row)
+* validated: serialize_flight(row) validated and dumped again through
+             FlightSearchResult; what output validation would cost if it
+             were turned on, not a path the tools take
+
+The validated output must equal the direct one, which checks that
+serialize_flight keeps the FlightSearchResult response shape. Reports time
+per row and peak traced allocation for each.
+
+Usage:
+    python -m benchmarks.bench_transform --rows 500 --repeat 20
+"""
+import os
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("SERP_API_KEY", "benchmark")
+
+from benchmarks.fake_serp import sample_response
+from models.flight import FlightSearchResult
+from models.itinerary import serialize_flight
+
+PATHS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "direct": serialize_flight,
+    "validated": lambda row: FlightSearchResult.model_validate(serialize_flight(row)).model_dump(mode="json"),
+}
+
+
+def _measure(fn: Callable[[Dict[str, Any]], Dict[str, Any]], rows: List[Dict[str, Any]], repeat: int) -> Dict[str, float]:
+    start: float = time.perf_counter()
+    for _ in range(repeat):
+        [fn(row) for row in rows]
+    elapsed: float = time.perf_counter() - start
+
+    tracemalloc.start()
+    [fn(row) for row in rows]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"us_per_row": elapsed / (repeat * len(rows)) * 1e6, "peak_kib": peak / 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    response: Dict[str, Any] = sample_response(best=3, other=max(args.rows - 3, 0))
+    rows: List[Dict[str, Any]] = response["best_flights"] + response["other_flights"]
+
+    reference: List[Dict[str, Any]] = [PATHS["validated"](row) for row in rows]
+    assert [serialize_flight(row) for row in rows] == reference, "serialize_flight output differs from FlightSearchResult"
+
+    baseline: float = 0.0
+    print(f"{len(rows)} rows x {args.repeat} repeats")
+    for name, fn in PATHS.items():
+        result: Dict[str, float] = _measure(fn, rows, args.repeat)
+        baseline = baseline or result["us_per_row"]
+        print(
+            f"{name:<10} {result['us_per_row']:8.2f} us/row  "
+            f"{baseline / result['us_per_row']:5.2f}x  peak {result['peak_kib']:8.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
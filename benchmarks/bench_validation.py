@@ -0,0 +1,127 @@
+"""
+Compare the ways of validating search parameters.
+
+Each path turns the same argument sets (a grid of routes, departure dates
+and trip lengths, as a batch or calendar search would build) into
+``FlightSearchParams``:
+
+* legacy:    strptime date checks, uncached enum lookups and
+             FlightSearchParams(...), as get_flights validated before
+             utils.validation (no airport table or date range checks)
+* single:    build_search per argument set
+* columnar:  one build_searches call for the whole grid
+
+Memoized checks are cleared before every repeat so each one starts cold.
+
+Usage:
+    python -m benchmarks.bench_validation --searches 5000 --repeat 5
+"""
+import os
+import time
+import argparse
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("SERP_API_KEY", "benchmark")
+
+from models.flight import CabinClassParam, FlightSearchParams, FlightTypeParam, StopsParam, _parse_param
+from utils import validation
+from utils.validate_date import parse_date
+
+ROUTES: List[tuple] = [
+    ("JFK", "LAX"), ("JFK", "SFO"), ("EWR", "LHR"), ("BOS", "CDG"), ("ORD", "DEN"),
+    ("ATL", "MIA"), ("SEA", "HNL"), ("LAX", "NRT"), ("DFW", "MEX"), ("IAD", "FRA"),
+]
+
+
+def _grid(size: int) -> List[Dict[str, Any]]:
+    start: date = date.today() + timedelta(days=30)
+    searches: List[Dict[str, Any]] = []
+    i: int = 0
+    while len(searches) < size:
+        origin, destination = ROUTES[i % len(ROUTES)]
+        departure: date = start + timedelta(days=(i // len(ROUTES)) % 60)
+        nights: int = 3 + (i // (len(ROUTES) * 60)) % 7
+        searches.append({
+            "departure_id": origin,
+            "arrival_id": destination,
+            "departure_date": departure.isoformat(),
+            "return_date": (departure + timedelta(days=nights)).isoformat(),
+            "adults": 1,
+            "flight_type": "round_trip",
+            "cabin_class": "economy",
+            "no_stops": "any",
+        })
+        i += 1
+    return searches
+
+
+def _legacy(searches: List[Dict[str, Any]]) -> List[FlightSearchParams]:
+    params: List[FlightSearchParams] = []
+    for s in searches:
+        # validate_date, then the model's field validator, each ran strptime
+        for _ in range(2):
+            datetime.strptime(s["departure_date"], "%Y-%m-%d")
+            datetime.strptime(s["return_date"], "%Y-%m-%d")
+        params.append(FlightSearchParams(
+            departure_id=s["departure_id"],
+            arrival_id=s["arrival_id"],
+            departure_date=s["departure_date"],
+            return_date=s["return_date"],
+            adults=s["adults"],
+            type=FlightTypeParam[s["flight_type"].strip().upper()],
+            cabin_class=CabinClassParam[s["cabin_class"].strip().upper()],
+            stops=StopsParam[s["no_stops"].strip().upper()],
+        ))
+    return params
+
+
+def _single(searches: List[Dict[str, Any]]) -> List[FlightSearchParams]:
+    return [validation.build_search(**s) for s in searches]
+
+
+def _columnar(searches: List[Dict[str, Any]]) -> List[FlightSearchParams]:
+    params, errors = validation.build_searches(searches)
+    assert not errors, errors
+    return params
+
+
+PATHS: Dict[str, Callable[[List[Dict[str, Any]]], List[FlightSearchParams]]] = {
+    "legacy": _legacy,
+    "single": _single,
+    "columnar": _columnar,
+}
+
+
+def _clear() -> None:
+    for cached in (parse_date, _parse_param, validation.airport, validation.trip_dates, validation.passengers):
+        cached.cache_clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    searches: List[Dict[str, Any]] = _grid(args.searches)
+    reference: List[Dict[str, Any]] = [p.model_dump() for p in _legacy(searches)]
+    for name, fn in PATHS.items():
+        assert [p.model_dump() for p in fn(searches)] == reference, f"{name} output differs from the legacy path"
+
+    baseline: float = 0.0
+    print(f"{len(searches)} searches x {args.repeat} repeats")
+    for name, fn in PATHS.items():
+        elapsed: float = 0.0
+        for _ in range(args.repeat):
+            _clear()
+            start: float = time.perf_counter()
+            fn(searches)
+            elapsed += time.perf_counter() - start
+        us: float = elapsed / (args.repeat * len(searches)) * 1e6
+        baseline = baseline or us
+        print(f"{name:<10} {us:8.2f} us/search  {baseline / us:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Local stand-in for the shared key-value store.
+
+Speaks just enough of the Redis protocol (RESP2, and RESP3 after HELLO)
+for ``RedisBackend``: GET, SET with PX/EX/NX, PEXPIRE, DEL, PING and the
+connection handshake. Lets the multi-worker mode be exercised with
+``SHARED_BACKEND=redis`` and ``SHARED_URL`` pointing here, without a
+Redis server.
+"""
+import time
+import threading
+import socketserver
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeKeyValue:
+    """
+    Threaded RESP server keeping keys in memory.
+
+    Args:
+        host (str): Interface to bind. Defaults to loopback.
+        port (int): Port to bind; 0 picks a free one.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.commands: Dict[str, int] = {}
+        self._data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        item: Optional[Tuple[bytes, Optional[float]]] = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= time.time():
+            del self._data[key]
+            return None
+        return item[0]
+
+    def execute(self, args: List[bytes]) -> Any:
+        """Run one command; returns the reply (bytes, int, None, or an Exception for an error reply)."""
+        name: str = args[0].decode().upper()
+        with self._lock:
+            self.commands[name] = self.commands.get(name, 0) + 1
+            if name == "PING":
+                return b"PONG"
+            if name in ("CLIENT", "SELECT"):
+                return b"OK"
+            if name == "HELLO":
+                return {b"server": b"fake-kv", b"version": b"7.2.0", b"proto": int(args[1]) if len(args) > 1 else 2}
+            if name == "GET":
+                return self._live(args[1])
+            if name == "DEL":
+                removed: int = 0
+                for key in args[1:]:
+                    if self._live(key) is not None:
+                        del self._data[key]
+                        removed += 1
+                return removed
+            if name == "PEXPIRE":
+                live: Optional[bytes] = self._live(args[1])
+                if live is None:
+                    return 0
+                self._data[args[1]] = (live, time.time() + int(args[2]) / 1000)
+                return 1
+            if name == "SET":
+                key, value = args[1], args[2]
+                expires_at: Optional[float] = None
+                nx: bool = False
+                options: List[str] = [a.decode().upper() for a in args[3:]]
+                for i, option in enumerate(options):
+                    if option == "PX":
+                        expires_at = time.time() + int(options[i + 1]) / 1000
+                    elif option == "EX":
+                        expires_at = time.time() + int(options[i + 1])
+                    elif option == "NX":
+                        nx = True
+                if nx and self._live(key) is not None:
+                    return None
+                self._data[key] = (value, expires_at)
+                return b"OK"
+            return ValueError(f"unknown command '{name}'")
+
+    def _handler(self) -> type:
+        fake = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def read_command(self) -> Optional[List[bytes]]:
+                line: bytes = self.rfile.readline()
+                if not line:
+                    return None
+                if not line.startswith(b"*"):
+                    return line.split()
+                args: List[bytes] = []
+                for _ in range(int(line[1:])):
+                    size: int = int(self.rfile.readline()[1:])
+                    args.append(self.rfile.read(size + 2)[:-2])
+                return args
+
+            def encode(self, reply: Any, resp3: bool) -> bytes:
+                if isinstance(reply, Exception):
+                    return b"-ERR " + str(reply).encode() + b"\r\n"
+                if reply is None:
+                    return b"_\r\n" if resp3 else b"$-1\r\n"
+                if isinstance(reply, int):
+                    return b":" + str(reply).encode() + b"\r\n"
+                if isinstance(reply, dict):
+                    items: List[Any] = [part for pair in reply.items() for part in pair]
+                    head: bytes = b"%" + str(len(reply)).encode() if resp3 else b"*" + str(len(items)).encode()
+                    return head + b"\r\n" + b"".join(self.encode(item, resp3) for item in items)
+                if reply in (b"OK", b"PONG"):
+                    return b"+" + reply + b"\r\n"
+                return b"$" + str(len(reply)).encode() + b"\r\n" + reply + b"\r\n"
+
+            def handle(self) -> None:
+                resp3: bool = False
+                while True:
+                    try:
+                        args: Optional[List[bytes]] = self.read_command()
+                    except (ConnectionError, ValueError):
+                        return
+                    if not args:
+                        return
+                    reply: Any = fake.execute(args)
+                    if isinstance(reply, dict):
+                        resp3 = reply[b"proto"] == 3
+                    out: bytes = self.encode(reply, resp3)
+                    try:
+                        self.wfile.write(out)
+                    except (BrokenPipeError, ConnectionResetError):
+                        return
+
+        return Handler
+
+    def start(self) -> "FakeKeyValue":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeKeyValue":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    with FakeKeyValue(port=args.port) as kv:
+        print(f"Listening on {kv.url}")
+        threading.Event().wait()
@@ -0,0 +1,215 @@
+"""
+Local stand-in for the SerpAPI Google Flights endpoint.
+
+Serves canned ``google_flights`` responses over HTTP with a configurable
+latency so the client can be exercised without spending real API calls.
+Faults (error statuses, slow tails, dropped connections, outages) can be
+injected to exercise retries, hedging and the circuit breaker.
+"""
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def sample_flight(index: int, departure_id: str = "JFK", arrival_id: str = "LAX") -> Dict[str, Any]:
+    """Build one itinerary shaped like a SerpAPI ``best_flights`` row; odd rows connect via ORD."""
+    def segment(origin: str, destination: str, departs: str, arrives: str, minutes: int, number: int) -> Dict[str, Any]:
+        return {
+            "departure_airport": {"name": "Departure", "id": origin, "time": departs},
+            "arrival_airport": {"name": "Arrival", "id": destination, "time": arrives},
+            "duration": minutes,
+            "airplane": "Airbus A321",
+            "airline": "Fake Air",
+            "airline_logo": "https://www.gstatic.com/flights/airline_logos/70px/FA.png",
+            "travel_class": "Economy",
+            "flight_number": f"FA {number}",
+            "legroom": "30 in",
+            "extensions": ["Average legroom (30 in)", "Wi-Fi for a fee", "In-seat USB outlet"],
+        }
+
+    row: Dict[str, Any] = {
+        "total_duration": 390 + index,
+        "carbon_emissions": {"this_flight": 250000, "typical_for_this_route": 260000, "difference_percent": -4},
+        "price": 200 + index,
+        "type": "One way",
+        "airline_logo": "https://www.gstatic.com/flights/airline_logos/70px/FA.png",
+        "departure_token": f"departure-token-{index}",
+        "booking_token": f"booking-token-{index}",
+    }
+    if index % 2:
+        row["flights"] = [
+            segment(departure_id, "ORD", "2026-11-20 08:00", "2026-11-20 09:45", 165, 100 + index),
+            segment("ORD", arrival_id, "2026-11-20 11:00", "2026-11-20 13:30", 270, 2000 + index),
+        ]
+        row["layovers"] = [{"duration": 75, "name": "O'Hare International Airport", "id": "ORD"}]
+        row["total_duration"] = 510 + index
+    else:
+        row["flights"] = [segment(departure_id, arrival_id, "2026-11-20 08:00", "2026-11-20 11:30", 390 + index, 100 + index)]
+    return row
+
+
+def sample_response(
+    best: int = 3,
+    other: int = 20,
+    departure_id: str = "JFK",
+    arrival_id: str = "LAX"
+) -> Dict[str, Any]:
+    """Build a full Google Flights response with ``best`` + ``other`` rows."""
+    return {
+        "search_metadata": {"status": "Success"},
+        "best_flights": [sample_flight(i, departure_id, arrival_id) for i in range(best)],
+        "other_flights": [sample_flight(best + i, departure_id, arrival_id) for i in range(other)],
+    }
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class FakeSerpApi:
+    """
+    Threaded HTTP server answering ``/search.json`` like SerpAPI.
+
+    Fault attributes may be changed while the server runs.
+
+    Args:
+        latency (float): Seconds to wait before answering each request.
+        response (Optional[Dict[str, Any]]): Body to return. Defaults to ``sample_response()``.
+        host (str): Interface to bind. Defaults to loopback.
+        port (int): Port to bind; 0 picks a free one.
+        error_rate (float): Fraction of requests answered with ``error_status``. Defaults to 0.
+        error_status (int): HTTP status of injected errors. Defaults to 503.
+        slow_rate (float): Fraction of requests delayed by ``slow_latency`` instead of ``latency``. Defaults to 0.
+        slow_latency (float): Seconds to wait on slow requests. Defaults to 5.
+        reset_rate (float): Fraction of requests whose connection is dropped without an answer. Defaults to 0.
+        outage (bool): Answer every request with ``error_status``. Defaults to False.
+        seed (Optional[int]): Seed for the fault dice. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        response: Optional[Dict[str, Any]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        slow_rate: float = 0.0,
+        slow_latency: float = 5.0,
+        reset_rate: float = 0.0,
+        outage: bool = False,
+        seed: Optional[int] = None
+    ) -> None:
+        self.latency: float = latency
+        self.response: Dict[str, Any] = response if response is not None else sample_response()
+        self.error_rate: float = error_rate
+        self.error_status: int = error_status
+        self.slow_rate: float = slow_rate
+        self.slow_latency: float = slow_latency
+        self.reset_rate: float = reset_rate
+        self.outage: bool = outage
+        self.requests: List[Dict[str, str]] = []
+        self._fail_next: List[int] = []
+        self._slow_next: int = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/search.json"
+
+    @property
+    def request_count(self) -> int:
+        with self._lock:
+            return len(self.requests)
+
+    def _record(self, query: Dict[str, str]) -> None:
+        with self._lock:
+            self.requests.append(query)
+
+    def fail_next(self, count: int = 1, status: Optional[int] = None) -> None:
+        """Answer the next ``count`` requests with ``status`` (defaults to ``error_status``)."""
+        with self._lock:
+            self._fail_next.extend([status or self.error_status] * count)
+
+    def slow_next(self, count: int = 1) -> None:
+        """Answer the next ``count`` requests after ``slow_latency``."""
+        with self._lock:
+            self._slow_next += count
+
+    def _plan(self) -> Tuple[str, float, int]:
+        """Decide how to answer one request: ``(action, delay, status)``."""
+        with self._lock:
+            if self._fail_next:
+                return "error", self.latency, self._fail_next.pop(0)
+            if self.outage:
+                return "error", self.latency, self.error_status
+            if self._slow_next:
+                self._slow_next -= 1
+                return "ok", self.slow_latency, 200
+            roll: float = self._random.random()
+            delay: float = self.slow_latency if self._random.random() < self.slow_rate else self.latency
+        if roll < self.reset_rate:
+            return "reset", delay, 0
+        if roll < self.reset_rate + self.error_rate:
+            return "error", delay, self.error_status
+        return "ok", delay, 200
+
+    def _handler(self) -> type:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                from urllib.parse import urlsplit, parse_qsl
+
+                query: Dict[str, str] = dict(parse_qsl(urlsplit(self.path).query))
+                fake._record(query)
+                action, delay, status = fake._plan()
+                time.sleep(delay)
+
+                if action == "reset":
+                    self.close_connection = True
+                    self.connection.close()
+                    return
+                if action == "error":
+                    body: bytes = json.dumps({"error": f"Injected fault (HTTP {status})"}).encode()
+                else:
+                    body = json.dumps(fake.response).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (timeout or cancellation).
+                    pass
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeSerpApi":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeSerpApi":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
@@ -0,0 +1,95 @@
+"""
+Google Flights responses for benchmarks, from small to very large.
+
+``load(name)`` replays ``benchmarks/fixtures/<name>.json`` when a recorded
+response exists and otherwise builds a deterministic synthetic one of the
+same size, so benchmarks run offline and give comparable numbers.
+
+Record a real response (spends one SerpAPI call):
+    SERP_API_KEY=... python -m benchmarks.fixtures record large --from JFK --to LAX --date 2026-11-20
+
+Write the synthetic fixtures to disk:
+    python -m benchmarks.fixtures generate
+"""
+import os
+import json
+import argparse
+import asyncio
+from typing import Any, Dict
+
+from benchmarks.fake_serp import sample_response
+
+FIXTURE_DIR: str = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Number of other_flights rows per fixture; every fixture has 3 best_flights.
+SIZES: Dict[str, int] = {
+    "small": 10,
+    "medium": 50,
+    "large": 250,
+    "xlarge": 1000,
+}
+
+
+def path(name: str) -> str:
+    return os.path.join(FIXTURE_DIR, f"{name}.json")
+
+
+def load(name: str) -> Dict[str, Any]:
+    """Recorded response ``name`` if present, else a synthetic one of that size."""
+    if os.path.exists(path(name)):
+        with open(path(name)) as f:
+            return json.load(f)
+    if name not in SIZES:
+        raise ValueError(f"Invalid fixture '{name}'. Must be one of {list(SIZES)} or a recorded fixture.")
+    return sample_response(best=3, other=SIZES[name])
+
+
+def _save(name: str, response: Dict[str, Any]) -> None:
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    with open(path(name), "w") as f:
+        json.dump(response, f)
+    rows: int = len(response.get("best_flights", [])) + len(response.get("other_flights", []))
+    print(f"wrote {path(name)} ({rows} rows)")
+
+
+async def _record(args: argparse.Namespace) -> Dict[str, Any]:
+    from apis.serp import SerpApi
+    from models.flight import FlightSearchParams
+
+    serp = SerpApi(api_key=os.environ["SERP_API_KEY"])
+    params = FlightSearchParams(
+        departure_id=getattr(args, "from"),
+        arrival_id=args.to,
+        departure_date=args.date,
+        return_date=args.return_date,
+        type=1 if args.return_date else 2
+    )
+    try:
+        response: Dict[str, Any] = await serp._fetch_http(serp._build_params(params), serp.timeout)
+    finally:
+        await serp.aclose()
+    # Keep only the parts the server reads; drop metadata that embeds account details.
+    return {key: response[key] for key in ("best_flights", "other_flights") if key in response}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("generate", help="write synthetic fixtures for every size")
+    record = commands.add_parser("record", help="record a live SerpAPI response")
+    record.add_argument("name")
+    record.add_argument("--from", required=True)
+    record.add_argument("--to", required=True)
+    record.add_argument("--date", required=True)
+    record.add_argument("--return-date")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        for name, other in SIZES.items():
+            _save(name, sample_response(best=3, other=other))
+    else:
+        _save(args.name, asyncio.run(_record(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Run the benchmark suite and compare results between commits.
+
+``run`` executes the pipeline benchmark over every fixture size and a load
+test, then writes one JSON document tagged with the commit it ran on.
+``compare`` diffs two such documents and exits non-zero when a metric got
+worse by more than ``--threshold`` percent.
+
+Usage:
+    python -m benchmarks.suite run --output bench-$(git rev-parse --short HEAD).json
+    python -m benchmarks.suite compare bench-base.json bench-head.json --threshold 10
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+from typing import Any, Dict, List, Tuple
+
+from benchmarks import fixtures
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Metrics where a larger value is better; every other number is a cost.
+HIGHER_IS_BETTER: Tuple[str, ...] = ("throughput_rps",)
+# Counts that describe the workload rather than its performance.
+IGNORED: Tuple[str, ...] = ("rows", "calls")
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _bench(module: str, *args: str) -> Dict[str, Any]:
+    """Run one benchmark in a fresh interpreter so the server is configured for it alone."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output: str = os.path.join(tmp, "result.json")
+        env: Dict[str, str] = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.getenv("PYTHONPATH")]))}
+        subprocess.run(
+            [sys.executable, "-m", f"benchmarks.{module}", *args, "--json", output],
+            cwd=tmp, env=env, check=True, stdout=subprocess.DEVNULL
+        )
+        with open(output) as f:
+            return json.load(f)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    pipeline: Dict[str, Any] = _bench("bench_pipeline", "--sizes", *args.sizes, "--repeat", str(args.repeat))
+    load: Dict[str, Any] = _bench(
+        "bench_load",
+        "--clients", str(args.clients),
+        "--calls", str(args.calls),
+        "--latency", str(args.latency),
+        "--routes", str(args.routes),
+        "--fixture", args.fixture,
+    )
+    return {
+        "meta": {
+            "commit": _git("rev-parse", "--short", "HEAD"),
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": vars(args),
+        },
+        "pipeline": pipeline,
+        "load": load,
+    }
+
+
+def _flatten(data: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+    for key, value in data.items():
+        name: str = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and key not in IGNORED:
+            flat[name] = float(value)
+    return flat
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a metric-by-metric diff and return the names of regressed metrics."""
+    before: Dict[str, float] = _flatten({k: v for k, v in base.items() if k != "meta"})
+    after: Dict[str, float] = _flatten({k: v for k, v in head.items() if k != "meta"})
+    print(f"base {base['meta']['commit']}  ->  head {head['meta']['commit']}")
+
+    regressions: List[str] = []
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name], after[name]
+        change: float = (new - old) / old * 100 if old else 0.0
+        worse: float = -change if name.endswith(HIGHER_IS_BETTER) else change
+        flag: str = ""
+        if worse > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif worse < -threshold:
+            flag = "  improved"
+        print(f"{name:<40} {old:>12.3f} {new:>12.3f} {change:>+8.1f}%{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runner = commands.add_parser("run", help="run the suite and write JSON results")
+    runner.add_argument("--output", required=True)
+    runner.add_argument("--sizes", nargs="+", default=list(fixtures.SIZES))
+    runner.add_argument("--repeat", type=int, default=5)
+    runner.add_argument("--clients", type=int, default=20)
+    runner.add_argument("--calls", type=int, default=10)
+    runner.add_argument("--latency", type=float, default=0.2)
+    runner.add_argument("--routes", type=int, default=10)
+    runner.add_argument("--fixture", default="medium", choices=list(fixtures.SIZES))
+
+    comparer = commands.add_parser("compare", help="diff two result files")
+    comparer.add_argument("base")
+    comparer.add_argument("head")
+    comparer.add_argument("--threshold", type=float, default=10.0, help="percent change that counts as a regression")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        settings = argparse.Namespace(**{k: v for k, v in vars(args).items() if k not in ("command", "output")})
+        results: Dict[str, Any] = run(settings)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"wrote {args.output} ({results['meta']['commit']})")
+    else:
+        with open(args.base) as f:
+            base: Dict[str, Any] = json.load(f)
+        with open(args.head) as f:
+            head: Dict[str, Any] = json.load(f)
+        regressions: List[str] = compare(base, head, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.threshold}%")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Multi-worker deployment: several server processes behind a session router.
+
+    python cluster.py
+
+starts ``MCP_WORKERS`` workers (default: one per core), each running this
+server on FastMCP's HTTP transport (``MCP_TRANSPORT``: streamable "http" by
+default, or legacy "sse") on its own port from ``MCP_WORKER_PORT`` up. The
+router listens on ``MCP_HOST:MCP_PORT`` and forwards every request to a
+worker:
+
+* a request without a session (``initialize``) goes to the least busy worker
+* the session id the worker hands out (the ``mcp-session-id`` header, or
+  the ``session_id`` in the SSE endpoint event) is recorded, and every
+  later request of that session goes to the same worker, since the
+  session lives in that worker's memory
+* with a shared backend (``SHARED_BACKEND``) the routing table is kept
+  there as well, so routers on several nodes can each forward any session
+  to the worker that owns it; ``MCP_WORKER_HOST`` must then be an address
+  the other nodes can reach
+
+With ``MCP_STATELESS=true`` workers keep no sessions and requests are
+simply spread across them.
+
+Workers share cached searches and in-flight upstream calls through the
+shared backend. With the default in-memory backend each worker has its
+own cache and the same search can be fetched once per worker.
+"""
+import os
+import re
+import sys
+import time
+import signal
+import asyncio
+import logging
+import itertools
+import contextlib
+import subprocess
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from data.shared import is_shared, shared_backend
+
+MCP_HOST: str = os.getenv("MCP_HOST", "127.0.0.1")
+MCP_PORT: int = int(os.getenv("MCP_PORT", "8000"))
+MCP_TRANSPORT: str = os.getenv("MCP_TRANSPORT", "http")
+MCP_WORKERS: int = int(os.getenv("MCP_WORKERS", str(os.cpu_count() or 1)))
+MCP_WORKER_HOST: str = os.getenv("MCP_WORKER_HOST", "127.0.0.1")
+MCP_WORKER_PORT: int = int(os.getenv("MCP_WORKER_PORT", str(MCP_PORT + 1)))
+
+# Headers that describe one connection and are not forwarded.
+HOP_BY_HOP: frozenset = frozenset({
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailer",
+    "transfer-encoding", "upgrade", "host", "content-length",
+})
+
+# Set by the router's own server on every response.
+SERVER_HEADERS: frozenset = frozenset({"date", "server"})
+
+_SSE_SESSION = re.compile(rb"session_id=([0-9A-Za-z_-]+)")
+
+logger = logging.getLogger(__name__)
+
+def worker_app() -> Any:
+    """ASGI app for one worker, for ``uvicorn --factory cluster:worker_app``."""
+    from server import mcp
+    return mcp.http_app(
+        path=os.getenv("MCP_PATH") or None,
+        transport=MCP_TRANSPORT,
+        stateless_http=os.getenv("MCP_STATELESS", "false").lower() == "true"
+    )
+
+class SessionRouter:
+    """
+    Reverse proxy that pins each MCP session to the worker that created it.
+
+    Sessions idle for longer than ``session_ttl`` are forgotten; a request
+    for an unknown session gets 404, which tells MCP clients to start a new
+    one.
+    """
+
+    def __init__(self, workers: List[str], backend: Optional[Any] = None, session_ttl: float = 3600.0) -> None:
+        self.workers: List[str] = workers
+        self.backend: Optional[Any] = backend
+        self.session_ttl: float = session_ttl
+        self.routed: int = 0
+        self.unknown: int = 0
+        self.failed: int = 0
+        self._sessions: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._owned: Dict[str, int] = {w: 0 for w in workers}
+        self._active: Dict[str, int] = {w: 0 for w in workers}
+        self._turn = itertools.count()
+        self._client: httpx.AsyncClient = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, read=None), limits=httpx.Limits(max_connections=None)
+        )
+
+    @classmethod
+    def from_env(cls, workers: List[str]) -> "SessionRouter":
+        """Build a router from the ``MCP_*`` environment variables; the routing table is shared with ``SHARED_BACKEND``."""
+        return cls(
+            workers=workers,
+            backend=shared_backend() if is_shared() else None,
+            session_ttl=float(os.getenv("MCP_SESSION_TTL", "3600"))
+        )
+
+    def pick(self) -> str:
+        """Worker for a new session: fewest sessions plus in-flight requests, rotating between ties."""
+        start: int = next(self._turn) % len(self.workers)
+        rotated: List[str] = self.workers[start:] + self.workers[:start]
+        return min(rotated, key=lambda w: self._owned[w] + self._active[w])
+
+    async def route(self, session_id: str) -> Optional[str]:
+        """Worker that owns ``session_id``, or None when it is unknown or expired."""
+        now: float = time.monotonic()
+        entry: Optional[Tuple[str, float]] = self._sessions.get(session_id)
+        if entry is not None and now - entry[1] <= self.session_ttl:
+            self._sessions[session_id] = (entry[0], now)
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+        # Backend calls are network round trips; keep them off the event loop
+        worker: Optional[str] = (
+            await asyncio.to_thread(self.backend.get, "session:" + session_id) if self.backend is not None else None
+        )
+        if worker is not None:
+            await self.remember(session_id, worker, publish=False)
+        elif entry is not None:
+            await self.forget(session_id)
+        return worker
+
+    async def remember(self, session_id: str, worker: str, publish: bool = True) -> None:
+        self._expire()
+        if session_id not in self._sessions and worker in self._owned:
+            self._owned[worker] += 1
+        self._sessions[session_id] = (worker, time.monotonic())
+        self._sessions.move_to_end(session_id)
+        if publish and self.backend is not None:
+            await asyncio.to_thread(self.backend.set, "session:" + session_id, worker, self.session_ttl)
+
+    async def forget(self, session_id: str) -> None:
+        entry: Optional[Tuple[str, float]] = self._sessions.pop(session_id, None)
+        if entry is not None and entry[0] in self._owned:
+            self._owned[entry[0]] -= 1
+        if self.backend is not None:
+            await asyncio.to_thread(self.backend.delete, "session:" + session_id)
+
+    def _expire(self) -> None:
+        """Drop sessions idle past the TTL; the table is kept in last-used order."""
+        cutoff: float = time.monotonic() - self.session_ttl
+        while self._sessions:
+            session_id, (worker, last_used) = next(iter(self._sessions.items()))
+            if last_used > cutoff:
+                break
+            self._sessions.popitem(last=False)
+            if worker in self._owned:
+                self._owned[worker] -= 1
+
+    async def handle(self, request: Request) -> Response:
+        session_id: Optional[str] = request.headers.get("mcp-session-id") or request.query_params.get("session_id")
+        worker: Optional[str] = await self.route(session_id) if session_id else self.pick()
+        if worker is None:
+            self.unknown += 1
+            return PlainTextResponse("Session not found", status_code=404)
+
+        url: str = worker + request.url.path + (f"?{request.url.query}" if request.url.query else "")
+        headers: List[Tuple[bytes, bytes]] = [
+            (k, v) for k, v in request.headers.raw if k.decode("latin-1").lower() not in HOP_BY_HOP
+        ]
+        forwarded = self._client.build_request(request.method, url, headers=headers, content=request.stream())
+        self._active[worker] = self._active.get(worker, 0) + 1
+        try:
+            response: httpx.Response = await self._client.send(forwarded, stream=True)
+        except httpx.TransportError as e:
+            self._active[worker] -= 1
+            self.failed += 1
+            logger.warning("Worker %s unavailable: %s", worker, e)
+            return PlainTextResponse("Worker unavailable", status_code=502)
+        self.routed += 1
+
+        new_session: Optional[str] = response.headers.get("mcp-session-id")
+        if new_session is not None and new_session != session_id:
+            await self.remember(new_session, worker)
+        if request.method == "DELETE" and session_id and response.status_code < 300:
+            await self.forget(session_id)
+
+        body: AsyncIterator[bytes] = response.aiter_raw()
+        if session_id is None and request.method == "GET" and "text/event-stream" in response.headers.get("content-type", ""):
+            # Legacy SSE announces its session inside the stream, and it ends with the stream.
+            body = self._sse_session(body, worker)
+
+        async def close() -> None:
+            self._active[worker] -= 1
+            await response.aclose()
+
+        return StreamingResponse(
+            body,
+            status_code=response.status_code,
+            headers={
+                k: v for k, v in response.headers.items() if k.lower() not in HOP_BY_HOP and k.lower() not in SERVER_HEADERS
+            },
+            background=BackgroundTask(close)
+        )
+
+    async def _sse_session(self, body: AsyncIterator[bytes], worker: str) -> AsyncIterator[bytes]:
+        session_id: Optional[str] = None
+        try:
+            async for chunk in body:
+                if session_id is None:
+                    match = _SSE_SESSION.search(chunk)
+                    if match is not None:
+                        session_id = match.group(1).decode()
+                        await self.remember(session_id, worker)
+                yield chunk
+        finally:
+            if session_id is not None:
+                await self.forget(session_id)
+
+    async def stats(self, request: Request) -> Response:
+        return PlainTextResponse(
+            f"workers {len(self.workers)}\nsessions {len(self._sessions)}\n"
+            f"routed {self.routed}\nunknown {self.unknown}\nfailed {self.failed}\n"
+        )
+
+    def app(self, *background: Callable[[], Awaitable[None]]) -> Starlette:
+        """The router as an ASGI app; ``background`` coroutines run for the app's lifetime."""
+        @contextlib.asynccontextmanager
+        async def lifespan(app: Starlette) -> AsyncIterator[None]:
+            tasks: List[asyncio.Task] = [asyncio.create_task(fn()) for fn in background]
+            try:
+                yield
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await self._client.aclose()
+
+        methods: List[str] = ["GET", "POST", "DELETE", "PUT", "PATCH", "OPTIONS", "HEAD"]
+        return Starlette(
+            routes=[
+                Route("/_router", self.stats, methods=["GET"]),
+                Route("/{path:path}", self.handle, methods=methods),
+            ],
+            lifespan=lifespan
+        )
+
+def _spawn(port: int) -> subprocess.Popen:
+    # Every worker would poll the same stored price watches; leave them off unless asked for.
+    env: Dict[str, str] = {"WATCH_ENABLED": "false", **os.environ}
+    return subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "cluster:worker_app", "--factory",
+        "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+        "--host", MCP_WORKER_HOST, "--port", str(port),
+        "--log-level", os.getenv("MCP_LOG_LEVEL", "warning"), "--no-access-log",
+        # Open SSE streams would otherwise hold a stopping worker forever.
+        "--timeout-graceful-shutdown", "5",
+    ], env=env)
+
+async def _supervise(workers: Dict[int, subprocess.Popen]) -> None:
+    """Restart workers that exit, at most once per second each."""
+    while True:
+        await asyncio.sleep(1.0)
+        for port, process in list(workers.items()):
+            if process.poll() is not None:
+                logger.warning("Worker on port %d exited with %s; restarting", port, process.returncode)
+                workers[port] = _spawn(port)
+
+def main() -> None:
+    if MCP_TRANSPORT not in ("http", "streamable-http", "sse"):
+        raise ValueError(f"Invalid MCP_TRANSPORT '{MCP_TRANSPORT}'. Must be one of ['http', 'streamable-http', 'sse'].")
+    logging.basicConfig(level=os.getenv("MCP_LOG_LEVEL", "warning").upper())
+    if MCP_WORKERS > 1 and not is_shared():
+        logger.warning("SHARED_BACKEND is 'memory': each of the %d workers keeps its own cache", MCP_WORKERS)
+
+    ports: List[int] = [MCP_WORKER_PORT + i for i in range(MCP_WORKERS)]
+    workers: Dict[int, subprocess.Popen] = {port: _spawn(port) for port in ports}
+    router: SessionRouter = SessionRouter.from_env([f"http://{MCP_WORKER_HOST}:{port}" for port in ports])
+    # uvicorn re-raises the signal that stopped it; exit normally so the workers below are stopped too.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        uvicorn.run(router.app(lambda: _supervise(workers)), host=MCP_HOST, port=MCP_PORT, log_level=os.getenv("MCP_LOG_LEVEL", "warning"))
+    finally:
+        for process in workers.values():
+            process.terminate()
+        for process in workers.values():
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+if __name__ == "__main__":
+    main()
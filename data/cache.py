@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from data.db import CacheStore
+from data.shared import SharedStore, is_shared, shared_backend
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float
+    stale_at: float
+    expires_at: float
+    size: int
+
+    @property
+    def age(self) -> float:
+        """Seconds since the entry was stored."""
+        return time.time() - self.stored_at
+
+    @property
+    def stale(self) -> bool:
+        """Past its TTL but still servable while a refresh runs."""
+        return time.time() >= self.stale_at
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+class FlightCache:
+    """
+    In-memory TTL cache with LRU eviction bounded by entry count and bytes.
+
+    Entries are fresh for ``ttl`` seconds and then stale for another
+    ``stale_ttl`` seconds, during which they are only returned to callers that
+    accept stale data (stale-while-revalidate). Entries are sized by their
+    JSON encoding. When a ``CacheStore`` is given, writes go through to disk
+    and memory misses fall back to it, so entries survive restarts. A
+    ``SharedStore`` plugs in the same way and shares entries between worker
+    processes. Store calls run in a worker thread so disk and network I/O
+    never blocks the event loop; memory hits stay synchronous.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 900.0,
+        stale_ttl: float = 0.0,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        store: Optional[CacheStore | SharedStore] = None
+    ) -> None:
+        self.ttl: float = ttl
+        self.stale_ttl: float = stale_ttl
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.store: Optional[CacheStore | SharedStore] = store
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes: int = 0
+
+    @classmethod
+    def from_env(cls) -> "FlightCache":
+        """
+        Build a cache configured from the ``FLIGHT_CACHE_*`` environment variables.
+
+        With a shared backend (``SHARED_BACKEND``) entries are written through
+        to it instead of the SQLite file at ``FLIGHT_CACHE_DB_PATH``.
+        """
+        path: Optional[str] = os.getenv("FLIGHT_CACHE_DB_PATH")
+        store: Optional[CacheStore | SharedStore] = (
+            SharedStore(shared_backend()) if is_shared() else CacheStore(path) if path else None
+        )
+        return cls(
+            ttl=float(os.getenv("FLIGHT_CACHE_TTL", "900")),
+            stale_ttl=float(os.getenv("FLIGHT_CACHE_STALE_TTL", "3600")),
+            max_entries=int(os.getenv("FLIGHT_CACHE_MAX_ENTRIES", "1024")),
+            max_bytes=int(os.getenv("FLIGHT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            store=store
+        )
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return the in-memory entry without touching LRU order or hit counters."""
+        entry: Optional[CacheEntry] = self._entries.get(key)
+        return entry if entry is not None and not entry.expired else None
+
+    async def get(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """
+        Return a live entry and mark it most recently used, or None on a miss.
+
+        Stale entries count as a miss unless ``allow_stale`` is set.
+        """
+        entry: Optional[CacheEntry] = self._entries.get(key)
+
+        if entry is not None and entry.expired:
+            self._remove(key)
+            entry = None
+
+        if entry is None and self.store is not None:
+            row = await asyncio.to_thread(self.store.get, key)
+            if row is not None:
+                value, stored_at, expires_at = row
+                entry = self._insert(key, value, stored_at, min(stored_at + self.ttl, expires_at), expires_at)
+
+        if entry is not None and entry.stale and not allow_stale:
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> CacheEntry:
+        """Store ``value`` under ``key`` for ``ttl`` seconds (defaults to the cache TTL)."""
+        stored_at: float = time.time()
+        stale_at: float = stored_at + (ttl if ttl is not None else self.ttl)
+        expires_at: float = stale_at + self.stale_ttl
+        encoded: str = json.dumps(value, separators=(",", ":"))
+
+        entry: CacheEntry = self._insert(key, value, stored_at, stale_at, expires_at, len(encoded))
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, key, encoded, stored_at, expires_at)
+        return entry
+
+    def adopt(self, key: str, value: Any, stored_at: float, expires_at: float) -> CacheEntry:
+        """Keep an entry another worker already wrote to the shared store, without writing it back."""
+        return self._insert(key, value, stored_at, min(stored_at + self.ttl, expires_at), expires_at)
+
+    def _insert(
+        self,
+        key: str,
+        value: Any,
+        stored_at: float,
+        stale_at: float,
+        expires_at: float,
+        size: Optional[int] = None
+    ) -> CacheEntry:
+        if key in self._entries:
+            self._remove(key)
+        if size is None:
+            size = len(json.dumps(value, separators=(",", ":")))
+
+        entry: CacheEntry = CacheEntry(
+            value=value, stored_at=stored_at, stale_at=stale_at, expires_at=expires_at, size=size
+        )
+        self._entries[key] = entry
+        self._bytes += size
+        self._evict()
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry: CacheEntry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until both bounds hold."""
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
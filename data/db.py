@@ -0,0 +1,556 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+def data_path(filename: str) -> str:
+    """
+    Default location of a store file: ``flightbooker-mcp/`` under the user's
+    data directory (``XDG_DATA_HOME``, else ``~/.local/share``), so the server
+    never writes into whatever directory it was started from.
+    """
+    base: str = os.getenv("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "flightbooker-mcp", filename)
+
+def _connect(path: str) -> sqlite3.Connection:
+    """Open ``path``, creating its directory first."""
+    directory: str = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return sqlite3.connect(path, check_same_thread=False)
+
+class CacheStore:
+    """
+    SQLite-backed store for cached search results.
+
+    Lets cached entries survive restarts. Values are stored as JSON text next
+    to their creation and expiry timestamps. The connection is opened on
+    first use so startup does no I/O; ``FlightCache`` calls the store
+    through ``asyncio.to_thread``.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._connection is not None:
+            return self._connection
+        with self._open_lock:
+            if self._connection is None:
+                conn: sqlite3.Connection = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS search_cache (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        stored_at REAL NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                    """
+                )
+                conn.commit()
+                self._connection = conn
+        return self._connection
+
+    def get(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        """Return ``(value, stored_at, expires_at)`` for a live entry, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at, expires_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, stored_at, expires_at = row
+        if expires_at <= time.time():
+            self.delete(key)
+            return None
+        return json.loads(value), stored_at, expires_at
+
+    def set(self, key: str, value: str, stored_at: float, expires_at: float) -> None:
+        """Insert or replace an entry. ``value`` is already JSON encoded."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, stored_at, expires_at)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Drop expired entries and return how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+class QuotaStore:
+    """
+    SQLite-backed counter of upstream calls per quota period.
+
+    Keeps quota usage across restarts. Periods are opaque labels such as
+    "2025-06" or "2025-06-14". The connection is opened on first use so
+    startup does no I/O; ``QuotaBudget`` calls the store through
+    ``asyncio.to_thread``.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._connection is not None:
+            return self._connection
+        with self._open_lock:
+            if self._connection is None:
+                conn: sqlite3.Connection = _connect(self.path)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS upstream_usage (
+                        period TEXT PRIMARY KEY,
+                        calls INTEGER NOT NULL
+                    )
+                    """
+                )
+                conn.commit()
+                self._connection = conn
+        return self._connection
+
+    def get(self, period: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT calls FROM upstream_usage WHERE period = ?", (period,)).fetchone()
+        return row[0] if row is not None else 0
+
+    def increment(self, period: str) -> int:
+        """Count one call in ``period`` and return the new total."""
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO upstream_usage (period, calls) VALUES (?, 1)
+                ON CONFLICT(period) DO UPDATE SET calls = calls + 1
+                """,
+                (period,)
+            )
+            self._conn.commit()
+            row = self._conn.execute("SELECT calls FROM upstream_usage WHERE period = ?", (period,)).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+class FareHistoryStore:
+    """
+    SQLite store of every upstream search and its itineraries.
+
+    Searches are indexed by (origin, destination, cabin_class, shape,
+    departure_date) so route history and lowest-fare queries never touch
+    SerpAPI. ``shape`` is ``FlightSearchParams.shape_key()``: a 4-adult
+    round trip and a 1-adult one-way on the same route are different series
+    and never mix. Detail rows older than the detail window are compacted
+    into one row per route, shape and day in ``daily_fares``. Everything older than the retention window is
+    dropped and freed pages are returned to the filesystem.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """The connection, opened (and the schema created) on first use so startup does no I/O."""
+        if self._connection is not None:
+            return self._connection
+        with self._open_lock:
+            if self._connection is None:
+                conn: sqlite3.Connection = _connect(self.path)
+                # auto_vacuum only takes effect on a new database, before any table exists.
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA foreign_keys=ON")
+                conn.executescript(
+                    """
+                    CREATE TABLE IF NOT EXISTS searches (
+                        id INTEGER PRIMARY KEY,
+                        search_key TEXT NOT NULL,
+                        origin TEXT NOT NULL,
+                        destination TEXT NOT NULL,
+                        departure_date TEXT NOT NULL,
+                        return_date TEXT,
+                        cabin_class INTEGER NOT NULL,
+                        shape TEXT NOT NULL,
+                        searched_at REAL NOT NULL,
+                        min_price REAL,
+                        itinerary_count INTEGER NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_searches_route
+                        ON searches (origin, destination, cabin_class, shape, departure_date, searched_at);
+                    CREATE INDEX IF NOT EXISTS idx_searches_searched_at ON searches (searched_at);
+
+                    CREATE TABLE IF NOT EXISTS itineraries (
+                        search_id INTEGER NOT NULL REFERENCES searches (id) ON DELETE CASCADE,
+                        price REAL,
+                        airlines TEXT NOT NULL,
+                        flight_numbers TEXT NOT NULL,
+                        stops INTEGER NOT NULL,
+                        total_minutes INTEGER NOT NULL,
+                        departure_time TEXT
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_itineraries_search ON itineraries (search_id, price);
+
+                    CREATE TABLE IF NOT EXISTS daily_fares (
+                        origin TEXT NOT NULL,
+                        destination TEXT NOT NULL,
+                        departure_date TEXT NOT NULL,
+                        cabin_class INTEGER NOT NULL,
+                        shape TEXT NOT NULL,
+                        day TEXT NOT NULL,
+                        min_price REAL,
+                        searches INTEGER NOT NULL,
+                        PRIMARY KEY (origin, destination, cabin_class, shape, departure_date, day)
+                    );
+                    """
+                )
+                conn.commit()
+                self._connection = conn
+        return self._connection
+
+    def record_many(self, batch: List[Tuple[Dict[str, Any], float, List[Dict[str, Any]]]]) -> None:
+        """
+        Write a batch of searches in one transaction.
+
+        Args:
+            batch (List[Tuple[Dict[str, Any], float, List[Dict[str, Any]]]]): ``(search, searched_at, rows)`` triples,
+                where ``search`` holds the FlightSearchParams fields plus ``search_key`` and ``shape``, and ``rows``
+                are raw SerpAPI rows.
+        """
+        with self._lock, self._conn:
+            for search, searched_at, rows in batch:
+                prices: List[float] = [row["price"] for row in rows if row.get("price")]
+                cursor = self._conn.execute(
+                    """
+                    INSERT INTO searches (search_key, origin, destination, departure_date, return_date,
+                                          cabin_class, shape, searched_at, min_price, itinerary_count)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        search["search_key"], search["departure_id"], search["arrival_id"],
+                        search["departure_date"], search.get("return_date"), search.get("cabin_class") or 1,
+                        search["shape"], searched_at, min(prices) if prices else None, len(rows)
+                    )
+                )
+                self._conn.executemany(
+                    """
+                    INSERT INTO itineraries (search_id, price, airlines, flight_numbers, stops, total_minutes, departure_time)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [_itinerary_row(cursor.lastrowid, row) for row in rows]
+                )
+
+    def price_history(
+        self,
+        origin: str,
+        destination: str,
+        shape: str,
+        cabin_class: int = 1,
+        departure_date: Optional[str] = None,
+        since: float = 0.0
+    ) -> List[Dict[str, Any]]:
+        """Observed minimum prices for a route and search shape, oldest first, detail and compacted rows combined."""
+        date_filter: str = "AND departure_date = ?" if departure_date else ""
+        args: List[Any] = [origin, destination, cabin_class, shape] + ([departure_date] if departure_date else [])
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT searched_at, departure_date, min_price, 1 FROM searches
+                WHERE origin = ? AND destination = ? AND cabin_class = ? AND shape = ? {date_filter}
+                  AND searched_at >= ?
+                UNION ALL
+                SELECT CAST(strftime('%s', day) AS REAL), departure_date, min_price, searches FROM daily_fares
+                WHERE origin = ? AND destination = ? AND cabin_class = ? AND shape = ? {date_filter}
+                  AND CAST(strftime('%s', day) AS REAL) >= ?
+                ORDER BY 1
+                """,
+                args + [since] + args + [since - 86400]
+            ).fetchall()
+        return [
+            {"observed_at": observed_at, "departure_date": date, "min_price": price, "searches": searches}
+            for observed_at, date, price, searches in rows
+        ]
+
+    def latest_search(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        shape: str,
+        cabin_class: int = 1
+    ) -> Optional[Dict[str, Any]]:
+        """Most recent stored one-way search of a route, date and shape with its itineraries, cheapest first."""
+        with self._lock:
+            search = self._conn.execute(
+                """
+                SELECT id, searched_at, cabin_class, return_date, min_price, itinerary_count FROM searches
+                WHERE origin = ? AND destination = ? AND cabin_class = ? AND shape = ? AND departure_date = ?
+                  AND return_date IS NULL
+                ORDER BY searched_at DESC LIMIT 1
+                """,
+                (origin, destination, cabin_class, shape, departure_date)
+            ).fetchone()
+            if search is None:
+                return None
+            itineraries = self._conn.execute(
+                """
+                SELECT price, airlines, flight_numbers, stops, total_minutes, departure_time FROM itineraries
+                WHERE search_id = ? ORDER BY price LIMIT 10
+                """,
+                (search[0],)
+            ).fetchall()
+
+        _, searched_at, cabin_class, return_date, min_price, count = search
+        return {
+            "fetched_at": searched_at,
+            "cabin_class": cabin_class,
+            "return_date": return_date,
+            "min_price": min_price,
+            "total_flights": count,
+            "flights": [
+                {
+                    "price": price,
+                    "airlines": airlines.split(",") if airlines else [],
+                    "flight_numbers": flight_numbers.split(",") if flight_numbers else [],
+                    "stops": stops,
+                    "total_duration_minutes": minutes,
+                    "departure_time": departs,
+                }
+                for price, airlines, flight_numbers, stops, minutes, departs in itineraries
+            ],
+        }
+
+    def lowest_fare(
+        self,
+        origin: str,
+        destination: str,
+        shape: str,
+        cabin_class: int = 1,
+        departure_date: Optional[str] = None,
+        since: float = 0.0
+    ) -> Optional[Dict[str, Any]]:
+        """Cheapest itinerary ever stored for a route and search shape, falling back to compacted daily minimums."""
+        date_filter: str = "AND s.departure_date = ?" if departure_date else ""
+        args: List[Any] = [origin, destination, cabin_class, shape] + ([departure_date] if departure_date else [])
+        with self._lock:
+            row = self._conn.execute(
+                f"""
+                SELECT i.price, s.departure_date, s.return_date, s.searched_at,
+                       i.airlines, i.flight_numbers, i.stops, i.total_minutes, i.departure_time
+                FROM searches s JOIN itineraries i ON i.search_id = s.id
+                WHERE s.origin = ? AND s.destination = ? AND s.cabin_class = ? AND s.shape = ? {date_filter}
+                  AND s.searched_at >= ? AND i.price IS NOT NULL
+                ORDER BY i.price LIMIT 1
+                """,
+                args + [since]
+            ).fetchone()
+            daily = self._conn.execute(
+                f"""
+                SELECT min_price, departure_date, day FROM daily_fares
+                WHERE origin = ? AND destination = ? AND cabin_class = ? AND shape = ? {date_filter.replace('s.', '')}
+                  AND CAST(strftime('%s', day) AS REAL) >= ? AND min_price IS NOT NULL
+                ORDER BY min_price LIMIT 1
+                """,
+                args + [since - 86400]
+            ).fetchone()
+
+        if row is not None and (daily is None or row[0] <= daily[0]):
+            price, date, return_date, searched_at, airlines, flight_numbers, stops, minutes, departs = row
+            return {
+                "price": price,
+                "departure_date": date,
+                "return_date": return_date,
+                "observed_at": searched_at,
+                "airlines": airlines.split(",") if airlines else [],
+                "flight_numbers": flight_numbers.split(",") if flight_numbers else [],
+                "stops": stops,
+                "total_duration_minutes": minutes,
+                "departure_time": departs,
+            }
+        if daily is not None:
+            price, date, day = daily
+            return {"price": price, "departure_date": date, "observed_on": day, "compacted": True}
+        return None
+
+    def compact(self, detail_days: float, retention_days: float) -> Dict[str, int]:
+        """
+        Fold searches older than ``detail_days`` into ``daily_fares`` and drop
+        everything older than ``retention_days``.
+
+        Returns:
+            Dict[str, int]: Number of searches compacted and daily rows expired.
+        """
+        now: float = time.time()
+        detail_cutoff: float = now - detail_days * 86400
+        retention_cutoff: float = now - retention_days * 86400
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    """
+                    INSERT INTO daily_fares (origin, destination, departure_date, cabin_class, shape, day, min_price, searches)
+                    SELECT origin, destination, departure_date, cabin_class, shape,
+                           date(searched_at, 'unixepoch'), MIN(min_price), COUNT(*)
+                    FROM searches WHERE searched_at < ?
+                    GROUP BY origin, destination, departure_date, cabin_class, shape, date(searched_at, 'unixepoch')
+                    ON CONFLICT (origin, destination, cabin_class, shape, departure_date, day) DO UPDATE SET
+                        min_price = MIN(COALESCE(daily_fares.min_price, excluded.min_price), COALESCE(excluded.min_price, daily_fares.min_price)),
+                        searches = daily_fares.searches + excluded.searches
+                    """,
+                    (detail_cutoff,)
+                )
+                compacted: int = self._conn.execute("DELETE FROM searches WHERE searched_at < ?", (detail_cutoff,)).rowcount
+                expired: int = self._conn.execute(
+                    "DELETE FROM daily_fares WHERE day < date(?, 'unixepoch')", (retention_cutoff,)
+                ).rowcount
+            self._conn.execute("PRAGMA incremental_vacuum")
+        return {"compacted_searches": compacted, "expired_days": expired}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+def _itinerary_row(search_id: int, row: Dict[str, Any]) -> Tuple[Any, ...]:
+    segments: List[Dict[str, Any]] = row.get("flights") or []
+    airlines: List[str] = list(dict.fromkeys(s.get("airline", "") for s in segments))
+    return (
+        search_id,
+        row.get("price"),
+        ",".join(airlines),
+        ",".join(s.get("flight_number", "") for s in segments),
+        max(len(segments) - 1, 0),
+        row.get("total_duration") or 0,
+        segments[0].get("departure_airport", {}).get("time") if segments else None,
+    )
+
+class WatchStore:
+    """
+    SQLite store of price watches.
+
+    Keeps watches, with the last price each one saw, across restarts. The
+    connection is opened on first use so startup does no I/O.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._connection is not None:
+            return self._connection
+        with self._open_lock:
+            if self._connection is None:
+                conn: sqlite3.Connection = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(
+                    """
+                    CREATE TABLE IF NOT EXISTS price_watches (
+                        id TEXT PRIMARY KEY,
+                        owner TEXT NOT NULL,
+                        search_key TEXT NOT NULL,
+                        params TEXT NOT NULL,
+                        threshold REAL NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_price REAL,
+                        checked_at REAL,
+                        triggered_at REAL
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_price_watches_owner ON price_watches (owner);
+                    """
+                )
+                conn.commit()
+                self._connection = conn
+        return self._connection
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Every stored watch, oldest first, with ``params`` decoded."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT id, owner, search_key, params, threshold, created_at, last_price, checked_at, triggered_at
+                FROM price_watches ORDER BY created_at
+                """
+            ).fetchall()
+        return [
+            {
+                "watch_id": watch_id,
+                "owner": owner,
+                "search_key": search_key,
+                "params": json.loads(params),
+                "threshold": threshold,
+                "created_at": created_at,
+                "last_price": last_price,
+                "checked_at": checked_at,
+                "triggered_at": triggered_at,
+            }
+            for watch_id, owner, search_key, params, threshold, created_at, last_price, checked_at, triggered_at in rows
+        ]
+
+    def add(self, watch: Dict[str, Any]) -> None:
+        """Insert a watch; ``params`` are the FlightSearchParams fields."""
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO price_watches (id, owner, search_key, params, threshold, created_at, last_price, checked_at, triggered_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    watch["watch_id"], watch["owner"], watch["search_key"], json.dumps(watch["params"]),
+                    watch["threshold"], watch["created_at"], watch.get("last_price"), watch.get("checked_at"),
+                    watch.get("triggered_at")
+                )
+            )
+            self._conn.commit()
+
+    def update_prices(self, rows: List[Tuple[Optional[float], float, Optional[float], str]]) -> None:
+        """Store ``(last_price, checked_at, triggered_at, watch_id)`` for each watch in one transaction."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE price_watches SET last_price = ?, checked_at = ?, triggered_at = ? WHERE id = ?", rows
+            )
+
+    def remove(self, watch_ids: List[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM price_watches WHERE id = ?", [(w,) for w in watch_ids])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,128 @@
+"""
+Short handles for SerpAPI's departure and booking tokens.
+
+The tokens are long opaque strings, one or two per itinerary, and most of
+a compact response would be spent on them. Compact responses carry a
+handle like ``tk_3f9c1a2b7d0e`` instead; the token stays here until
+get_flights receives the handle back and swaps the token in.
+"""
+import os
+import asyncio
+import hashlib
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from data.shared import is_shared, shared_backend
+
+PREFIX: str = "tk_"
+
+class TokenHandles:
+    """
+    Bounded, expiring handle table.
+
+    Handles are a digest of the token, so a token gets the same handle in
+    every response and repeat searches add nothing. Entries are kept for
+    ``ttl`` seconds in an LRU of at most ``max_entries``; with a shared
+    backend they are written there too so any worker can resolve them.
+    ``issue`` runs inside the encoder, so it only queues those writes and
+    ``flush`` sends them from a worker thread, keeping backend round trips
+    off the event loop.
+
+    Args:
+        ttl (float): Seconds a handle stays resolvable. Defaults to 3600.
+        max_entries (int): Handles kept in this process. Defaults to 50000.
+        backend (Any, optional): Shared key-value backend to also write to. Defaults to None.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 50000, backend: Optional[Any] = None) -> None:
+        self.ttl: float = ttl
+        self.max_entries: int = max_entries
+        self.backend: Optional[Any] = backend
+        self.issued: int = 0
+        self.resolved: int = 0
+        self.expired: int = 0
+        # handle -> (token, expires_at, shared_expires_at)
+        self._tokens: "OrderedDict[str, Tuple[str, float, float]]" = OrderedDict()
+        # (handle, token) pairs issued but not yet written to the backend
+        self._pending: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TokenHandles":
+        return cls(
+            ttl=float(os.getenv("TOKEN_HANDLE_TTL", "3600")),
+            max_entries=int(os.getenv("TOKEN_HANDLE_MAX_ENTRIES", "50000")),
+            backend=shared_backend() if is_shared() else None
+        )
+
+    def issue(self, token: str) -> str:
+        """Handle for ``token``, registering it on first sight."""
+        handle: str = PREFIX + hashlib.blake2b(token.encode(), digest_size=6).hexdigest()
+        now: float = time.time()
+        with self._lock:
+            previous: Optional[Tuple[str, float, float]] = self._tokens.get(handle)
+            # Write through when new, or when the shared copy is past half its lifetime
+            write: bool = self.backend is not None and (previous is None or previous[2] - now < self.ttl / 2)
+            shared_expires_at: float = now + self.ttl if write or previous is None else previous[2]
+            self._tokens[handle] = (token, now + self.ttl, shared_expires_at)
+            self._tokens.move_to_end(handle)
+            while len(self._tokens) > self.max_entries:
+                self._tokens.popitem(last=False)
+            self.issued += 1
+            if write:
+                self._pending.append((handle, token))
+        return handle
+
+    async def flush(self) -> None:
+        """Write the handles issued since the last flush to the shared backend."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            await asyncio.to_thread(self._write, pending)
+
+    def _write(self, pending: List[Tuple[str, str]]) -> None:
+        for handle, token in pending:
+            self.backend.set("handle:" + handle, token, self.ttl)
+
+    async def resolve(self, value: Optional[str], field_name: str) -> Optional[str]:
+        """
+        Token behind ``value`` if it is a handle, else ``value`` unchanged.
+
+        Raises:
+            ValueError: When ``value`` is a handle that is unknown or has expired.
+        """
+        if not value or not value.startswith(PREFIX):
+            return value
+        token: Optional[str] = None
+        with self._lock:
+            entry: Optional[Tuple[str, float, float]] = self._tokens.get(value)
+            if entry is not None and entry[1] > time.time():
+                token = entry[0]
+        if token is None and self.backend is not None:
+            token = await asyncio.to_thread(self.backend.get, "handle:" + value)
+        if token is None:
+            self.expired += 1
+            raise ValueError(
+                f"Invalid {field_name} '{value}'. The handle is unknown or expired; repeat the search for a fresh one."
+            )
+        self.resolved += 1
+        return token
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size: int = len(self._tokens)
+        return {"size": size, "issued": self.issued, "resolved": self.resolved, "expired": self.expired}
+
+_handles: Optional[TokenHandles] = None
+_handles_lock = threading.Lock()
+
+def token_handles() -> TokenHandles:
+    """The process-wide handle table, built on first use."""
+    global _handles
+    if _handles is not None:
+        return _handles
+    with _handles_lock:
+        if _handles is None:
+            _handles = TokenHandles.from_env()
+    return _handles
@@ -0,0 +1,133 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from data.db import FareHistoryStore, data_path
+from models.flight import FlightSearchParams
+
+logger = logging.getLogger(__name__)
+
+class FareHistoryRecorder:
+    """
+    Batches search results into the fare history store off the request path.
+
+    ``record()`` only enqueues; a background task drains the queue in batches
+    and writes each batch in one transaction on a worker thread. When the
+    queue is full new results are dropped rather than slowing a request.
+    The same task periodically compacts the store. ``stop()`` writes what is
+    still queued before the task ends.
+    """
+
+    def __init__(
+        self,
+        store: FareHistoryStore,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        detail_days: float = 7.0,
+        retention_days: float = 180.0,
+        compact_interval: float = 3600.0
+    ) -> None:
+        self.store: FareHistoryStore = store
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.max_queue: int = max_queue
+        self.detail_days: float = detail_days
+        self.retention_days: float = retention_days
+        self.compact_interval: float = compact_interval
+        self.written: int = 0
+        self.dropped: int = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_compaction: float = time.monotonic()
+
+    @classmethod
+    def from_env(cls) -> Optional["FareHistoryRecorder"]:
+        """Build a recorder from the ``FARE_HISTORY_*`` environment variables, or None when disabled."""
+        path: str = os.getenv("FARE_HISTORY_DB_PATH", data_path("fare_history.db"))
+        if not path:
+            return None
+        return cls(
+            store=FareHistoryStore(path),
+            batch_size=int(os.getenv("FARE_HISTORY_BATCH_SIZE", "100")),
+            flush_interval=float(os.getenv("FARE_HISTORY_FLUSH_INTERVAL", "1")),
+            detail_days=float(os.getenv("FARE_HISTORY_DETAIL_DAYS", "7")),
+            retention_days=float(os.getenv("FARE_HISTORY_RETENTION_DAYS", "180")),
+            compact_interval=float(os.getenv("FARE_HISTORY_COMPACT_INTERVAL", "3600"))
+        )
+
+    def record(self, params: FlightSearchParams, flights: List[Dict[str, Any]]) -> None:
+        """Queue an upstream result for writing. Return-leg lookups are skipped."""
+        if params.departure_token is not None:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+        search: Dict[str, Any] = params.model_dump()
+        search["search_key"] = params.cache_key()
+        search["shape"] = params.shape_key()
+        try:
+            self._queue.put_nowait((search, time.time(), flights))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _next_batch(self) -> Tuple[List[Tuple[Dict[str, Any], float, List[Dict[str, Any]]]], bool]:
+        """Searches queued within one flush interval, up to ``batch_size``, and whether ``stop()`` was called."""
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline: float = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining: float = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self) -> None:
+        stopping: bool = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            if batch:
+                try:
+                    await asyncio.to_thread(self.store.record_many, batch)
+                    self.written += len(batch)
+                except Exception:
+                    logger.exception("Failed to write %d searches to fare history", len(batch))
+
+            if not stopping and time.monotonic() - self._last_compaction >= self.compact_interval:
+                self._last_compaction = time.monotonic()
+                try:
+                    await asyncio.to_thread(self.store.compact, self.detail_days, self.retention_days)
+                except Exception:
+                    logger.exception("Fare history compaction failed")
+
+    async def stop(self) -> None:
+        """Write every search still queued, end the background task and close the store."""
+        if self._task is not None and not self._task.done():
+            # None marks the end of the queue, so the task drains everything put before it.
+            await self._queue.put(None)
+            await self._task
+        self._task = None
+        await asyncio.to_thread(self.store.close)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+# Shared by every module that feeds or reads fare history.
+history: Optional[FareHistoryRecorder] = FareHistoryRecorder.from_env()
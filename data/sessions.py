@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import secrets
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from models.flight import FlightSearchParams
+
+@dataclass
+class SearchSession:
+    search_id: str
+    params: FlightSearchParams
+    flights: List[Dict[str, Any]]  # every raw row of the search, in upstream order
+    created_at: float
+    expires_at: float
+    size: int
+
+    @property
+    def age(self) -> float:
+        """Seconds since the search ran."""
+        return time.time() - self.created_at
+
+def new_search_id() -> str:
+    """Random 64-bit ID; unique across concurrent searches and worker processes."""
+    return f"SRCH-{secrets.token_hex(8)}"
+
+class SearchSessions:
+    """
+    Results of recent searches by search ID, for local re-sorting and paging.
+
+    An in-process LRU bounded by entry count and bytes, with entries sized
+    by their JSON encoding like ``FlightCache``. A session expires after
+    ``ttl`` seconds without use; every lookup renews it, so recency order is
+    also expiry order and expired sessions are dropped from the old end.
+    The rows are the same list objects the cache holds, so a session only
+    adds memory once its search has left the cache.
+    """
+
+    def __init__(self, ttl: float = 1800.0, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.ttl: float = ttl
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+        self._sessions: "OrderedDict[str, SearchSession]" = OrderedDict()
+        self._bytes: int = 0
+
+    @classmethod
+    def from_env(cls) -> "SearchSessions":
+        return cls(
+            ttl=float(os.getenv("SEARCH_SESSION_TTL", "1800")),
+            max_entries=int(os.getenv("SEARCH_SESSION_MAX_ENTRIES", "1000")),
+            max_bytes=int(os.getenv("SEARCH_SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+        )
+
+    def create(self, params: FlightSearchParams, flights: List[Dict[str, Any]], size: Optional[int] = None) -> str:
+        """
+        Keep ``flights`` under a new search ID and return the ID.
+
+        ``size`` is the JSON size of ``flights`` when the caller already
+        knows it (e.g. from the cache entry); otherwise it is measured.
+        """
+        if size is None:
+            size = len(json.dumps(flights, separators=(",", ":")))
+        now: float = time.time()
+        search_id: str = new_search_id()
+        self._sessions[search_id] = SearchSession(
+            search_id=search_id, params=params, flights=flights, created_at=now, expires_at=now + self.ttl, size=size
+        )
+        self._bytes += size
+        self._evict(now)
+        return search_id
+
+    def get(self, search_id: str) -> Optional[SearchSession]:
+        """Live session for ``search_id``, renewed and marked most recently used; None when unknown or expired."""
+        now: float = time.time()
+        self._evict(now)
+        session: Optional[SearchSession] = self._sessions.get(search_id)
+        if session is None:
+            self.misses += 1
+            return None
+        session.expires_at = now + self.ttl
+        self._sessions.move_to_end(search_id)
+        self.hits += 1
+        return session
+
+    def _evict(self, now: float) -> None:
+        """Drop expired sessions, then least recently used ones until both bounds hold."""
+        while self._sessions:
+            oldest: SearchSession = next(iter(self._sessions.values()))
+            if oldest.expires_at > now:
+                break
+            self._sessions.popitem(last=False)
+            self._bytes -= oldest.size
+            self.expirations += 1
+        while self._sessions and (len(self._sessions) > self.max_entries or self._bytes > self.max_bytes):
+            _, session = self._sessions.popitem(last=False)
+            self._bytes -= session.size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._sessions),
+            "bytes": self._bytes,
+        }
+
+# Shared by get_flights, which fills it, and refine_search, which reads it.
+sessions: SearchSessions = SearchSessions.from_env()
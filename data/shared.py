@@ -0,0 +1,323 @@
+"""
+State shared between server processes: the search cache, single-flight
+locks and the session routing table.
+
+Everything goes through a small key-value backend. ``MemoryBackend`` is
+the default and keeps state inside the process, which is what a single
+worker needs. ``RedisBackend`` is the adapter for an external store
+(Redis, Valkey, KeyDB or anything else speaking the Redis protocol) so
+several worker processes, on one node or many, see one cache and start
+only one upstream call per search between them.
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class MemoryBackend:
+    """Process-local key-value store with per-key expiry."""
+
+    name: str = "memory"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Dict[str, Tuple[str, float]] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item: Optional[Tuple[str, float]] = self._data.get(key)
+            if item is None:
+                return None
+            if item[1] <= time.time():
+                del self._data[key]
+                return None
+            return item[0]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        """Set ``key`` only if it holds no live value; returns whether it was set."""
+        with self._lock:
+            item: Optional[Tuple[str, float]] = self._data.get(key)
+            if item is not None and item[1] > time.time():
+                return False
+            self._data[key] = (value, time.time() + ttl)
+            return True
+
+    def extend(self, key: str, value: str, ttl: float) -> bool:
+        """Push ``key``'s expiry to ``ttl`` from now while it still holds ``value``; returns whether it did."""
+        with self._lock:
+            item: Optional[Tuple[str, float]] = self._data.get(key)
+            if item is None or item[0] != value or item[1] <= time.time():
+                return False
+            self._data[key] = (value, time.time() + ttl)
+            return True
+
+    def delete(self, key: str, value: Optional[str] = None) -> None:
+        """Remove ``key``; with ``value`` given, only while it still holds that value."""
+        with self._lock:
+            item: Optional[Tuple[str, float]] = self._data.get(key)
+            if item is not None and (value is None or item[0] == value):
+                del self._data[key]
+
+    def close(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+class RedisBackend:
+    """
+    Adapter for a Redis-protocol key-value store.
+
+    Uses the synchronous ``redis`` client (an optional dependency, imported
+    here) with its thread-safe connection pool. Every method blocks for a
+    network round trip, so callers on the event loop go through
+    ``asyncio.to_thread``, as they do for the SQLite stores. Keys are
+    namespaced by ``prefix`` so several deployments can share one store.
+    """
+
+    name: str = "redis"
+
+    def __init__(self, url: str, prefix: str = "flight-mcp:", timeout: float = 1.0) -> None:
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("SHARED_BACKEND=redis needs the 'redis' package (pip install redis)") from e
+        self.url: str = url
+        self.prefix: str = prefix
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=timeout, socket_connect_timeout=timeout, decode_responses=True
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(self.prefix + key)
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        """Set ``key`` only if it holds no live value; returns whether it was set."""
+        return bool(self._client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)), nx=True))
+
+    def extend(self, key: str, value: str, ttl: float) -> bool:
+        """Push ``key``'s expiry to ``ttl`` from now while it still holds ``value``; returns whether it did."""
+        if self._client.get(self.prefix + key) != value:
+            return False
+        return bool(self._client.pexpire(self.prefix + key, max(1, int(ttl * 1000))))
+
+    def delete(self, key: str, value: Optional[str] = None) -> None:
+        """
+        Remove ``key``; with ``value`` given, only while it still holds that value.
+
+        The compare and delete are two commands: if the key expires and is
+        taken over in between, the new holder's lock is dropped early and at
+        worst one search is fetched twice.
+        """
+        if value is None or self._client.get(self.prefix + key) == value:
+            self._client.delete(self.prefix + key)
+
+    def close(self) -> None:
+        self._client.close()
+
+# The process-wide backend, built from the environment on first use.
+_backend: Optional[Any] = None
+_backend_lock = threading.Lock()
+
+def shared_backend() -> Any:
+    """
+    The backend named by ``SHARED_BACKEND`` ("memory" or "redis").
+
+    ``SHARED_URL`` is the store URL for redis (default
+    ``redis://localhost:6379/0``) and ``SHARED_PREFIX`` namespaces its keys.
+    """
+    global _backend
+    if _backend is not None:
+        return _backend
+    with _backend_lock:
+        if _backend is None:
+            kind: str = os.getenv("SHARED_BACKEND", "memory").lower()
+            if kind == "memory":
+                _backend = MemoryBackend()
+            elif kind == "redis":
+                _backend = RedisBackend(
+                    url=os.getenv("SHARED_URL", "redis://localhost:6379/0"),
+                    prefix=os.getenv("SHARED_PREFIX", "flight-mcp:"),
+                    timeout=float(os.getenv("SHARED_TIMEOUT", "1"))
+                )
+            else:
+                raise ValueError(f"Invalid SHARED_BACKEND '{kind}'. Must be one of ['memory', 'redis'].")
+    return _backend
+
+def is_shared() -> bool:
+    """Whether the backend is visible to other processes."""
+    return os.getenv("SHARED_BACKEND", "memory").lower() != "memory"
+
+class SharedStore:
+    """
+    Cache store over a shared backend, with the ``CacheStore`` interface.
+
+    Plugged into ``FlightCache`` in place of the SQLite store, so memory
+    misses fall back to results any worker has fetched. Values keep their
+    JSON encoding; the timestamps ride in front of it. Calls block on the
+    backend, so async callers run them in a thread.
+    """
+
+    def __init__(self, backend: Any, namespace: str = "cache:") -> None:
+        self.backend: Any = backend
+        self.namespace: str = namespace
+
+    def get(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        """Return ``(value, stored_at, expires_at)`` for a live entry, or None."""
+        raw: Optional[str] = self.backend.get(self.namespace + key)
+        if raw is None:
+            return None
+        stored_at, expires_at, value = raw.split(" ", 2)
+        return json.loads(value), float(stored_at), float(expires_at)
+
+    def set(self, key: str, value: str, stored_at: float, expires_at: float) -> None:
+        """Insert or replace an entry. ``value`` is already JSON encoded."""
+        ttl: float = expires_at - time.time()
+        if ttl > 0:
+            self.backend.set(self.namespace + key, f"{stored_at:.6f} {expires_at:.6f} {value}", ttl)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(self.namespace + key)
+
+    def purge_expired(self) -> int:
+        """Entries expire in the backend itself; nothing to do."""
+        return 0
+
+    def close(self) -> None:
+        self.backend.close()
+
+class SharedFlight:
+    """
+    Single-flight across processes.
+
+    Complements the in-process ``SingleFlight``: before fetching a search,
+    a worker takes a short lock on its key in the shared backend. Workers
+    that find the lock held poll the shared cache (with backoff) for the
+    winner's result instead of calling upstream themselves.
+
+    A fetch can outlast any fixed lock lifetime (queueing for the upstream
+    scheduler, then several attempts at the full timeout with backoff), so
+    the holder renews the lock every third of ``lock_ttl`` until ``fn``
+    returns. The lock therefore only lapses when its holder dies, and a
+    crashed worker frees the search within ``lock_ttl``. Waiters wait as
+    long as the lock is held; ``wait_timeout``, when set, caps that and
+    the waiter then fetches on its own.
+    """
+
+    def __init__(
+        self,
+        backend: Any,
+        store: SharedStore,
+        lock_ttl: float = 45.0,
+        wait_timeout: Optional[float] = None,
+        poll_interval: float = 0.05
+    ) -> None:
+        self.backend: Any = backend
+        self.store: SharedStore = store
+        self.lock_ttl: float = lock_ttl
+        self.wait_timeout: Optional[float] = wait_timeout
+        self.poll_interval: float = poll_interval
+        self.owner: str = uuid.uuid4().hex
+        self.fetched: int = 0
+        self.joined: int = 0
+        self.timeouts: int = 0
+        self.renewals: int = 0
+        self.lost_locks: int = 0
+
+    @classmethod
+    def from_env(cls, store: Optional[SharedStore] = None) -> Optional["SharedFlight"]:
+        """Build from the ``SHARED_*`` environment variables, or None with the in-process backend."""
+        if not is_shared():
+            return None
+        backend: Any = shared_backend()
+        return cls(
+            backend=backend,
+            store=store if store is not None else SharedStore(backend),
+            lock_ttl=float(os.getenv("SHARED_LOCK_TTL", "45")),
+            wait_timeout=float(os.getenv("SHARED_WAIT_TIMEOUT")) if os.getenv("SHARED_WAIT_TIMEOUT") else None,
+            poll_interval=float(os.getenv("SHARED_POLL_INTERVAL", "0.05"))
+        )
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Optional[Any], Optional[Tuple[Any, float, float]]]:
+        """
+        Run ``fn`` for ``key`` unless another process is already fetching it.
+
+        ``fn`` must publish its result to the shared store before returning.
+
+        Returns:
+            Tuple[Optional[Any], Optional[Tuple[Any, float, float]]]: ``(result, None)`` when ``fn`` ran here,
+                or ``(None, (value, stored_at, expires_at))`` with the entry another process published.
+        """
+        since: float = time.time()
+        lock: str = "lock:" + key
+        deadline: Optional[float] = time.monotonic() + self.wait_timeout if self.wait_timeout is not None else None
+        delay: float = self.poll_interval
+        while not await asyncio.to_thread(self.backend.add, lock, self.owner, self.lock_ttl):
+            if deadline is not None and time.monotonic() >= deadline:
+                self.timeouts += 1
+                logger.warning("Gave up waiting for another worker to fetch %s", key)
+                return await fn(), None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+            row: Optional[Tuple[Any, float, float]] = await asyncio.to_thread(self.store.get, key)
+            if row is not None and row[1] >= since:
+                self.joined += 1
+                return None, row
+
+        renew: asyncio.Task = asyncio.get_running_loop().create_task(self._renew(lock))
+        try:
+            # Another worker may have finished between our cache miss and taking the lock.
+            row = await asyncio.to_thread(self.store.get, key)
+            if row is not None and row[1] >= since:
+                self.joined += 1
+                return None, row
+            self.fetched += 1
+            return await fn(), None
+        finally:
+            renew.cancel()
+            await asyncio.to_thread(self.backend.delete, lock, self.owner)
+
+    async def _renew(self, lock: str) -> None:
+        """Keep ``lock`` alive while this worker's fetch runs."""
+        while True:
+            await asyncio.sleep(self.lock_ttl / 3)
+            try:
+                held: bool = await asyncio.to_thread(self.backend.extend, lock, self.owner, self.lock_ttl)
+            except Exception:
+                logger.warning("Could not renew %s; retrying", lock, exc_info=True)
+                continue
+            if not held:
+                self.lost_locks += 1
+                logger.warning("Lost %s while fetching; another worker may fetch it too", lock)
+                return
+            self.renewals += 1
+
+    async def publish(self, key: str, value: Any) -> None:
+        """Hand a result to waiting workers when no shared cache carries it."""
+        now: float = time.time()
+        await asyncio.to_thread(self.store.set, key, json.dumps(value, separators=(",", ":")), now, now + self.lock_ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name,
+            "fetched": self.fetched,
+            "joined": self.joined,
+            "timeouts": self.timeouts,
+            "renewals": self.renewals,
+            "lost_locks": self.lost_locks,
+        }
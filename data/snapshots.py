@@ -0,0 +1,83 @@
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+from models.flight import FlightSearchParams, FlightTypeParam, shape_key
+from models.itinerary import serialize_flight
+from data.subscriptions import subscriptions
+
+# A snapshot follows one search shape: one-way economy for one adult with every
+# other option at its default. Other searches of the route would overwrite it
+# and flip its digest back and forth.
+SNAPSHOT_SHAPE: str = shape_key(1, 0, 0, 0, int(FlightTypeParam.ONE_WAY.value), 0, 0, "us")
+
+def snapshot_uri(origin: str, destination: str, date: str) -> str:
+    return f"flights://{origin}/{destination}/{date}"
+
+def is_snapshot_search(params: FlightSearchParams) -> bool:
+    """Whether ``params`` is the search a route snapshot is taken from."""
+    return (
+        params.departure_token is None
+        and params.return_date is None
+        and params.max_price is None
+        and (params.cabin_class or 1) == 1
+        and params.shape_key() == SNAPSHOT_SHAPE
+    )
+
+class SnapshotHub:
+    """
+    Latest one-way economy result per route and date.
+
+    Fed by the SerpApi result listener, so every upstream fetch of that
+    search (including background refreshes) updates the route snapshot.
+    Clients subscribed to a snapshot's URI are sent a resource-updated
+    notification when its prices change.
+    """
+
+    def __init__(self, max_routes: int = 1000, max_flights: int = 10) -> None:
+        self.max_routes: int = max_routes
+        self.max_flights: int = max_flights
+        self._snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._digests: Dict[str, Tuple[Any, ...]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def get(self, uri: str) -> Optional[Dict[str, Any]]:
+        return self._snapshots.get(uri)
+
+    def update(self, params: FlightSearchParams, flights: List[Dict[str, Any]]) -> None:
+        """Result listener: refresh the route snapshot and notify subscribers on change."""
+        if not is_snapshot_search(params):
+            return
+
+        uri: str = snapshot_uri(params.departure_id, params.arrival_id, params.departure_date)
+        prices: List[float] = [f["price"] for f in flights if f.get("price")]
+        digest: Tuple[Any, ...] = tuple(
+            (f.get("price"), f.get("booking_token")) for f in flights[:self.max_flights]
+        )
+
+        self._snapshots[uri] = {
+            "uri": uri,
+            "source": "cache",
+            "fetched_at": time.time(),
+            "search_criteria": params.model_dump(),
+            "min_price": min(prices) if prices else None,
+            "total_flights": len(flights),
+            "flights": [serialize_flight(f) for f in flights[:self.max_flights]],
+        }
+        self._snapshots.move_to_end(uri)
+        while len(self._snapshots) > self.max_routes:
+            evicted, _ = self._snapshots.popitem(last=False)
+            self._digests.pop(evicted, None)
+
+        changed: bool = uri in self._digests and self._digests[uri] != digest
+        self._digests[uri] = digest
+        if changed:
+            task = asyncio.get_running_loop().create_task(subscriptions.notify(uri))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"routes": len(self._snapshots)}
+
+# Shared by the result listeners and the flights:// resources.
+snapshots: SnapshotHub = SnapshotHub()
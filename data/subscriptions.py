@@ -0,0 +1,82 @@
+from typing import Any, Dict, Optional, Set
+from fastmcp import FastMCP
+from mcp.server.subscriptions import InMemorySubscriptionBus, ListenHandler, ResourceUpdated
+from mcp.types import EmptyResult, SubscribeRequestParams, SubscriptionsListenRequestParams, UnsubscribeRequestParams
+
+class ResourceSubscriptions:
+    """
+    Who to tell when a resource changes.
+
+    Clients on the 2026-07-28 protocol open a ``subscriptions/listen`` stream
+    naming the URIs they want; older clients send ``resources/subscribe`` and
+    ``resources/unsubscribe``. ``register(mcp)`` serves all three and
+    ``notify(uri)`` reaches both kinds of subscriber. Legacy subscriptions
+    belong to the client's connection and end when it closes.
+    """
+
+    def __init__(self) -> None:
+        self.bus: InMemorySubscriptionBus = InMemorySubscriptionBus()
+        self.published: int = 0
+        # uri -> {id(connection): connection}, and the uris each connection subscribed to
+        self._legacy: Dict[str, Dict[int, Any]] = {}
+        self._connections: Dict[int, Set[str]] = {}
+        self._listen: Optional[ListenHandler] = None
+        self._registered: Set[int] = set()
+
+    def register(self, mcp: FastMCP) -> None:
+        """Serve the subscription requests on ``mcp``; repeat calls are no-ops."""
+        if id(mcp) in self._registered:
+            return
+        self._registered.add(id(mcp))
+        server = mcp._mcp_server
+        if server.get_request_handler("subscriptions/listen") is None:
+            self._listen = self._listen or ListenHandler(self.bus)
+            server.add_request_handler("subscriptions/listen", SubscriptionsListenRequestParams, self._listen)
+        server.add_request_handler("resources/subscribe", SubscribeRequestParams, self._subscribe)
+        server.add_request_handler("resources/unsubscribe", UnsubscribeRequestParams, self._unsubscribe)
+
+    async def _subscribe(self, ctx: Any, params: SubscribeRequestParams) -> EmptyResult:
+        # ctx.session only lives for this request; the subscription belongs to its connection.
+        connection: Any = ctx.session._connection
+        key: int = id(connection)
+        if key not in self._connections:
+            self._connections[key] = set()
+            connection.exit_stack.callback(self._closed, key)
+        self._connections[key].add(params.uri)
+        self._legacy.setdefault(params.uri, {})[key] = connection
+        return EmptyResult()
+
+    async def _unsubscribe(self, ctx: Any, params: UnsubscribeRequestParams) -> EmptyResult:
+        key: int = id(ctx.session._connection)
+        self._connections.get(key, set()).discard(params.uri)
+        self._forget(params.uri, key)
+        return EmptyResult()
+
+    def _closed(self, key: int) -> None:
+        for uri in self._connections.pop(key, set()):
+            self._forget(uri, key)
+
+    def _forget(self, uri: str, key: int) -> None:
+        subscribers: Optional[Dict[int, Any]] = self._legacy.get(uri)
+        if subscribers is not None:
+            subscribers.pop(key, None)
+            if not subscribers:
+                del self._legacy[uri]
+
+    async def notify(self, uri: str) -> None:
+        """Send a resource-updated notification for ``uri`` to everyone subscribed to it."""
+        self.published += 1
+        await self.bus.publish(ResourceUpdated(uri=uri))
+        for connection in list(self._legacy.get(uri, {}).values()):
+            # Best effort: a broken stream drops the notification rather than raising.
+            await connection.notify("notifications/resources/updated", {"uri": uri})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribed_resources": len(self._legacy),
+            "subscribed_connections": len(self._connections),
+            "updates_published": self.published,
+        }
+
+# Shared by every resource whose contents change.
+subscriptions: ResourceSubscriptions = ResourceSubscriptions()
@@ -0,0 +1,162 @@
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from models.itinerary import serialize_flight
+
+# Response layouts accepted by get_flights(response_format=...)
+RESPONSE_FORMATS: List[str] = ["full", "compact"]
+
+# Column order of the compact layout. Airline, airport, airplane, cabin
+# class and trip type strings are replaced by their index into the matching
+# list under "dictionaries".
+ITINERARY_COLUMNS: List[str] = ["price", "minutes", "type", "segments", "layovers", "departure_token", "booking_token"]
+SEGMENT_COLUMNS: List[str] = ["airline", "flight_number", "from", "to", "departs", "arrives", "minutes", "airplane", "class"]
+LAYOVER_COLUMNS: List[str] = ["airport", "minutes", "overnight"]
+DICTIONARIES: List[str] = ["airlines", "airports", "airplanes", "classes", "types"]
+
+def compact_json(value: Any) -> str:
+    """JSON without whitespace, as the MCP transport sends it, so sizes match."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count of JSON text, at about four characters per token."""
+    return (len(text) + 3) // 4
+
+class CompactEncoder:
+    """
+    Columnar encoder for raw SerpAPI itineraries.
+
+    Each itinerary becomes a row of ITINERARY_COLUMNS, segments and
+    layovers nested rows of SEGMENT_COLUMNS and LAYOVER_COLUMNS. Airlines,
+    airports, airplanes, cabin classes and trip types are listed once
+    under "dictionaries" and referenced by index. Times are the airports'
+    local wall-clock times ("YYYY-MM-DD HH:MM") and durations are minutes.
+    Tokens go through ``issue`` (e.g. ``TokenHandles.issue``) so rows carry
+    short handles instead.
+
+    Args:
+        issue (Optional[Callable[[str], str]], optional): Maps a token to what the row carries. Defaults to the token itself.
+    """
+
+    def __init__(self, issue: Optional[Callable[[str], str]] = None) -> None:
+        self.issue: Optional[Callable[[str], str]] = issue
+        self.dictionaries: Dict[str, List[str]] = {name: [] for name in DICTIONARIES}
+        self._codes: Dict[str, Dict[str, int]] = {name: {} for name in DICTIONARIES}
+        # JSON characters the dictionaries have grown by, for budgeting
+        self.dictionary_chars: int = 0
+
+    def code(self, dictionary: str, value: str) -> int:
+        codes: Dict[str, int] = self._codes[dictionary]
+        index: Optional[int] = codes.get(value)
+        if index is None:
+            index = codes[value] = len(self.dictionaries[dictionary])
+            self.dictionaries[dictionary].append(value)
+            self.dictionary_chars += len(compact_json(value)) + 1
+        return index
+
+    def mark(self) -> Dict[str, int]:
+        """Dictionary sizes, to undo the entries added by a row that is then dropped."""
+        return {name: len(values) for name, values in self.dictionaries.items()}
+
+    def rollback(self, mark: Dict[str, int]) -> None:
+        for name, size in mark.items():
+            values: List[str] = self.dictionaries[name]
+            while len(values) > size:
+                value: str = values.pop()
+                del self._codes[name][value]
+                self.dictionary_chars -= len(compact_json(value)) + 1
+
+    def _token(self, token: Optional[str]) -> Optional[str]:
+        if not token:
+            return None
+        return self.issue(token) if self.issue is not None else token
+
+    def row(self, raw: Dict[str, Any]) -> List[Any]:
+        """Encode one raw itinerary as a row of ITINERARY_COLUMNS."""
+        segments: List[List[Any]] = []
+        for s in raw.get("flights", []):
+            departure: Dict[str, Any] = s.get("departure_airport") or {}
+            arrival: Dict[str, Any] = s.get("arrival_airport") or {}
+            segments.append([
+                self.code("airlines", s.get("airline", "")),
+                s.get("flight_number", ""),
+                self.code("airports", departure.get("id", "")),
+                self.code("airports", arrival.get("id", "")),
+                departure.get("time"),
+                arrival.get("time"),
+                s.get("duration", 0),
+                self.code("airplanes", s.get("airplane", "")),
+                self.code("classes", "_".join(s.get("travel_class", "").lower().split())),
+            ])
+        return [
+            float(raw.get("price", 0)),
+            raw.get("total_duration", 0),
+            self.code("types", raw.get("type", "")),
+            segments,
+            [
+                [self.code("airports", l.get("id", "")), l.get("duration", 0), l.get("overnight", False)]
+                for l in raw.get("layovers", [])
+            ],
+            self._token(raw.get("departure_token")),
+            self._token(raw.get("booking_token")),
+        ]
+
+    def table(self, rows: List[List[Any]]) -> Dict[str, Any]:
+        """Wrap encoded rows with their column names and dictionaries."""
+        return {
+            "columns": {"itinerary": ITINERARY_COLUMNS, "segment": SEGMENT_COLUMNS, "layover": LAYOVER_COLUMNS},
+            "dictionaries": self.dictionaries,
+            "rows": rows,
+        }
+
+def encode_flights(
+    rows: List[Dict[str, Any]],
+    response_format: str = "full",
+    human_readable: bool = True,
+    max_tokens: Optional[int] = None,
+    reserved_tokens: int = 0,
+    issue: Optional[Callable[[str], str]] = None
+) -> Tuple[Any, int]:
+    """
+    Encode ranked raw itineraries, best first, until the token budget is spent.
+
+    Itineraries are added in order while the estimated size of everything
+    sent so far, plus ``reserved_tokens`` for the rest of the response,
+    stays within ``max_tokens``. The first itinerary is always included so
+    a tight budget still returns an answer.
+
+    Args:
+        rows (List[Dict[str, Any]]): Raw SerpAPI rows in the order to return them.
+        response_format (str, optional): "full" (FlightSearchResult dicts) or "compact" (CompactEncoder table). Defaults to "full".
+        human_readable (bool, optional): Also fill the "HH MM" duration strings of the full format. Defaults to True.
+        max_tokens (Optional[int], optional): Token budget for the whole response. Defaults to unlimited.
+        reserved_tokens (int, optional): Tokens already spent by the rest of the response. Defaults to 0.
+        issue (Optional[Callable[[str], str]], optional): Token-to-handle mapping for the compact format. Defaults to None.
+
+    Returns:
+        Tuple[Any, int]: The encoded flights (a list, or a table for "compact") and how many rows it holds.
+    """
+    budget: Optional[int] = None if max_tokens is None else (max_tokens - reserved_tokens) * 4
+    if response_format == "compact":
+        encoder: CompactEncoder = CompactEncoder(issue)
+        base: int = len(compact_json(encoder.table([])))
+        encoded: List[List[Any]] = []
+        used: int = base
+        for raw in rows:
+            mark: Dict[str, int] = encoder.mark()
+            row: List[Any] = encoder.row(raw)
+            used += len(compact_json(row)) + 1
+            if budget is not None and encoded and used + encoder.dictionary_chars > budget:
+                encoder.rollback(mark)
+                break
+            encoded.append(row)
+        return encoder.table(encoded), len(encoded)
+
+    flights: List[Dict[str, Any]] = []
+    used = 2
+    for raw in rows:
+        flight: Dict[str, Any] = serialize_flight(raw, human_readable)
+        used += len(compact_json(flight)) + 1
+        if budget is not None and flights and used > budget:
+            break
+        flights.append(flight)
+    return flights, len(flights)
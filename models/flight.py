@@ -1,51 +1,66 @@
+import json
 from datetime import datetime
-from typing import Optional, List, Dict
-from pydantic import BaseModel, Field, field_validator
+from functools import lru_cache
+from typing import Optional, List, Dict, Type
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
 from enum import Enum
+from utils.validate_date import parse_date
 
-class CabinClassParam(str, Enum):
+class ParamEnum(str, Enum):
+    """
+    Base for enums parsed from tool arguments.
+
+    Lookups are case-insensitive and accept spaces, hyphens or no separator
+    in place of underscores ("round trip", "non-stop", "nonstop"), and are
+    memoized per (enum, string).
+    """
+
+    @classmethod
+    def from_str(cls, s: str, field_name: Optional[str] = None):
+        return _parse_param(cls, s, field_name or PARAM_FIELDS.get(cls.__name__, cls.__name__))
+
+class CabinClassParam(ParamEnum):
     ECONOMY = 1
     PREMIUM_ECONOMY = 2
     BUSINESS = 3
     FIRST = 4
-    
-    @classmethod
-    def from_str(cls, s: str):
-        try:
-            return cls[s.strip().lower().upper()]
-        except KeyError:
-            raise ValueError(
-                f"Invalid cabin_class '{s}'. Must be one of {[c.name.lower() for c in cls]}."
-            )
-
-class FlightTypeParam(str, Enum):
+
+class FlightTypeParam(ParamEnum):
     ROUND_TRIP = 1
     ONE_WAY = 2
     MULTI_CITY = 3
     
-    @classmethod
-    def from_str(cls, s: str):
-        try:
-            return cls[s.strip().lower().upper()]
-        except KeyError:
-            raise ValueError(
-                f"Invalid cabin_class '{s}'. Must be one of {[c.name.lower() for c in cls]}."
-            )
-    
-class StopsParam(str, Enum):
+class StopsParam(ParamEnum):
     ANY = 0
     NON_STOP = 1
     ONE_STOP = 2
     TWO_STOP = 3
-    
-    @classmethod
-    def from_str(cls, s: str):
-        try:
-            return cls[s.strip().lower().upper()]
-        except KeyError:
-            raise ValueError(
-                f"Invalid cabin_class '{s}'. Must be one of {[c.name.lower() for c in cls]}."
-            )
+
+# Tool argument each enum is parsed from, for error messages.
+PARAM_FIELDS: Dict[str, str] = {
+    "CabinClassParam": "cabin_class",
+    "FlightTypeParam": "flight_type",
+    "StopsParam": "no_stops",
+}
+
+@lru_cache(maxsize=None)
+def _param_aliases(cls: Type[ParamEnum]) -> Dict[str, ParamEnum]:
+    aliases: Dict[str, ParamEnum] = {}
+    for member in cls:
+        name: str = member.name.lower()
+        aliases[name] = member
+        aliases[name.replace("_", "")] = member
+    return aliases
+
+@lru_cache(maxsize=1024)
+def _parse_param(cls: Type[ParamEnum], s: str, field_name: str) -> ParamEnum:
+    key: Optional[str] = s.strip().lower().replace("-", "_").replace(" ", "_") if isinstance(s, str) else None
+    member: Optional[ParamEnum] = _param_aliases(cls).get(key)
+    if member is None:
+        raise ValueError(
+            f"Invalid {field_name} '{s}'. Must be one of {[c.name.lower() for c in cls]}."
+        )
+    return member
 
 class CabinClassResult(str, Enum):
     ECONOMY = "economy"
@@ -63,17 +78,25 @@ class Flight(BaseModel):
     flight_number: str
     departure_airport: str = Field(..., pattern="^[A-Z]{3}$", description="3-letter IATA code")
     arrival_airport: str = Field(..., pattern="^[A-Z]{3}$", description="3-letter IATA code")
-    departure_time: str
-    arrival_time: str
-    duration: str  # e.g., "5h 30m"
+    departure_time: Optional[datetime] = None  # local time with its UTC offset; None when it cannot be placed
+    arrival_time: Optional[datetime] = None  # local time with its UTC offset; None when it cannot be placed
+    duration_minutes: int
+    duration: Optional[str] = None  # presentation only, e.g. "5H 30M"
     airplane: str
     travel_class: str # "economy", "premium_economy", "business", "first"
 
 class LayOver(BaseModel):
-    duration: str  # e.g., "5h 30m"
+    duration_minutes: int
+    duration: Optional[str] = None  # presentation only, e.g. "5H 30M"
     airport: str = Field(..., pattern="^[A-Z]{3}$")
     overnight: bool
     
+class TripLeg(BaseModel):
+    """One leg of a multi-city trip."""
+    departure_id: str = Field(..., description="IATA airport code to depart from")
+    arrival_id: str = Field(..., description="IATA airport code to arrive at")
+    date: str = Field(..., description="Departure date in YYYY-MM-DD format")
+
 class FlightSearchParams(BaseModel):
     departure_id: str = Field(..., pattern="^[A-Z]{3}$")
     arrival_id: str = Field(..., pattern="^[A-Z]{3}$")
@@ -92,19 +115,66 @@ class FlightSearchParams(BaseModel):
     departure_token: Optional[str] = None # Encoded token for return flights
     booking_token: Optional[str] = None # Encoded token for booking
     
+    @field_validator("departure_id", "arrival_id", mode="before")
+    def normalize_iata_code(cls, v):
+        if isinstance(v, str):
+            return v.strip().upper()
+        return v
+
     @field_validator("departure_date", "return_date")
-    def validate_date_format(cls, v):
+    def validate_date_format(cls, v, info: ValidationInfo):
         if v is not None:
-            try:
-                datetime.strptime(v, "%Y-%m-%d")
-            except ValueError:
-                raise ValueError(f"Date '{v}' is not in 'YYYY-MM-DD' format.")
+            parse_date(v, info.field_name)
         return v
 
+    def cache_key(self) -> str:
+        """
+        Canonical key for this search.
+
+        IATA codes are already uppercased and enum values resolved to ints by
+        validation; fields left at their defaults are dropped so equivalent
+        searches share one key. Return-leg and booking lookups keep every
+        other field next to their tokens: SerpAPI prices and localizes those
+        results by adults, locale and the rest of the search, so the same
+        token under different parameters is a different answer.
+        """
+        return json.dumps(self.model_dump(exclude_defaults=True), sort_keys=True, separators=(",", ":"))
+
+    def shape_key(self) -> str:
+        """Key of the fields besides route, dates and cabin that change the fares found; see ``shape_key``."""
+        return shape_key(
+            self.adults, self.children, self.infants_in_seat, self.infants_in_lap,
+            self.type, self.stops, self.bags, self.search_location
+        )
+
+def shape_key(
+    adults: int,
+    children: Optional[int],
+    infants_in_seat: Optional[int],
+    infants_in_lap: Optional[int],
+    type: Optional[int],
+    stops: Optional[int],
+    bags: Optional[int],
+    search_location: Optional[str]
+) -> str:
+    """
+    Canonical key of a search's shape: passengers, trip type, stops, bags and locale.
+
+    Fares are only comparable between searches of one shape, so fare history
+    stores and filters on it. ``max_price`` is left out: it only hides
+    itineraries above it, so it never changes the cheapest one.
+    """
+    return json.dumps(
+        [adults, children or 0, infants_in_seat or 0, infants_in_lap or 0, type or 1, stops or 0, bags or 0,
+         search_location or "us"],
+        separators=(",", ":")
+    )
+
 class FlightSearchResult(BaseModel):
     flights: List[Flight]
     layover: Optional[List[LayOver]] = None
-    total_duration: str  # in hours and minutes (HH MM)
+    total_duration_minutes: int
+    total_duration: Optional[str] = None  # presentation only, in hours and minutes (HH MM)
     price: float
     type: str  # "Round trip", "One way", "Multi city"
     departure_token: Optional[str] # Encoded token for return flights
@@ -0,0 +1,104 @@
+import sys
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from utils.airports import airport_timezone, parse_local_time, segment_times
+
+# Response serialization for itineraries. Results go straight from raw
+# SerpAPI JSON to plain response dicts with the same shape as
+# FlightSearchResult.model_dump(mode="json"). No Pydantic model is built or
+# validated on this path: the models in models/flight.py describe the shape
+# and benchmarks/bench_transform.py checks the two agree. Airline, airport
+# and aircraft names are interned, so serialized rows (pages, route
+# snapshots) share one string per name.
+
+_intern = sys.intern
+
+@lru_cache(maxsize=256)
+def _duration_text(minutes: int) -> str:
+    """Convert duration in minutes to "HH MM" format."""
+    return f"{minutes // 60}H {minutes % 60}M"
+
+@lru_cache(maxsize=64)
+def _travel_class(cabin_class: str) -> str:
+    """Normalize "Premium Economy" to "premium_economy"."""
+    return _intern("_".join(cabin_class.lower().split()))
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+@lru_cache(maxsize=4096)
+def _local_time_text(value: str, airport: str) -> Optional[str]:
+    """ISO 8601 form, with UTC offset, of a SerpAPI local time at an airport in the timezone table."""
+    return _isoformat(parse_local_time(value, airport))
+
+def _time_texts(segments: List[Dict[str, Any]]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    ISO 8601 departure and arrival times of each segment.
+
+    Itineraries whose airports are all in the timezone table take the
+    memoized per-airport path; any other is placed as a whole by
+    ``segment_times``.
+    """
+    ends: List[Tuple[Dict[str, Any], Dict[str, Any]]] = [
+        (s.get("departure_airport") or {}, s.get("arrival_airport") or {}) for s in segments
+    ]
+    if all(airport_timezone(d.get("id", "")) is not None and airport_timezone(a.get("id", "")) is not None for d, a in ends):
+        return [
+            (_local_time_text(d.get("time", ""), d.get("id", "")), _local_time_text(a.get("time", ""), a.get("id", "")))
+            for d, a in ends
+        ]
+    return [(_isoformat(departs), _isoformat(arrives)) for departs, arrives in segment_times(segments)]
+
+def serialize_flight(raw: Dict[str, Any], human_readable: bool = True) -> Dict[str, Any]:
+    """
+    Serialize a raw SerpAPI itinerary straight to the response shape.
+
+    Produces the same dict as ``FlightSearchResult.model_dump(mode="json")``
+    on the transformed row, without building intermediate models.
+
+    Args:
+        raw (Dict[str, Any]): Raw itinerary from SerpAPI.
+        human_readable (bool, optional): Also fill the "HH MM" duration strings. Defaults to True.
+
+    Returns:
+        Dict[str, Any]: Itinerary in the FlightSearchResult response shape.
+    """
+    segments: List[Dict[str, Any]] = raw.get("flights", [])
+    flights: List[Dict[str, Any]] = []
+    for s, (departs, arrives) in zip(segments, _time_texts(segments)):
+        departure: Dict[str, Any] = s.get("departure_airport") or {}
+        arrival: Dict[str, Any] = s.get("arrival_airport") or {}
+        departure_id: str = _intern(departure.get("id", ""))
+        arrival_id: str = _intern(arrival.get("id", ""))
+        flights.append({
+            "airline": _intern(s.get("airline", "")),
+            "flight_number": s.get("flight_number", ""),
+            "departure_airport": departure_id,
+            "arrival_airport": arrival_id,
+            "departure_time": departs,
+            "arrival_time": arrives,
+            "duration_minutes": s.get("duration", 0),
+            "duration": _duration_text(s.get("duration", 0)) if human_readable else None,
+            "airplane": _intern(s.get("airplane", "")),
+            "travel_class": _travel_class(s.get("travel_class", "")),
+        })
+
+    return {
+        "flights": flights,
+        "layover": [
+            {
+                "duration_minutes": l.get("duration", 0),
+                "duration": _duration_text(l.get("duration", 0)) if human_readable else None,
+                "airport": _intern(l.get("id", "")),
+                "overnight": l.get("overnight", False),
+            }
+            for l in raw.get("layovers", [])
+        ] or None,
+        "total_duration_minutes": raw.get("total_duration", 0),
+        "total_duration": _duration_text(raw.get("total_duration", 0)) if human_readable else None,
+        "price": float(raw.get("price", 0)),
+        "type": raw.get("type", ""),
+        "departure_token": raw.get("departure_token"),
+        "booking_token": raw.get("booking_token"),
+    }
@@ -0,0 +1,39 @@
+import json
+import asyncio
+from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+from fastmcp import FastMCP
+from utils.validate_date import validate_date
+from data.history import history
+from data.snapshots import SNAPSHOT_SHAPE, snapshots, snapshot_uri
+from data.subscriptions import subscriptions
+
+async def route_snapshot(origin: str, dest: str, date: str) -> str:
+    """
+    Latest known one-way economy flights for one adult on a route and departure date, without calling SerpAPI.
+
+    Served from the most recent cached search of that shape, or from fare
+    history after a restart. Subscribe to the URI (``subscriptions/listen``,
+    or ``resources/subscribe`` on older protocol versions) to be notified
+    when a later search or background refresh changes it.
+    """
+    validate_date(date, "date")
+    uri: str = snapshot_uri(origin.upper(), dest.upper(), date)
+
+    snapshot: Optional[Dict[str, Any]] = snapshots.get(uri)
+    if snapshot is None and history is not None:
+        stored: Optional[Dict[str, Any]] = await asyncio.to_thread(
+            history.store.latest_search, origin.upper(), dest.upper(), date, SNAPSHOT_SHAPE
+        )
+        if stored is not None:
+            snapshot = {"uri": uri, "source": "history", **stored}
+
+    if snapshot is None:
+        return json.dumps({"uri": uri, "available": False})
+
+    fetched_at: str = datetime.fromtimestamp(snapshot["fetched_at"], tz=timezone.utc).isoformat(timespec="seconds")
+    return json.dumps({**snapshot, "available": True, "fetched_at": fetched_at})
+
+def register(mcp: FastMCP) -> None:
+    subscriptions.register(mcp)
+    mcp.resource("flights://{origin}/{dest}/{date}", mime_type="application/json")(route_snapshot)
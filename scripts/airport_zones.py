@@ -0,0 +1,52 @@
+"""
+Regenerate the ``_AIRPORT_ZONES`` table in utils/airports.py.
+
+Looks up the IANA timezone of every code in ``_IATA_AIRPORTS`` in the
+``airportsdata`` package (a build-time tool only; the server does not
+import it) and prints the table body, one "Zone: codes" line per zone,
+for pasting between the triple quotes (lines wrapped at 100 columns).
+
+Codes ``airportsdata`` does not know keep the zone they already have in
+the table, since those were filled in by hand; they are listed on stderr
+so a newer ``airportsdata`` release can be checked for them. A code with
+no zone in either place fails the run.
+
+Usage:
+    pip install airportsdata
+    python -m scripts.airport_zones > zones.txt
+"""
+import sys
+import textwrap
+from typing import Dict, List
+
+import airportsdata
+
+from utils.airports import _AIRPORT_ZONES, _IATA_AIRPORTS, _zone_table
+
+
+def main() -> None:
+    known: Dict[str, Dict[str, str]] = airportsdata.load("IATA")
+    current: Dict[str, str] = _zone_table(_AIRPORT_ZONES)
+    zones: Dict[str, List[str]] = {}
+    manual: List[str] = []
+    missing: List[str] = []
+    for code in _IATA_AIRPORTS.split():
+        zone: str = known.get(code, {}).get("tz", "")
+        if not zone:
+            zone = current.get(code, "")
+            (manual if zone else missing).append(code)
+        if zone:
+            zones.setdefault(zone, []).append(code)
+
+    if missing:
+        sys.exit(f"No timezone for {missing}; add them to _AIRPORT_ZONES by hand first.")
+    if manual:
+        print(f"Kept hand-entered zones for {manual}", file=sys.stderr)
+    for zone in sorted(zones):
+        print(textwrap.fill(
+            f"{zone}: {' '.join(zones[zone])}", width=100, initial_indent="    ", subsequent_indent="        "
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Shared fixtures: a local fake SerpAPI and searches dated safely in the future.
+
+Tests drive the async client with ``asyncio.run`` so the suite needs
+nothing beyond pytest.
+"""
+import os
+from datetime import date, timedelta
+from typing import Callable, Iterator
+
+import pytest
+
+# Keep fare history out of the user's data directory; set before any module builds the recorder.
+os.environ.setdefault("FARE_HISTORY_DB_PATH", "")
+
+from benchmarks.fake_serp import FakeSerpApi
+from models.flight import FlightSearchParams
+
+
+def _search(departure_id: str = "JFK", arrival_id: str = "LAX", days_out: int = 30) -> FlightSearchParams:
+    return FlightSearchParams(
+        departure_id=departure_id,
+        arrival_id=arrival_id,
+        departure_date=(date.today() + timedelta(days=days_out)).isoformat()
+    )
+
+
+@pytest.fixture
+def search() -> Callable[..., FlightSearchParams]:
+    """Builds a search ``days_out`` days from today, so it never falls behind validation."""
+    return _search
+
+
+@pytest.fixture
+def fake_serp() -> Iterator[FakeSerpApi]:
+    """A fake SerpAPI answering after 0.2 s, stopped after the test."""
+    with FakeSerpApi(latency=0.2, seed=1) as fake:
+        yield fake
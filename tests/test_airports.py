@@ -0,0 +1,40 @@
+from typing import Any, Dict
+
+from utils.airports import parse_local_time, segment_times
+from utils.query import SORT_KEYS
+
+
+def _segment(origin: str, destination: str, departs: str, arrives: str, minutes: int) -> Dict[str, Any]:
+    return {
+        "departure_airport": {"id": origin, "time": departs},
+        "arrival_airport": {"id": destination, "time": arrives},
+        "duration": minutes,
+    }
+
+
+def test_unknown_connection_is_placed_from_the_flight_duration() -> None:
+    # 08:00 in New York (UTC-5) plus 3h40 is 16:40 UTC, so 10:40 at ZZZ means UTC-6
+    times = segment_times([
+        _segment("JFK", "ZZZ", "2026-11-20 08:00", "2026-11-20 10:40", 220),
+        _segment("ZZZ", "LAX", "2026-11-20 12:00", "2026-11-20 13:30", 150),
+    ])
+    assert [t.isoformat() for pair in times for t in pair] == [
+        "2026-11-20T08:00:00-05:00", "2026-11-20T10:40:00-06:00",
+        "2026-11-20T12:00:00-06:00", "2026-11-20T13:30:00-08:00",
+    ]
+
+
+def test_unanchored_times_are_none_not_naive() -> None:
+    assert parse_local_time("2026-11-20 08:00", "ZZZ") is None
+    assert segment_times([_segment("QQQ", "ZZZ", "2026-11-20 08:00", "2026-11-20 10:40", 220)]) == [(None, None)]
+
+
+def test_departure_sort_orders_instants_and_puts_unplaced_last() -> None:
+    rows = [
+        {"flights": [_segment("QQQ", "ZZZ", "2026-11-20 06:00", "2026-11-20 08:00", 120)]},
+        {"flights": [_segment("LAX", "SFO", "2026-11-20 07:00", "2026-11-20 08:30", 90)]},
+        {"flights": [_segment("JFK", "BOS", "2026-11-20 09:00", "2026-11-20 10:15", 75)]},
+    ]
+    ordered = sorted(rows, key=SORT_KEYS["departure_time"])
+    # 09:00 in New York is 06:00 in Los Angeles, before the 07:00 departure there
+    assert [row["flights"][0]["departure_airport"]["id"] for row in ordered] == ["JFK", "LAX", "QQQ"]
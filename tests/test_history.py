@@ -0,0 +1,50 @@
+import asyncio
+import os
+from typing import Any, Callable, Dict, List
+
+from data.db import FareHistoryStore
+from data.history import FareHistoryRecorder
+from models.flight import FlightSearchParams
+
+
+def _rows(*prices: float) -> List[Dict[str, Any]]:
+    return [{"price": price, "flights": [], "total_duration": 300} for price in prices]
+
+
+def test_searches_of_another_shape_do_not_mix(tmp_path: Any, search: Callable[..., FlightSearchParams]) -> None:
+    store = FareHistoryStore(str(tmp_path / "history.db"))
+    recorder = FareHistoryRecorder(store, flush_interval=0.01)
+    one_adult = search()
+    four_adults = one_adult.model_copy(update={"adults": 4})
+
+    async def record() -> None:
+        recorder.record(one_adult, _rows(300.0, 350.0))
+        recorder.record(four_adults, _rows(1200.0))
+        recorder.record(one_adult.model_copy(update={"stops": 1}), _rows(250.0))
+        await recorder.stop()
+
+    asyncio.run(record())
+    assert recorder.written == 3
+    history = store.price_history("JFK", "LAX", one_adult.shape_key())
+    assert [point["min_price"] for point in history] == [300.0]
+    assert store.lowest_fare("JFK", "LAX", four_adults.shape_key())["price"] == 1200.0
+
+    # Compaction keeps the shapes apart too
+    store.compact(detail_days=-1, retention_days=180)
+    assert [p["min_price"] for p in store.price_history("JFK", "LAX", four_adults.shape_key())] == [1200.0]
+    assert store.lowest_fare("JFK", "LAX", one_adult.shape_key())["price"] == 300.0
+
+
+def test_stop_writes_what_is_still_queued(tmp_path: Any, search: Callable[..., FlightSearchParams]) -> None:
+    path: str = str(tmp_path / "data" / "history.db")
+    recorder = FareHistoryRecorder(FareHistoryStore(path), batch_size=2, flush_interval=60)
+
+    async def record() -> None:
+        for day in range(5):
+            recorder.record(search(days_out=30 + day), _rows(100.0 + day))
+        await recorder.stop()
+
+    asyncio.run(record())
+    assert recorder.written == 5
+    assert os.path.exists(path)
+    assert len(FareHistoryStore(path).price_history("JFK", "LAX", search().shape_key())) == 5
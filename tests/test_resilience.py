@@ -0,0 +1,89 @@
+import time
+import asyncio
+from typing import Any, Callable
+
+import pytest
+
+from apis.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, UpstreamError
+from apis.serp import SerpApi
+from benchmarks.fake_serp import FakeSerpApi
+from models.flight import FlightSearchParams
+
+
+def _run(serp: SerpApi, call: Callable[[], Any]) -> Any:
+    async def run() -> Any:
+        try:
+            return await call()
+        finally:
+            await serp.aclose()
+    return asyncio.run(run())
+
+
+def test_transient_failures_are_retried(fake_serp: FakeSerpApi, search: Callable[..., FlightSearchParams]) -> None:
+    fake_serp.latency = 0.01
+    fake_serp.fail_next(2)
+    serp = SerpApi("fake", base_url=fake_serp.url, retry=RetryPolicy(attempts=3, base_delay=0.01))
+
+    flights = _run(serp, lambda: serp.get_flights(search()))
+    assert flights
+    assert fake_serp.request_count == 3
+    assert serp.retries == 2
+
+
+def test_permanent_failures_are_not_retried(fake_serp: FakeSerpApi, search: Callable[..., FlightSearchParams]) -> None:
+    fake_serp.latency = 0.01
+    fake_serp.fail_next(1, status=400)
+    serp = SerpApi("fake", base_url=fake_serp.url, retry=RetryPolicy(attempts=3, base_delay=0.01))
+
+    with pytest.raises(UpstreamError) as error:
+        _run(serp, lambda: serp.get_flights(search()))
+    assert not error.value.transient
+    assert fake_serp.request_count == 1
+
+
+def test_breaker_opens_fails_fast_and_closes_after_a_trial(fake_serp: FakeSerpApi, search: Callable[..., FlightSearchParams]) -> None:
+    fake_serp.latency = 0.01
+    fake_serp.outage = True
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.3)
+    serp = SerpApi("fake", base_url=fake_serp.url, retry=RetryPolicy(attempts=1), breaker=breaker)
+
+    async def run() -> None:
+        for _ in range(2):
+            with pytest.raises(UpstreamError):
+                await serp.get_flights(search())
+        assert breaker.state == breaker.OPEN
+
+        # Open: fails without calling upstream
+        with pytest.raises(CircuitOpenError):
+            await serp.get_flights(search())
+        assert fake_serp.request_count == 2
+
+        # Half-open: one trial goes through; a failed trial opens the circuit again
+        await asyncio.sleep(0.35)
+        with pytest.raises(UpstreamError):
+            await serp.get_flights(search())
+        assert breaker.state == breaker.OPEN
+        assert fake_serp.request_count == 3
+
+        # A successful trial closes it
+        fake_serp.outage = False
+        await asyncio.sleep(0.35)
+        assert await serp.get_flights(search())
+        assert breaker.state == breaker.CLOSED
+
+    _run(serp, run)
+
+
+def test_hedge_wins_against_a_slow_request(fake_serp: FakeSerpApi, search: Callable[..., FlightSearchParams]) -> None:
+    fake_serp.latency = 0.05
+    fake_serp.slow_latency = 5.0
+    fake_serp.slow_next(1)
+    serp = SerpApi("fake", base_url=fake_serp.url, hedge=True, hedge_quantile=0.9)
+    for _ in range(serp.latency.min_samples):
+        serp.latency.add(0.05)
+
+    start: float = time.perf_counter()
+    assert _run(serp, lambda: serp.get_flights(search()))
+    assert time.perf_counter() - start < 1.0
+    assert fake_serp.request_count == 2
+    assert (serp.hedged, serp.hedge_wins) == (1, 1)
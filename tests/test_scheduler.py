@@ -0,0 +1,44 @@
+import asyncio
+import os
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from apis.scheduler import QuotaBudget, QuotaExceeded, UpstreamScheduler, client_key
+from data.db import QuotaStore
+
+
+def test_quota_is_stored_off_the_event_loop_and_shared(tmp_path: Any) -> None:
+    path: str = str(tmp_path / "quota" / "serp_quota.db")
+    budget = QuotaBudget(limit=3, background_reserve=0.0, store=QuotaStore(path))
+    # Nothing is opened until the first call
+    assert not os.path.exists(path)
+
+    async def calls(scheduler: UpstreamScheduler, n: int) -> None:
+        for _ in range(n):
+            await scheduler.acquire("a")
+
+    asyncio.run(calls(UpstreamScheduler(rate=1000, quota=budget), 2))
+    assert budget.used == 2
+
+    # A second worker on the same file starts from the stored total
+    other = UpstreamScheduler(rate=1000, quota=QuotaBudget(limit=3, background_reserve=0.0, store=QuotaStore(path)))
+    asyncio.run(calls(other, 1))
+    with pytest.raises(QuotaExceeded):
+        asyncio.run(calls(other, 1))
+    assert QuotaStore(path).get(budget.period_key()) == 3
+
+
+def test_stateless_requests_are_keyed_by_client_id_not_request() -> None:
+    def ctx(client_id: Any, headers: dict) -> SimpleNamespace:
+        request = SimpleNamespace(headers=headers, query_params={})
+        return SimpleNamespace(
+            client_id=client_id, transport="streamable-http", request_context=SimpleNamespace(request=request),
+            session_id=os.urandom(4).hex()
+        )
+
+    assert client_key(ctx("app-1", {})) == "app-1"
+    assert client_key(ctx(None, {"mcp-session-id": "s-1"})) == "s-1"
+    # No client ID and no session: the anonymous queue, not a queue per request
+    assert client_key(ctx(None, {})) is None
@@ -0,0 +1,66 @@
+import time
+import asyncio
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from apis.serp import SerpApi
+from benchmarks.fake_serp import FakeSerpApi
+from models.flight import FlightSearchParams
+
+CALLS: int = 10
+
+
+def test_identical_searches_share_one_upstream_call(fake_serp: FakeSerpApi, search: Callable[..., FlightSearchParams]) -> None:
+    async def run() -> List[Any]:
+        serp = SerpApi("fake", base_url=fake_serp.url)
+        try:
+            return await asyncio.gather(*(serp.search_flights(search()) for _ in range(CALLS)))
+        finally:
+            await serp.aclose()
+
+    lookups = asyncio.run(run())
+    assert fake_serp.request_count == 1
+    assert sum(lookup.coalesced for lookup in lookups) == CALLS - 1
+    assert all(lookup.flights == lookups[0].flights for lookup in lookups)
+
+
+@pytest.mark.parametrize("transport", ["http", "thread"])
+def test_concurrent_searches_overlap(fake_serp: FakeSerpApi, search: Callable[..., FlightSearchParams], transport: str) -> None:
+    async def run() -> Dict[str, float]:
+        serp = SerpApi("fake", base_url=fake_serp.url, transport=transport, max_connections=CALLS, max_workers=CALLS)
+        try:
+            start: float = time.perf_counter()
+            await serp.get_flights(search())
+            single: float = time.perf_counter() - start
+
+            # Different dates, so nothing is coalesced and every call goes upstream
+            start = time.perf_counter()
+            await asyncio.gather(*(serp.get_flights(search(days_out=31 + i)) for i in range(CALLS)))
+            return {"single": single, "concurrent": time.perf_counter() - start}
+        finally:
+            await serp.aclose()
+
+    timings = asyncio.run(run())
+    assert fake_serp.request_count == CALLS + 1
+    # Queued one after another they would take CALLS times as long
+    assert timings["concurrent"] < 3 * max(timings["single"], fake_serp.latency)
+
+
+def test_cancelling_a_search_stops_waiting_on_upstream(fake_serp: FakeSerpApi, search: Callable[..., FlightSearchParams]) -> None:
+    fake_serp.latency = 5.0
+
+    async def run() -> float:
+        serp = SerpApi("fake", base_url=fake_serp.url)
+        try:
+            task = asyncio.ensure_future(serp.get_flights(search()))
+            await asyncio.sleep(0.2)
+            start: float = time.perf_counter()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return time.perf_counter() - start
+        finally:
+            await serp.aclose()
+
+    assert asyncio.run(run()) < 1.0
@@ -0,0 +1,80 @@
+import asyncio
+from typing import Any, Callable, List
+
+import pytest
+from fastmcp import FastMCP
+from mcp.client.client import Client
+
+import resources.flights
+from data.snapshots import snapshot_uri, snapshots
+from data.subscriptions import subscriptions
+from models.flight import FlightSearchParams
+
+
+def _server() -> FastMCP:
+    mcp = FastMCP("snapshots")
+    resources.flights.register(mcp)
+    return mcp
+
+
+def test_only_the_canonical_search_updates_a_snapshot(search: Callable[..., FlightSearchParams]) -> None:
+    one_way = search().model_copy(update={"type": 2})
+    uri: str = snapshot_uri("JFK", "LAX", one_way.departure_date)
+
+    async def update() -> None:
+        snapshots.update(one_way, [{"price": 300, "booking_token": "a"}])
+        snapshots.update(one_way.model_copy(update={"adults": 4}), [{"price": 1200, "booking_token": "b"}])
+        snapshots.update(one_way.model_copy(update={"cabin_class": 3}), [{"price": 2500, "booking_token": "c"}])
+        snapshots.update(search(), [{"price": 500, "booking_token": "d"}])
+
+    asyncio.run(update())
+    assert snapshots.get(uri)["min_price"] == 300
+
+
+def test_listen_stream_is_told_when_a_snapshot_changes(search: Callable[..., FlightSearchParams]) -> None:
+    one_way = search(days_out=40).model_copy(update={"type": 2})
+    uri: str = snapshot_uri("JFK", "LAX", one_way.departure_date)
+
+    async def listen() -> Any:
+        async with Client(_server()._mcp_server) as client:
+            snapshots.update(one_way, [{"price": 300, "booking_token": "a"}])
+            async with client.listen(resource_subscriptions=[uri]) as subscription:
+                snapshots.update(one_way, [{"price": 280, "booking_token": "a"}])
+                return await asyncio.wait_for(subscription.__anext__(), 2)
+
+    assert asyncio.run(listen()).uri == uri
+
+
+# resources/subscribe is removed as of 2026-07-28, but clients on older versions still send it
+@pytest.mark.filterwarnings("ignore:resources/")
+def test_legacy_subscribers_are_told_until_they_unsubscribe(search: Callable[..., FlightSearchParams]) -> None:
+    one_way = search(days_out=41).model_copy(update={"type": 2})
+    uri: str = snapshot_uri("JFK", "LAX", one_way.departure_date)
+    updated: List[str] = []
+
+    async def on_message(message: Any) -> None:
+        if getattr(message, "method", None) == "notifications/resources/updated":
+            updated.append(message.params.uri)
+
+    async def subscribe() -> None:
+        async with Client(_server()._mcp_server, mode="legacy", message_handler=on_message) as client:
+            # Reading alone does not subscribe
+            await client.read_resource(uri)
+            snapshots.update(one_way, [{"price": 300, "booking_token": "a"}])
+            snapshots.update(one_way, [{"price": 290, "booking_token": "a"}])
+            await asyncio.sleep(0.1)
+            assert updated == []
+
+            await client.subscribe_resource(uri)
+            snapshots.update(one_way, [{"price": 280, "booking_token": "a"}])
+            await asyncio.sleep(0.1)
+            await client.unsubscribe_resource(uri)
+            snapshots.update(one_way, [{"price": 270, "booking_token": "a"}])
+            await asyncio.sleep(0.1)
+            # A connection that closes without unsubscribing is forgotten
+            await client.subscribe_resource(uri)
+            assert subscriptions.stats()["subscribed_connections"] == 1
+
+    asyncio.run(subscribe())
+    assert updated == [uri]
+    assert subscriptions.stats()["subscribed_connections"] == 0
@@ -0,0 +1,44 @@
+import asyncio
+from contextlib import AsyncExitStack
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from apis.watch import PriceWatcher
+from data.db import WatchStore
+from data.subscriptions import subscriptions
+from models.flight import FlightSearchParams
+
+
+def test_session_watches_are_not_stored_and_end_with_the_session(
+    tmp_path: Any, search: Callable[..., FlightSearchParams]
+) -> None:
+    path: str = str(tmp_path / "watches.db")
+    watcher = PriceWatcher(store=WatchStore(path))
+
+    async def start() -> None:
+        # No polling: the test feeds prices itself
+        watcher._wake = asyncio.Event()
+
+    watcher.start = start
+
+    async def watch() -> None:
+        connection = SimpleNamespace(exit_stack=AsyncExitStack())
+        watcher.attach("session-1", connection)
+        await watcher.create("client-1", search(), 300.0)
+        await watcher.create("session-1", search(), 300.0, durable=False)
+        assert len(WatchStore(path).load()) == 1
+
+        # Both watches fire on the shared route
+        published: int = subscriptions.stats()["updates_published"]
+        watcher.observe(search(), [{"price": 280}])
+        await asyncio.sleep(0.1)
+        assert subscriptions.stats()["updates_published"] == published + 2
+
+        await connection.exit_stack.aclose()
+        assert watcher.list("session-1") == []
+        assert [w.owner for w in watcher.list("client-1")] == ["client-1"]
+        assert watcher.released == 1
+
+    asyncio.run(watch())
+    # Only the durable watch resumes after a restart
+    assert [row["owner"] for row in WatchStore(path).load()] == ["client-1"]
@@ -0,0 +1,167 @@
+import os
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Tuple, Callable, Awaitable
+from fastmcp import Context, FastMCP
+from models.flight import FlightSearchParams
+from models.itinerary import serialize_flight
+from utils.validation import build_searches
+from utils.airports import expand_airports
+from utils.fanout import bounded_fanout
+from utils.rate_limit import RateLimiter
+from utils.metrics import instrument
+from apis.upstream import get_serp
+from apis.scheduler import client_key
+
+if TYPE_CHECKING:
+    from apis.serp import FlightLookup
+
+MAX_SEARCHES: int = int(os.getenv("BATCH_MAX_SEARCHES", "25"))
+DEFAULT_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "5"))
+
+limiter: RateLimiter = RateLimiter(
+    rate=float(os.getenv("BATCH_RATE", "5")),
+    burst=int(os.getenv("BATCH_BURST", "5"))
+)
+
+def _plan_routes(origins: List[str], destinations: List[str]) -> List[Tuple[str, str]]:
+    """Expand metro codes and build the deduplicated origin x destination cross-product."""
+    airports_from: List[str] = [a for code in origins for a in expand_airports(code)]
+    airports_to: List[str] = [a for code in destinations for a in expand_airports(code)]
+    routes: Dict[Tuple[str, str], None] = {}
+    for origin in airports_from:
+        for destination in airports_to:
+            if origin != destination:
+                routes[(origin, destination)] = None
+    return list(routes)
+
+@instrument("search_flights_batch")
+async def search_flights_batch(
+    origins: List[str],
+    destinations: List[str],
+    departure_date: str,
+    adults: int = 1,
+    return_date: Optional[str] = None,
+    flight_type: Optional[str] = "round_trip",
+    cabin_class: Optional[str] = "economy",
+    children: Optional[int] = 0,
+    infants_in_seat: Optional[int] = 0,
+    infants_in_lap: Optional[int] = 0,
+    no_stops: Optional[str] = "any",
+    bags: Optional[int] = 0,
+    max_price: Optional[float] = None,
+    search_location: Optional[str] = "us",
+    max_results: int = 10,
+    max_concurrency: Optional[int] = None,
+    human_readable: bool = True,
+    ctx: Optional[Context] = None
+) -> Dict[str, Any]:
+    """
+    Search every origin/destination pair at once and merge the results.
+
+    Metro area codes (e.g. "NYC", "LON") expand to their airports. Duplicate
+    and same-airport pairs are dropped, the remaining routes are searched in
+    parallel and all itineraries are ranked by price in one list. A route that
+    fails is reported in ``legs`` without failing the batch.
+
+    Args:
+        origins (List[str]): IATA airport or metro codes to depart from.
+        destinations (List[str]): IATA airport or metro codes to arrive at.
+        departure_date (str): Departure date in YYYY-MM-DD format.
+        adults (int, optional): Number of adult passengers. Defaults to 1.
+        return_date (Optional[str], optional): Return date in YYYY-MM-DD format. Defaults to None.
+        flight_type (Optional[str], optional): Type of flight: "round_trip", "one_way" (see search_multi_city for multi-city trips). Defaults to "round_trip".
+        cabin_class (Optional[str], optional): Cabin class: "economy", "premium_economy", "business", "first". Defaults to "economy".
+        children (Optional[int], optional): Number of child passengers. Defaults to 0.
+        infants_in_seat (Optional[int], optional): Number of infants in seat. Defaults to 0.
+        infants_in_lap (Optional[int], optional): Number of infants in lap. Defaults to 0.
+        no_stops (Optional[str], optional): Number of stops: "any", "nonstop", "onestop", "twostop". Defaults to "any".
+        bags (Optional[int], optional): Number of bags. Defaults to 0.
+        max_price (Optional[float], optional): Maximum price filter. Defaults to unlimited.
+        search_location (Optional[str], optional): Search location (e.g., "us", "uk"). Defaults to "us".
+        max_results (int, optional): Number of ranked itineraries to return. Defaults to 10.
+        max_concurrency (Optional[int], optional): Maximum parallel searches. Defaults to BATCH_CONCURRENCY.
+        human_readable (bool, optional): Include "HH MM" duration strings next to the integer minutes. Defaults to True.
+
+    Returns:
+        Dict[str, Any]: Ranked itineraries plus per-route latency and errors.
+    """
+    routes: List[Tuple[str, str]] = _plan_routes(origins, destinations)
+    if not routes:
+        raise ValueError("No routes to search. Origins and destinations must differ.")
+    if len(routes) > MAX_SEARCHES:
+        raise ValueError(
+            f"Batch needs {len(routes)} searches, more than the limit of {MAX_SEARCHES}. "
+            f"Use fewer origins or destinations."
+        )
+
+    # Validate every route in one pass; routes that fail are reported without an upstream call
+    searches, invalid = build_searches([
+        {
+            "departure_id": origin,
+            "arrival_id": destination,
+            "departure_date": departure_date,
+            "return_date": return_date,
+            "adults": adults,
+            "children": children,
+            "infants_in_seat": infants_in_seat,
+            "infants_in_lap": infants_in_lap,
+            "flight_type": flight_type,
+            "cabin_class": cabin_class,
+            "no_stops": no_stops,
+            "bags": bags,
+            "max_price": max_price,
+            "search_location": search_location,
+        }
+        for origin, destination in routes
+    ])
+    if len(invalid) == len(routes) and len(set(invalid.values())) == 1:
+        # The same error everywhere (a bad date, cabin class, ...) is an argument error
+        raise ValueError(next(iter(invalid.values())))
+
+    serp = get_serp()
+
+    def search(params: FlightSearchParams) -> Callable[[], Awaitable["FlightLookup"]]:
+        return lambda: serp.search_flights(data=params, client_id=client_key(ctx))
+
+    legs: List[Dict[str, Any]] = [
+        {"departure_id": routes[i][0], "arrival_id": routes[i][1], "error": message}
+        for i, message in invalid.items()
+    ]
+    rows: List[Dict[str, Any]] = []
+
+    async for outcome in bounded_fanout(
+        ((routes[i], search(params)) for i, params in enumerate(searches) if params is not None),
+        concurrency=max_concurrency or DEFAULT_CONCURRENCY,
+        limiter=limiter
+    ):
+        origin, destination = outcome.key
+        leg: Dict[str, Any] = {
+            "departure_id": origin,
+            "arrival_id": destination,
+            "latency_ms": round(outcome.elapsed * 1000, 1),
+        }
+        if outcome.error is not None:
+            leg["error"] = str(outcome.error)
+        else:
+            lookup: "FlightLookup" = outcome.result
+            leg["flights"] = len(lookup.flights)
+            leg["cache_hit"] = lookup.cache_hit
+            rows.extend(lookup.flights)
+        legs.append(leg)
+
+    # Rank the raw rows first so only the returned itineraries are serialized
+    rows.sort(key=lambda f: (f.get("price") or float("inf"), f.get("total_duration") or 0))
+
+    order: Dict[Tuple[str, str], int] = {route: i for i, route in enumerate(routes)}
+    legs.sort(key=lambda leg: order[(leg["departure_id"], leg["arrival_id"])])
+    succeeded: bool = any("error" not in leg for leg in legs)
+
+    return {
+        "success": succeeded,
+        "flights": [serialize_flight(f, human_readable) for f in rows[:max_results]],
+        "total_flights": len(rows),
+        "legs": legs,
+        **({} if succeeded else {"error": "All route searches failed."}),
+    }
+
+def register(mcp: FastMCP) -> None:
+    mcp.tool()(search_flights_batch)
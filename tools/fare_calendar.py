@@ -0,0 +1,188 @@
+import os
+import json
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Tuple, Callable, Awaitable
+from datetime import date, timedelta
+from fastmcp import Context, FastMCP
+from models.flight import FlightSearchParams
+from utils.validate_date import parse_date
+from utils.validation import build_searches, earliest_departure
+from utils.fanout import bounded_fanout
+from utils.rate_limit import RateLimiter
+from utils.metrics import instrument
+from apis.upstream import get_serp
+from apis.scheduler import client_key
+
+if TYPE_CHECKING:
+    from apis.serp import FlightLookup
+
+MAX_SEARCHES: int = int(os.getenv("FARE_CALENDAR_MAX_SEARCHES", "62"))
+DEFAULT_CONCURRENCY: int = int(os.getenv("FARE_CALENDAR_CONCURRENCY", "5"))
+
+# Shared by every calendar call so parallel calendars respect one upstream rate.
+limiter: RateLimiter = RateLimiter(
+    rate=float(os.getenv("FARE_CALENDAR_RATE", "5")),
+    burst=int(os.getenv("FARE_CALENDAR_BURST", "5"))
+)
+
+def _min_price(flights: List[Dict[str, Any]]) -> Optional[float]:
+    """Lowest price among raw SerpAPI rows, ignoring rows without one."""
+    prices: List[float] = [f["price"] for f in flights if f.get("price")]
+    return min(prices) if prices else None
+
+@instrument("get_fare_calendar")
+async def get_fare_calendar(
+    departure_id: str,
+    arrival_id: str,
+    start_date: str,
+    end_date: str,
+    adults: int = 1,
+    min_trip_days: Optional[int] = None,
+    max_trip_days: Optional[int] = None,
+    cabin_class: Optional[str] = "economy",
+    children: Optional[int] = 0,
+    infants_in_seat: Optional[int] = 0,
+    infants_in_lap: Optional[int] = 0,
+    no_stops: Optional[str] = "any",
+    bags: Optional[int] = 0,
+    search_location: Optional[str] = "us",
+    max_concurrency: Optional[int] = None,
+    ctx: Optional[Context] = None
+) -> Dict[str, Any]:
+    """
+    Find the cheapest fare for each departure date in a window.
+
+    Without a trip length the searches are one-way. With ``min_trip_days``
+    and/or ``max_trip_days`` every departure date is paired with each return
+    date in that range and the grid holds round-trip prices. Each date's
+    minimum price is streamed as a log message as soon as it is known.
+
+    Args:
+        departure_id (str): IATA code of the departure airport.
+        arrival_id (str): IATA code of the arrival airport.
+        start_date (str): First departure date in YYYY-MM-DD format.
+        end_date (str): Last departure date in YYYY-MM-DD format.
+        adults (int, optional): Number of adult passengers. Defaults to 1.
+        min_trip_days (Optional[int], optional): Shortest stay in days for round trips. Defaults to None.
+        max_trip_days (Optional[int], optional): Longest stay in days for round trips. Defaults to None.
+        cabin_class (Optional[str], optional): Cabin class: "economy", "premium_economy", "business", "first". Defaults to "economy".
+        children (Optional[int], optional): Number of child passengers. Defaults to 0.
+        infants_in_seat (Optional[int], optional): Number of infants in seat. Defaults to 0.
+        infants_in_lap (Optional[int], optional): Number of infants in lap. Defaults to 0.
+        no_stops (Optional[str], optional): Number of stops: "any", "nonstop", "onestop", "twostop". Defaults to "any".
+        bags (Optional[int], optional): Number of bags. Defaults to 0.
+        search_location (Optional[str], optional): Search location (e.g., "us", "uk"). Defaults to "us".
+        max_concurrency (Optional[int], optional): Maximum parallel searches. Defaults to FARE_CALENDAR_CONCURRENCY.
+
+    Returns:
+        Dict[str, Any]: Date to minimum price grid plus the cheapest combination.
+    """
+    # Validate the window
+    start: date = parse_date(start_date, "start_date")
+    end: date = parse_date(end_date, "end_date")
+    if start < earliest_departure():
+        raise ValueError(f"Invalid start_date '{start_date}'. Must not be in the past.")
+    if end < start:
+        raise ValueError(f"Invalid end_date '{end_date}'. Must not be before start_date '{start_date}'.")
+
+    round_trip: bool = min_trip_days is not None or max_trip_days is not None
+    trip_days: List[Optional[int]] = [None]
+    if round_trip:
+        shortest: int = min_trip_days if min_trip_days is not None else max_trip_days
+        longest: int = max_trip_days if max_trip_days is not None else min_trip_days
+        if shortest < 0 or longest < shortest:
+            raise ValueError(
+                f"Invalid trip length range {min_trip_days}-{max_trip_days}. Must be non-negative and ascending."
+            )
+        trip_days = list(range(shortest, longest + 1))
+
+    departures: List[date] = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    cells: List[Tuple[str, Optional[int]]] = [
+        (d.isoformat(), n) for d in departures for n in trip_days
+    ]
+    if len(cells) > MAX_SEARCHES:
+        raise ValueError(
+            f"Fare calendar needs {len(cells)} searches, more than the limit of {MAX_SEARCHES}. "
+            f"Narrow the date window or trip length range."
+        )
+
+    # Validate every cell in one pass; airports, cabin and passengers are checked once for the grid
+    searches, invalid = build_searches([
+        {
+            "departure_id": departure_id,
+            "arrival_id": arrival_id,
+            "departure_date": departure_date,
+            "return_date": (date.fromisoformat(departure_date) + timedelta(days=nights)).isoformat() if nights is not None else None,
+            "adults": adults,
+            "children": children,
+            "infants_in_seat": infants_in_seat,
+            "infants_in_lap": infants_in_lap,
+            "flight_type": "round_trip" if round_trip else "one_way",
+            "cabin_class": cabin_class,
+            "no_stops": no_stops,
+            "bags": bags,
+            "search_location": search_location,
+        }
+        for departure_date, nights in cells
+    ])
+    if invalid:
+        raise ValueError(next(iter(invalid.values())))
+    base: FlightSearchParams = searches[0]
+
+    serp = get_serp()
+
+    def search(params: FlightSearchParams) -> Callable[[], Awaitable["FlightLookup"]]:
+        return lambda: serp.search_flights(data=params, client_id=client_key(ctx))
+
+    grid: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    cheapest: Optional[Dict[str, Any]] = None
+    cache_hits: int = 0
+    done: int = 0
+
+    async for outcome in bounded_fanout(
+        ((cell, search(params)) for cell, params in zip(cells, searches)),
+        concurrency=max_concurrency or DEFAULT_CONCURRENCY,
+        limiter=limiter
+    ):
+        departure_date, nights = outcome.key
+        label: str = departure_date if nights is None else f"{departure_date}+{nights}d"
+        price: Optional[float] = None
+
+        if outcome.error is not None:
+            errors[label] = str(outcome.error)
+        else:
+            lookup: "FlightLookup" = outcome.result
+            cache_hits += lookup.cache_hit
+            price = _min_price(lookup.flights)
+
+        if nights is None:
+            grid[departure_date] = price
+        else:
+            grid.setdefault(departure_date, {})[str(nights)] = price
+
+        if price is not None and (cheapest is None or price < cheapest["price"]):
+            cheapest = {"departure_date": departure_date, "trip_days": nights, "price": price}
+
+        # Stream each cell to the client as soon as it is known
+        done += 1
+        if ctx is not None:
+            await ctx.report_progress(progress=done, total=len(cells))
+            await ctx.info(json.dumps({"departure_date": departure_date, "trip_days": nights, "min_price": price}))
+
+    return {
+        "success": True,
+        "departure_id": base.departure_id,
+        "arrival_id": base.arrival_id,
+        "round_trip": round_trip,
+        "grid": {
+            d: grid[d] if not round_trip else dict(sorted(grid[d].items(), key=lambda i: int(i[0])))
+            for d in sorted(grid)
+        },
+        "cheapest": cheapest,
+        "searches": len(cells),
+        "cache_hits": cache_hits,
+        "errors": errors,
+    }
+
+def register(mcp: FastMCP) -> None:
+    mcp.tool()(get_fare_calendar)
@@ -1,86 +1,91 @@
-import re
-from typing import Dict, Any, Optional, List
-from datetime import datetime, timedelta
-from models.flight import (
-    CabinClassParam, FlightTypeParam, StopsParam, LayOver, FlightSearchParams, 
-    Flight, FlightSearchResponse, FlightSearchResult
-    )
-from utils.validate_date import validate_date
-from apis.serp import SerpApi
-
-# Get the MCP instance from main server
-from server import mcp
-
-# Initialize SerpApi with the API key from environment variables
 import os
-from dotenv import load_dotenv
-load_dotenv()
+import time
+from typing import TYPE_CHECKING, Dict, Any, Optional, List
+from fastmcp import Context, FastMCP
+from models.flight import FlightSearchParams
+from utils.validation import build_search
+from utils.query import FlightQuery, paginate, decode_cursor, encode_cursor
+from models.compact import RESPONSE_FORMATS, encode_flights, estimate_tokens, compact_json
+from data.handles import token_handles
+from data.sessions import SearchSession, sessions
+from utils.metrics import instrument, metrics
+from apis.upstream import get_serp
+from apis.scheduler import client_key
+from apis.resilience import UpstreamError
 
-api_key: str | None = os.getenv("SERP_API_KEY")
+if TYPE_CHECKING:
+    from apis.serp import FlightLookup
+    from data.cache import CacheEntry
 
-if api_key is None:
-    raise ValueError("SERP_API_KEY environment variable not set")
+DEFAULT_RESPONSE_FORMAT: str = os.getenv("RESPONSE_FORMAT", "full")
 
-serp = SerpApi(api_key=api_key)
+def _check_format(response_format: Optional[str], max_tokens: Optional[int]) -> str:
+    """Validate the response layout arguments; returns the format to use."""
+    response_format = response_format or DEFAULT_RESPONSE_FORMAT
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"Invalid response_format '{response_format}'. Must be one of {RESPONSE_FORMATS}.")
+    if max_tokens is not None and max_tokens < 1:
+        raise ValueError(f"Invalid max_tokens '{max_tokens}'. Must be at least 1.")
+    return response_format
 
-def _transform_duration(duration: int) -> str:
-        """Convert duration in minutes to "HH MM" format."""
-        hours: int = duration // 60
-        minutes: int = duration % 60
-        return f"{hours}H {minutes}M"
-    
-def _transform_travel_class(cabin_class: str) -> str:
-    """Transform cabin class string to match expected format."""
-    cabin_class = cabin_class.strip().lower()
-    return re.sub(r"\s+", "_", cabin_class)
-        
-def _transform_flight_data(flight_data: Dict[str, Any]) -> FlightSearchResult:
+async def _render_page(
+    search_id: str,
+    params: FlightSearchParams,
+    flights: List[Dict[str, Any]],
+    query: FlightQuery,
+    page_size: int,
+    cursor: Optional[str],
+    max_results: Optional[int],
+    extra: Dict[str, Any],
+    response_format: str,
+    human_readable: bool,
+    max_tokens: Optional[int],
+    tool: str
+) -> Dict[str, Any]:
     """
-    Transform the raw flight data from SerpAPI into a structured format.
-
-    Args:
-        flight_data (Dict[str, Any]): Raw flight data from SerpAPI.
+    Filter, sort and page a search's raw rows into a tool response.
 
-    Returns:
-        FlightSearchResult: Transformed flight data from SerpAPI.
+    Only the returned page is serialized. Cursors are tied to the search
+    parameters and the query, so a get_flights cursor also pages the same
+    query through refine_search.
     """
-    
-    flights: List[Flight] = []
-    layovers: List[LayOver] = []
-    
-    for flight_info in flight_data.get("flights", []):
-        flight: Flight = Flight(
-            airline = flight_info.get("airline", ""),
-            flight_number = flight_info.get("flight_number", ""),
-            departure_airport = flight_info.get("departure_airport", {}).get("id", ""),
-            arrival_airport = flight_info.get("arrival_airport", {}).get("id", ""),
-            departure_time = flight_info.get("departure_airport", {}).get("time", ""),
-            arrival_time = flight_info.get("arrival_airport", {}).get("time", ""),
-            duration = _transform_duration(flight_info.get("duration", 0)),
-            airplane = flight_info.get("airplane", ""),
-            travel_class = _transform_travel_class(flight_info.get("travel_class", ""))
-        )
-        flights.append(flight)
-    
-    for layover_info in flight_data.get("layovers", []):
-        layover: LayOver = LayOver(
-            duration = _transform_duration(layover_info.get("duration", 0)),
-            airport = layover_info.get("id", ""),
-            overnight = layover_info.get("overnight", False)
+    with metrics.span("transform", tool):
+        matching: List[Dict[str, Any]] = query.apply(flights, limit=max_results)
+        fingerprint: str = query.fingerprint(params.cache_key())
+        page, next_cursor = paginate(matching, page_size, fingerprint, cursor)
+
+    response: Dict[str, Any] = {
+        "success": True,
+        "search_id": search_id,
+        "flights": None,
+        "total_flights": len(matching),
+        "next_cursor": next_cursor,
+    }
+    if response_format == "full":
+        response["search_criteria"] = params.model_dump()
+    response.update(extra)
+
+    with metrics.span("serialize", tool):
+        encoded, kept = encode_flights(
+            page,
+            response_format,
+            human_readable,
+            max_tokens=max_tokens,
+            # Room for the rest of the response, with a longer cursor if the budget cuts the page
+            reserved_tokens=estimate_tokens(compact_json(response)) + 16 if max_tokens else 0,
+            issue=token_handles().issue
         )
-        layovers.append(layover)
-    
-    return FlightSearchResult(
-        flights = flights,
-        layover = layovers if layovers else None,
-        total_duration = _transform_duration(flight_data.get("total_duration", 0)),
-        price = flight_data.get("price", 0),
-        type = flight_data.get("type", ""),
-        departure_token = flight_data.get("departure_token", None),
-        booking_token = flight_data.get("booking_token", None),
-    )
+    if response_format == "compact":
+        # Other workers must be able to resolve the handles before the client can send them back
+        await token_handles().flush()
+    response["flights"] = encoded
+    if kept < len(page):
+        offset: int = decode_cursor(cursor, fingerprint) if cursor else 0
+        response["next_cursor"] = encode_cursor(offset + kept, fingerprint)
+        response["omitted"] = len(page) - kept
+    return response
 
-@mcp.tool()
+@instrument("get_flights")
 async def get_flights(
     departure_id: str,
     arrival_id: str,
@@ -97,7 +102,20 @@ async def get_flights(
     max_price: Optional[float] = None,
     search_location: Optional[str] = "us",
     departure_token: Optional[str] = None,
-    booking_token: Optional[str] = None
+    booking_token: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    include_airlines: Optional[List[str]] = None,
+    exclude_airlines: Optional[List[str]] = None,
+    max_layover_minutes: Optional[int] = None,
+    no_overnight: bool = False,
+    page_size: int = 10,
+    cursor: Optional[str] = None,
+    human_readable: bool = True,
+    max_results: Optional[int] = None,
+    response_format: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    ctx: Optional[Context] = None
 ) -> Dict[str, Any]:
     """
     Fetch flight prices based on the provided criteria.
@@ -108,7 +126,7 @@ async def get_flights(
         departure_date (str): Departure date in YYYY-MM-DD format.
         adults (int): Number of adult passengers.
         return_date (Optional[str], optional): Return date in YYYY-MM-DD format. Defaults to None.
-        flight_type (Optional[str], optional): Type of flight: "round_trip", "one_way", "multi_city". Defaults to "round_trip".
+        flight_type (Optional[str], optional): Type of flight: "round_trip", "one_way" (see search_multi_city for multi-city trips). Defaults to "round_trip".
         cabin_class (Optional[str], optional): Cabin class: "economy", "premium_economy", "business", "first". Defaults to "economy".
         children (Optional[int], optional): Number of child passengers. Defaults to 0.
         infants_in_seat (Optional[int], optional): Number of infants in seat. Defaults to 0.
@@ -116,39 +134,39 @@ async def get_flights(
         no_stops (Optional[str], optional): Number of stops: "any", "nonstop", "onestop", "twostop". Defaults to "any".
         bags (Optional[int], optional): Number of bags. Defaults to 0.
         max_price (Optional[float], optional): Maximum price filter. Defaults to unlimited.
-        search_location (Optional[str], optional): Search location (e.g., "us", "uk"). Defaults to "us". 
-        
+        search_location (Optional[str], optional): Search location (e.g., "us", "uk"). Defaults to "us".
+        departure_token (Optional[str], optional): Encoded token for return flights, or its "tk_" handle from a compact response. Defaults to None.
+        booking_token (Optional[str], optional): Encoded token for booking, or its "tk_" handle from a compact response. Defaults to None.
+        sort_by (Optional[str], optional): Sort key: "price", "duration", "departure_time", "stops". Defaults to the upstream ranking.
+        descending (bool, optional): Reverse the sort order. Defaults to False.
+        include_airlines (Optional[List[str]], optional): Keep only itineraries flown by one of these airlines (name or IATA code). Defaults to None.
+        exclude_airlines (Optional[List[str]], optional): Drop itineraries with a segment on one of these airlines. Defaults to None.
+        max_layover_minutes (Optional[int], optional): Drop itineraries with a longer layover. Defaults to None.
+        no_overnight (bool, optional): Drop itineraries with an overnight flight or layover. Defaults to False.
+        page_size (int, optional): Number of itineraries per page. Defaults to 10.
+        cursor (Optional[str], optional): Opaque cursor from a previous response's "next_cursor". Defaults to None.
+        human_readable (bool, optional): Include "HH MM" duration strings next to the integer minutes. Defaults to True.
+        max_results (Optional[int], optional): Stop after this many matching itineraries. Defaults to all.
+        response_format (Optional[str], optional): "full" for one nested object per itinerary, or "compact" for a
+            columnar table with airline/airport dictionaries, short token handles and no search_criteria echo.
+            Defaults to RESPONSE_FORMAT ("full").
+        max_tokens (Optional[int], optional): Approximate token budget for the response; the page is filled with
+            the best itineraries until it is spent and "next_cursor" continues after the last one. Defaults to unlimited.
+
     Returns:
-        List[Dict[str, Any]]: List of dictionaries containing flight details.
+        Dict[str, Any]: Dictionary containing flight details, with a "search_id" that refine_search accepts.
     """
-    # Validate date formats
-    validate_date(departure_date, "departure_date")
-    
-    if return_date is not None:
-        validate_date(return_date, "return_date")
-    
-    # Convert enums
-    flight_enum = None
-    type = 1  # default to round-trip
-    
-    if flight_type is not None:
-        flight_enum = FlightTypeParam.from_str(flight_type)
-        type = flight_enum.value
-    
-    cabin_enum = None
-    travel_class = 1  # default to economy
-    
-    if cabin_class is not None:
-        cabin_enum = CabinClassParam.from_str(cabin_class)
-        travel_class = cabin_enum.value
-    
-    stops_enum = None
-    stops = 0  # default to any
-    if no_stops is not None:
-        stops_enum = StopsParam.from_str(no_stops)
-        stops = stops_enum.value
-    
-    params = FlightSearchParams(
+    started: float = time.perf_counter()
+
+    response_format = _check_format(response_format, max_tokens)
+
+    # Tokens may come back as handles issued by a compact response
+    handles = token_handles()
+    departure_token = await handles.resolve(departure_token, "departure_token")
+    booking_token = await handles.resolve(booking_token, "booking_token")
+
+    # Validate every argument once, locally, before any upstream call
+    params: FlightSearchParams = build_search(
         departure_id=departure_id,
         arrival_id=arrival_id,
         departure_date=departure_date,
@@ -157,9 +175,9 @@ async def get_flights(
         children=children,
         infants_in_seat=infants_in_seat,
         infants_in_lap=infants_in_lap,
-        type=type,
-        cabin_class=travel_class,
-        stops=stops,
+        flight_type=flight_type,
+        cabin_class=cabin_class,
+        no_stops=no_stops,
         bags=bags,
         max_price=max_price,
         search_location=search_location,
@@ -167,23 +185,143 @@ async def get_flights(
         booking_token=booking_token
     )
     
-    try:
-        # Call the SerpApi to get flight data
-        flight_response: List[Dict[str, Any]] = await serp.get_flights(data=params)
-        
-        flights: List[FlightSearchResult] = [
-            _transform_flight_data(f) for f in flight_response
-        ]
+    query = FlightQuery(
+        sort_by=sort_by,
+        descending=descending,
+        include_airlines=include_airlines or [],
+        exclude_airlines=exclude_airlines or [],
+        max_layover_minutes=max_layover_minutes,
+        no_overnight=no_overnight
+    )
+    metrics.observe("validation", time.perf_counter() - started, "get_flights")
     
+    try:
+        # Call the SerpApi to get flight data, served from cache while fresh
+        serp = get_serp()
+        lookup: "FlightLookup" = await serp.search_flights(data=params, client_id=client_key(ctx))
+
+        # Keep the whole result set so refine_search can re-sort and page it locally
+        cached: Optional["CacheEntry"] = serp.cache.peek(params.cache_key()) if serp.cache is not None else None
+        search_id: str = sessions.create(
+            params, lookup.flights, size=cached.size if cached is not None and cached.value is lookup.flights else None
+        )
+
+        if response_format == "compact":
+            cache: Dict[str, Any] = {"hit": lookup.cache_hit, "age_seconds": round(lookup.age, 1), "stale": lookup.stale}
+        else:
+            cache = {
+                "hit": lookup.cache_hit,
+                "age_seconds": round(lookup.age, 1),
+                "stale": lookup.stale,
+                "hits": serp.cache.hits if serp.cache else 0,
+                "misses": serp.cache.misses if serp.cache else 0,
+                "coalesced": lookup.coalesced,
+                "coalesced_calls": serp.singleflight.coalesced,
+            }
+        return await _render_page(
+            search_id,
+            params,
+            lookup.flights,
+            query,
+            page_size=page_size,
+            cursor=cursor,
+            max_results=max_results,
+            extra={"cache": cache},
+            response_format=response_format,
+            human_readable=human_readable,
+            max_tokens=max_tokens,
+            tool="get_flights"
+        )
+    except UpstreamError as e:
         return {
-            "success": True,
-            "search_id": f"SRCH-{datetime.now().strftime('%Y%m%d%H%M%S')}",
-            "flights": [f.model_dump() for f in flights[:10]],
-            "total_flights": len(flights),
-            "search_criteria": params.model_dump()
+            "success": False,
+            "error": str(e),
+            "retryable": e.transient,
         }
     except Exception as e:
         return {
             "success": False,
             "error": str(e),
-        }
\ No newline at end of file
+        }
+
+@instrument("refine_search")
+async def refine_search(
+    search_id: str,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    include_airlines: Optional[List[str]] = None,
+    exclude_airlines: Optional[List[str]] = None,
+    max_layover_minutes: Optional[int] = None,
+    no_overnight: bool = False,
+    max_price: Optional[float] = None,
+    max_stops: Optional[int] = None,
+    page_size: int = 10,
+    cursor: Optional[str] = None,
+    human_readable: bool = True,
+    max_results: Optional[int] = None,
+    response_format: Optional[str] = None,
+    max_tokens: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Re-sort, filter or page the results of an earlier get_flights call without searching again.
+
+    Works on every itinerary that search returned, so filters can be
+    tightened or relaxed freely. Prices are as old as the original search
+    ("age_seconds"); run get_flights again for fresh ones. Searches are kept
+    for SEARCH_SESSION_TTL seconds after their last use.
+
+    Args:
+        search_id (str): "search_id" from a get_flights response.
+        sort_by (Optional[str], optional): Sort key: "price", "duration", "departure_time", "stops". Defaults to the upstream ranking.
+        descending (bool, optional): Reverse the sort order. Defaults to False.
+        include_airlines (Optional[List[str]], optional): Keep only itineraries flown by one of these airlines (name or IATA code). Defaults to None.
+        exclude_airlines (Optional[List[str]], optional): Drop itineraries with a segment on one of these airlines. Defaults to None.
+        max_layover_minutes (Optional[int], optional): Drop itineraries with a longer layover. Defaults to None.
+        no_overnight (bool, optional): Drop itineraries with an overnight flight or layover. Defaults to False.
+        max_price (Optional[float], optional): Drop itineraries that cost more. Defaults to unlimited.
+        max_stops (Optional[int], optional): Drop itineraries with more stops. Defaults to unlimited.
+        page_size (int, optional): Number of itineraries per page. Defaults to 10.
+        cursor (Optional[str], optional): Opaque cursor from a previous response's "next_cursor" for the same filters and sort. Defaults to None.
+        human_readable (bool, optional): Include "HH MM" duration strings next to the integer minutes. Defaults to True.
+        max_results (Optional[int], optional): Stop after this many matching itineraries. Defaults to all.
+        response_format (Optional[str], optional): "full" or "compact", as for get_flights. Defaults to RESPONSE_FORMAT ("full").
+        max_tokens (Optional[int], optional): Approximate token budget for the response, as for get_flights. Defaults to unlimited.
+
+    Returns:
+        Dict[str, Any]: Dictionary containing flight details.
+    """
+    started: float = time.perf_counter()
+    response_format = _check_format(response_format, max_tokens)
+    session: Optional[SearchSession] = sessions.get(search_id)
+    if session is None:
+        raise ValueError(f"Invalid search_id '{search_id}'. The search is unknown or expired; run get_flights again.")
+    query = FlightQuery(
+        sort_by=sort_by,
+        descending=descending,
+        include_airlines=include_airlines or [],
+        exclude_airlines=exclude_airlines or [],
+        max_layover_minutes=max_layover_minutes,
+        no_overnight=no_overnight,
+        max_price=max_price,
+        max_stops=max_stops
+    )
+    metrics.observe("validation", time.perf_counter() - started, "refine_search")
+
+    return await _render_page(
+        search_id,
+        session.params,
+        session.flights,
+        query,
+        page_size=page_size,
+        cursor=cursor,
+        max_results=max_results,
+        extra={"age_seconds": round(session.age, 1)},
+        response_format=response_format,
+        human_readable=human_readable,
+        max_tokens=max_tokens,
+        tool="refine_search"
+    )
+
+def register(mcp: FastMCP) -> None:
+    mcp.tool()(get_flights)
+    mcp.tool()(refine_search)
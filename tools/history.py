@@ -0,0 +1,161 @@
+import time
+import asyncio
+from typing import Dict, Any, Optional, List
+from datetime import datetime, timezone
+from fastmcp import FastMCP
+from models.flight import CabinClassParam, FlightTypeParam, StopsParam, shape_key
+from utils.validate_date import validate_date
+from utils.validation import DEFAULTS, passengers
+from data.history import history
+
+def _timestamp(value: float) -> str:
+    return datetime.fromtimestamp(value, tz=timezone.utc).isoformat(timespec="seconds")
+
+def _route_args(
+    departure_id: str,
+    arrival_id: str,
+    departure_date: Optional[str],
+    cabin_class: Optional[str],
+    shape: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Store query arguments; ``shape`` holds the get_flights shape arguments, None meaning the default."""
+    if departure_date is not None:
+        validate_date(departure_date, "departure_date")
+    cabin_enum = CabinClassParam.from_str(cabin_class) if cabin_class is not None else CabinClassParam.ECONOMY
+    values: Dict[str, Any] = {k: DEFAULTS[k] if v is None else v for k, v in shape.items()}
+    passengers(values["adults"], values["children"], values["infants_in_seat"], values["infants_in_lap"])
+    return {
+        "origin": departure_id.strip().upper(),
+        "destination": arrival_id.strip().upper(),
+        "cabin_class": int(cabin_enum.value),
+        "departure_date": departure_date,
+        "shape": shape_key(
+            int(values["adults"]), int(values["children"]), int(values["infants_in_seat"]),
+            int(values["infants_in_lap"]), int(FlightTypeParam.from_str(values["flight_type"]).value),
+            int(StopsParam.from_str(values["no_stops"]).value), int(values["bags"]), values["search_location"]
+        ),
+    }
+
+async def get_price_history(
+    departure_id: str,
+    arrival_id: str,
+    departure_date: Optional[str] = None,
+    cabin_class: Optional[str] = "economy",
+    adults: int = 1,
+    flight_type: Optional[str] = "round_trip",
+    children: Optional[int] = 0,
+    infants_in_seat: Optional[int] = 0,
+    infants_in_lap: Optional[int] = 0,
+    no_stops: Optional[str] = "any",
+    bags: Optional[int] = 0,
+    search_location: Optional[str] = "us",
+    days: int = 30
+) -> Dict[str, Any]:
+    """
+    Prices observed for a route by earlier searches, from local history only.
+
+    Never calls SerpAPI. Only searches made with the same passengers, trip
+    type, stops, bags and location count, so prices are comparable. Points
+    older than the detail window are daily minimums.
+
+    Args:
+        departure_id (str): IATA code of the departure airport.
+        arrival_id (str): IATA code of the arrival airport.
+        departure_date (Optional[str], optional): Only this departure date (YYYY-MM-DD). Defaults to all dates.
+        cabin_class (Optional[str], optional): Cabin class: "economy", "premium_economy", "business", "first". Defaults to "economy".
+        adults (int, optional): Number of adult passengers searched for. Defaults to 1.
+        flight_type (Optional[str], optional): Type of flight searched: "round_trip", "one_way". Defaults to "round_trip".
+        children (Optional[int], optional): Number of children searched for. Defaults to 0.
+        infants_in_seat (Optional[int], optional): Number of infants in seat searched for. Defaults to 0.
+        infants_in_lap (Optional[int], optional): Number of infants on lap searched for. Defaults to 0.
+        no_stops (Optional[str], optional): Stops filter searched with: "any", "non_stop", "one_stop", "two_stop". Defaults to "any".
+        bags (Optional[int], optional): Number of bags searched for. Defaults to 0.
+        search_location (Optional[str], optional): Search location searched from (e.g., "us", "uk"). Defaults to "us".
+        days (int, optional): How far back to look, in days. Defaults to 30.
+
+    Returns:
+        Dict[str, Any]: Observed minimum prices, oldest first, with a summary.
+    """
+    if history is None:
+        return {"success": False, "error": "Fare history is disabled (FARE_HISTORY_DB_PATH is empty)."}
+
+    args: Dict[str, Any] = _route_args(departure_id, arrival_id, departure_date, cabin_class, {
+        "adults": adults, "flight_type": flight_type, "children": children, "infants_in_seat": infants_in_seat,
+        "infants_in_lap": infants_in_lap, "no_stops": no_stops, "bags": bags, "search_location": search_location,
+    })
+    points: List[Dict[str, Any]] = await asyncio.to_thread(
+        history.store.price_history, since=time.time() - days * 86400, **args
+    )
+    prices: List[float] = [p["min_price"] for p in points if p["min_price"] is not None]
+
+    return {
+        "success": True,
+        "departure_id": args["origin"],
+        "arrival_id": args["destination"],
+        "points": [{**p, "observed_at": _timestamp(p["observed_at"])} for p in points],
+        "lowest": min(prices) if prices else None,
+        "highest": max(prices) if prices else None,
+        "latest": prices[-1] if prices else None,
+    }
+
+async def get_lowest_fare(
+    departure_id: str,
+    arrival_id: str,
+    departure_date: Optional[str] = None,
+    cabin_class: Optional[str] = "economy",
+    adults: int = 1,
+    flight_type: Optional[str] = "round_trip",
+    children: Optional[int] = 0,
+    infants_in_seat: Optional[int] = 0,
+    infants_in_lap: Optional[int] = 0,
+    no_stops: Optional[str] = "any",
+    bags: Optional[int] = 0,
+    search_location: Optional[str] = "us",
+    days: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Lowest fare ever seen for a route, from local history only.
+
+    Only searches made with the same passengers, trip type, stops, bags and
+    location count.
+
+    Args:
+        departure_id (str): IATA code of the departure airport.
+        arrival_id (str): IATA code of the arrival airport.
+        departure_date (Optional[str], optional): Only this departure date (YYYY-MM-DD). Defaults to all dates.
+        cabin_class (Optional[str], optional): Cabin class: "economy", "premium_economy", "business", "first". Defaults to "economy".
+        adults (int, optional): Number of adult passengers searched for. Defaults to 1.
+        flight_type (Optional[str], optional): Type of flight searched: "round_trip", "one_way". Defaults to "round_trip".
+        children (Optional[int], optional): Number of children searched for. Defaults to 0.
+        infants_in_seat (Optional[int], optional): Number of infants in seat searched for. Defaults to 0.
+        infants_in_lap (Optional[int], optional): Number of infants on lap searched for. Defaults to 0.
+        no_stops (Optional[str], optional): Stops filter searched with: "any", "non_stop", "one_stop", "two_stop". Defaults to "any".
+        bags (Optional[int], optional): Number of bags searched for. Defaults to 0.
+        search_location (Optional[str], optional): Search location searched from (e.g., "us", "uk"). Defaults to "us".
+        days (Optional[int], optional): Only fares seen in the last N days. Defaults to the whole retention window.
+
+    Returns:
+        Dict[str, Any]: The cheapest stored itinerary, or null when the route was never searched.
+    """
+    if history is None:
+        return {"success": False, "error": "Fare history is disabled (FARE_HISTORY_DB_PATH is empty)."}
+
+    args: Dict[str, Any] = _route_args(departure_id, arrival_id, departure_date, cabin_class, {
+        "adults": adults, "flight_type": flight_type, "children": children, "infants_in_seat": infants_in_seat,
+        "infants_in_lap": infants_in_lap, "no_stops": no_stops, "bags": bags, "search_location": search_location,
+    })
+    since: float = time.time() - days * 86400 if days is not None else 0.0
+    fare: Optional[Dict[str, Any]] = await asyncio.to_thread(history.store.lowest_fare, since=since, **args)
+    if fare is not None and "observed_at" in fare:
+        fare["observed_at"] = _timestamp(fare["observed_at"])
+
+    return {
+        "success": True,
+        "departure_id": args["origin"],
+        "arrival_id": args["destination"],
+        "lowest_fare": fare,
+    }
+
+def register(mcp: FastMCP) -> None:
+    mcp.tool()(get_price_history)
+    mcp.tool()(get_lowest_fare)
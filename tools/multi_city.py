@@ -0,0 +1,200 @@
+import os
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Callable, Awaitable
+from fastmcp import Context, FastMCP
+from models.flight import FlightSearchParams, TripLeg
+from models.itinerary import serialize_flight
+from utils.validation import build_searches
+from utils.airports import segment_times
+from utils.beam import beam_combine
+from utils.fanout import bounded_fanout
+from utils.rate_limit import RateLimiter
+from utils.metrics import instrument
+from apis.upstream import get_serp
+from apis.scheduler import client_key
+
+if TYPE_CHECKING:
+    from apis.serp import FlightLookup
+
+MAX_LEGS: int = int(os.getenv("MULTI_CITY_MAX_LEGS", "6"))
+PER_LEG: int = int(os.getenv("MULTI_CITY_PER_LEG", "30"))
+BEAM_WIDTH: int = int(os.getenv("MULTI_CITY_BEAM_WIDTH", "50"))
+DEFAULT_CONCURRENCY: int = int(os.getenv("MULTI_CITY_CONCURRENCY", "5"))
+
+limiter: RateLimiter = RateLimiter(
+    rate=float(os.getenv("MULTI_CITY_RATE", "5")),
+    burst=int(os.getenv("MULTI_CITY_BURST", "5"))
+)
+
+RANK_KEYS: Dict[str, str] = {"price": "price", "duration": "total_duration"}
+
+def _endpoint_time(row: Dict[str, Any], first: bool) -> Optional[datetime]:
+    """Departure time of the first segment, or arrival time of the last one; None when it cannot be placed."""
+    segments: List[Dict[str, Any]] = row.get("flights") or []
+    if not segments:
+        return None
+    departures, arrivals = zip(*segment_times(segments))
+    return departures[0] if first else arrivals[-1]
+
+def _connects(min_connection: timedelta) -> Callable[[Dict[str, Any], Dict[str, Any]], bool]:
+    """Whether the next leg departs at least ``min_connection`` after the previous one lands."""
+    def compatible(previous: Dict[str, Any], following: Dict[str, Any]) -> bool:
+        arrival: Optional[datetime] = _endpoint_time(previous, first=False)
+        departure: Optional[datetime] = _endpoint_time(following, first=True)
+        if arrival is None or departure is None:
+            return True
+        return departure >= arrival + min_connection
+    return compatible
+
+@instrument("search_multi_city")
+async def search_multi_city(
+    legs: List[TripLeg],
+    adults: int = 1,
+    cabin_class: Optional[str] = "economy",
+    children: Optional[int] = 0,
+    infants_in_seat: Optional[int] = 0,
+    infants_in_lap: Optional[int] = 0,
+    no_stops: Optional[str] = "any",
+    bags: Optional[int] = 0,
+    search_location: Optional[str] = "us",
+    rank_by: str = "price",
+    min_connection_minutes: int = 120,
+    max_results: int = 5,
+    beam_width: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    human_readable: bool = True,
+    ctx: Optional[Context] = None
+) -> Dict[str, Any]:
+    """
+    Search a multi-city trip and return the best complete itineraries.
+
+    Every leg is searched as its own one-way flight, in parallel and through
+    the shared cache. The cheapest (or shortest) options of each leg are then
+    combined leg by leg, keeping only the best partial trips at each step
+    instead of trying every combination, and a combination is kept only if
+    each leg departs at least ``min_connection_minutes`` after the previous
+    one lands. Prices are sums of separate one-way fares, which can differ
+    from a single multi-city ticket.
+
+    Args:
+        legs (List[TripLeg]): Legs in travel order, each with departure_id, arrival_id and date (YYYY-MM-DD).
+        adults (int, optional): Number of adult passengers. Defaults to 1.
+        cabin_class (Optional[str], optional): Cabin class: "economy", "premium_economy", "business", "first". Defaults to "economy".
+        children (Optional[int], optional): Number of child passengers. Defaults to 0.
+        infants_in_seat (Optional[int], optional): Number of infants in seat. Defaults to 0.
+        infants_in_lap (Optional[int], optional): Number of infants in lap. Defaults to 0.
+        no_stops (Optional[str], optional): Number of stops: "any", "nonstop", "onestop", "twostop". Defaults to "any".
+        bags (Optional[int], optional): Number of bags. Defaults to 0.
+        search_location (Optional[str], optional): Search location (e.g., "us", "uk"). Defaults to "us".
+        rank_by (str, optional): Rank itineraries by total "price" or total "duration". Defaults to "price".
+        min_connection_minutes (int, optional): Minimum time between landing and the next leg's departure. Defaults to 120.
+        max_results (int, optional): Number of itineraries to return. Defaults to 5.
+        beam_width (Optional[int], optional): Partial trips kept after each leg. Defaults to MULTI_CITY_BEAM_WIDTH.
+        max_concurrency (Optional[int], optional): Maximum parallel leg searches. Defaults to MULTI_CITY_CONCURRENCY.
+        human_readable (bool, optional): Include "HH MM" duration strings next to the integer minutes. Defaults to True.
+
+    Returns:
+        Dict[str, Any]: Ranked itineraries with their legs, plus per-leg latency and errors.
+    """
+    if not 2 <= len(legs) <= MAX_LEGS:
+        raise ValueError(f"Invalid legs count {len(legs)}. Must be between 2 and {MAX_LEGS}.")
+    if rank_by not in RANK_KEYS:
+        raise ValueError(f"Invalid rank_by '{rank_by}'. Must be one of {list(RANK_KEYS)}.")
+    if min_connection_minutes < 0:
+        raise ValueError(f"Invalid min_connection_minutes '{min_connection_minutes}'. Must be zero or more.")
+
+    searches, invalid = build_searches([
+        {
+            "departure_id": leg.departure_id,
+            "arrival_id": leg.arrival_id,
+            "departure_date": leg.date,
+            "adults": adults,
+            "children": children,
+            "infants_in_seat": infants_in_seat,
+            "infants_in_lap": infants_in_lap,
+            "flight_type": "one_way",
+            "cabin_class": cabin_class,
+            "no_stops": no_stops,
+            "bags": bags,
+            "search_location": search_location,
+        }
+        for leg in legs
+    ])
+    if invalid:
+        i: int = min(invalid)
+        raise ValueError(f"Leg {i + 1}: {invalid[i]}")
+    for i in range(1, len(searches)):
+        # Strict YYYY-MM-DD strings, so they order like dates
+        if searches[i].departure_date < searches[i - 1].departure_date:
+            raise ValueError(
+                f"Invalid date '{legs[i].date}' for leg {i + 1}. Must not be before leg {i}'s date."
+            )
+
+    serp = get_serp()
+
+    def search(params: FlightSearchParams) -> Callable[[], Awaitable["FlightLookup"]]:
+        return lambda: serp.search_flights(data=params, client_id=client_key(ctx))
+
+    rank_key: str = RANK_KEYS[rank_by]
+    stats: List[Dict[str, Any]] = [
+        {"departure_id": p.departure_id, "arrival_id": p.arrival_id, "date": p.departure_date} for p in searches
+    ]
+    candidates: List[List[Dict[str, Any]]] = [[] for _ in searches]
+
+    async for outcome in bounded_fanout(
+        ((i, search(params)) for i, params in enumerate(searches)),
+        concurrency=max_concurrency or DEFAULT_CONCURRENCY,
+        limiter=limiter
+    ):
+        leg: Dict[str, Any] = stats[outcome.key]
+        leg["latency_ms"] = round(outcome.elapsed * 1000, 1)
+        if outcome.error is not None:
+            leg["error"] = str(outcome.error)
+            continue
+        lookup: "FlightLookup" = outcome.result
+        # Only priced rows can be totalled; keep the best few per leg for the combination
+        rows: List[Dict[str, Any]] = sorted(
+            (f for f in lookup.flights if f.get("price") and f.get(rank_key)),
+            key=lambda f: f[rank_key]
+        )[:PER_LEG]
+        leg["flights"] = len(lookup.flights)
+        leg["candidates"] = len(rows)
+        leg["cache_hit"] = lookup.cache_hit
+        candidates[outcome.key] = rows
+
+    failed: List[int] = [i for i, leg in enumerate(stats) if "error" in leg]
+    if failed:
+        return {
+            "success": False,
+            "itineraries": [],
+            "legs": stats,
+            "error": f"Search failed for leg {', '.join(str(i + 1) for i in failed)}.",
+        }
+
+    combined, evaluated = beam_combine(
+        candidates,
+        cost=lambda f: f[rank_key],
+        compatible=_connects(timedelta(minutes=min_connection_minutes)),
+        width=beam_width or BEAM_WIDTH,
+        top_k=max_results
+    )
+
+    itineraries: List[Dict[str, Any]] = []
+    for _, picks in combined:
+        rows = [candidates[stage][j] for stage, j in enumerate(picks)]
+        itineraries.append({
+            "total_price": sum(f["price"] for f in rows),
+            "total_duration": sum(f.get("total_duration") or 0 for f in rows),
+            "legs": [serialize_flight(f, human_readable) for f in rows],
+        })
+
+    return {
+        "success": bool(itineraries),
+        "itineraries": itineraries,
+        "legs": stats,
+        "combinations_evaluated": evaluated,
+        **({} if itineraries else {"error": "No combination of flights makes every connection."}),
+    }
+
+def register(mcp: FastMCP) -> None:
+    mcp.tool()(search_multi_city)
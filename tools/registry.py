@@ -0,0 +1,66 @@
+"""
+Loads the tool and resource modules and registers them on the server.
+
+Each module listed in ``MODULES`` defines plain functions plus a
+``register(mcp)`` that attaches them, so importing a module never touches
+the server and ``register`` adds every component exactly once. ``MCP_TOOLS``
+(comma-separated module names, e.g. ``flights,stats``) limits which modules
+are imported at all, which keeps cold starts short for deployments that
+only expose a few tools.
+
+A module that runs background work also defines ``lifespan()``, an async
+context manager; ``lifespan(server)`` below enters those of the registered
+modules while the server runs, inside ``apis.upstream.lifespan()``, which
+flushes what the shared client's result listeners queued.
+"""
+import os
+import importlib
+from contextlib import AsyncExitStack, asynccontextmanager
+from types import ModuleType
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from fastmcp import FastMCP
+from apis import upstream
+
+MODULES: Dict[str, str] = {
+    "flights": "tools.flights",
+    "fare_calendar": "tools.fare_calendar",
+    "batch": "tools.batch",
+    "multi_city": "tools.multi_city",
+    "watches": "tools.watches",
+    "history": "tools.history",
+    "stats": "tools.stats",
+    "resources": "resources.flights",
+}
+
+_registered: Set[int] = set()
+_lifespans: Dict[int, List[Any]] = {}
+
+def enabled_modules(names: Optional[List[str]] = None) -> List[str]:
+    """Module paths to load: ``names``, else ``MCP_TOOLS``, else all of them."""
+    if names is None:
+        configured: str = os.getenv("MCP_TOOLS", "").strip()
+        names = [n.strip() for n in configured.split(",") if n.strip()] if configured else list(MODULES)
+    unknown: List[str] = [n for n in names if n not in MODULES]
+    if unknown:
+        raise ValueError(f"Invalid tool modules {unknown}. Must be some of {list(MODULES)}.")
+    return [MODULES[n] for n in names]
+
+def register(mcp: FastMCP, names: Optional[List[str]] = None) -> None:
+    """Import the enabled modules and register their components on ``mcp``; repeat calls are no-ops."""
+    if id(mcp) in _registered:
+        return
+    _registered.add(id(mcp))
+    for path in enabled_modules(names):
+        module: ModuleType = importlib.import_module(path)
+        module.register(mcp)
+        if hasattr(module, "lifespan"):
+            _lifespans.setdefault(id(mcp), []).append(module.lifespan)
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
+    """Server lifespan: runs the ``lifespan()`` of every module registered on ``server``."""
+    async with AsyncExitStack() as stack:
+        await stack.enter_async_context(upstream.lifespan())
+        for module_lifespan in _lifespans.get(id(server), []):
+            await stack.enter_async_context(module_lifespan())
+        yield {}
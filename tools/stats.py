@@ -0,0 +1,129 @@
+import os
+from typing import TYPE_CHECKING, Dict, Any, Optional, List
+from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from data.history import history
+from data.snapshots import snapshots
+from data.subscriptions import subscriptions
+from data.handles import token_handles
+from data.sessions import sessions
+from apis.watch import watcher
+from utils.metrics import metrics
+from utils.profiling import profiler
+from apis import upstream
+
+if TYPE_CHECKING:
+    from apis.serp import SerpApi
+
+METRICS_ROUTE: str = os.getenv("METRICS_ROUTE", "/metrics")
+# set_profiling and get_profiles change a process-wide setting and show other clients' calls, so they are opt-in.
+PROFILE_TOOLS_ENABLED: bool = os.getenv("PROFILE_TOOLS_ENABLED", "false").lower() == "true"
+
+def _gauges() -> Dict[str, float]:
+    """Point-in-time values exported next to the stage histograms."""
+    serp: Optional["SerpApi"] = upstream.current()
+    if serp is None:
+        return {}
+    gauges: Dict[str, float] = {
+        "upstream_in_flight": serp.singleflight.in_flight,
+        "coalesced_calls": serp.singleflight.coalesced,
+        "upstream_retries": serp.retries,
+    }
+    if serp.shared is not None:
+        gauges["shared_fetched"] = serp.shared.fetched
+        gauges["shared_joined"] = serp.shared.joined
+    if serp.cache is not None:
+        cache: Dict[str, Any] = serp.cache.stats()
+        gauges.update({f"cache_{k}": v for k, v in cache.items()})
+    if serp.scheduler is not None:
+        gauges["upstream_queue_depth"] = serp.scheduler.depth
+        if serp.scheduler.quota is not None:
+            gauges["upstream_quota_remaining"] = serp.scheduler.quota.remaining
+    if serp.breaker is not None:
+        gauges["upstream_circuit_open"] = int(serp.breaker.state != serp.breaker.CLOSED)
+    return gauges
+
+async def server_stats() -> Dict[str, Any]:
+    """
+    Report per-stage latency histograms plus upstream scheduling and caching metrics.
+
+    Returns:
+        Dict[str, Any]: p50/p95/p99 per pipeline stage, counters, upstream queue and quota, retry/hedge/breaker state, and cache, refresh, prefetch, history, snapshot, subscription, token handle, search session, price watch and profiling status.
+    """
+    stats: Dict[str, Any] = {
+        "stages": metrics.snapshot(),
+        "counters": dict(metrics.counters),
+        "history": history.stats() if history is not None else None,
+        "snapshots": snapshots.stats(),
+        "subscriptions": subscriptions.stats(),
+        "token_handles": token_handles().stats(),
+        "search_sessions": sessions.stats(),
+        "watches": watcher.stats(),
+        "profiling": {"sample_rate": profiler.sample_rate, "captures": len(profiler.captures)},
+    }
+    # The upstream client is built by the first search; until then there is nothing to report.
+    serp: Optional["SerpApi"] = upstream.current()
+    if serp is None:
+        return {**stats, "upstream": None}
+
+    refresher = upstream.refresher()
+    prefetcher = upstream.prefetcher()
+    p95: Optional[float] = serp.latency.quantile(0.95)
+    return {
+        **stats,
+        "upstream": serp.scheduler.stats() if serp.scheduler is not None else None,
+        "resilience": {
+            "retries": serp.retries,
+            "hedged": serp.hedged,
+            "hedge_wins": serp.hedge_wins,
+            "p95_latency_ms": round(1000 * p95, 1) if p95 is not None else None,
+            "breaker": serp.breaker.stats() if serp.breaker is not None else None,
+        },
+        "in_flight": serp.singleflight.in_flight,
+        "coalesced_calls": serp.singleflight.coalesced,
+        "shared": serp.shared.stats() if serp.shared is not None else None,
+        "cache": serp.cache.stats() if serp.cache is not None else None,
+        "refresh": refresher.stats() if refresher is not None else None,
+        "prefetch": prefetcher.stats() if prefetcher is not None else None,
+    }
+
+async def set_profiling(sample_rate: float) -> Dict[str, Any]:
+    """
+    Turn sampled cProfile captures of tool calls on or off at runtime.
+
+    Args:
+        sample_rate (float): Fraction of tool calls to profile, 0 to disable.
+
+    Returns:
+        Dict[str, Any]: The new sample rate.
+    """
+    profiler.set_sample_rate(sample_rate)
+    return {"success": True, "sample_rate": profiler.sample_rate}
+
+async def get_profiles(limit: int = 5) -> Dict[str, Any]:
+    """
+    Return the most recent cProfile captures, sorted by cumulative time.
+
+    Args:
+        limit (int, optional): Number of captures to return, newest first. Defaults to 5.
+
+    Returns:
+        Dict[str, Any]: Captures with the tool name, wall time and pstats report.
+    """
+    captures: List[Dict[str, Any]] = profiler.recent(limit)
+    return {"sample_rate": profiler.sample_rate, "profiles": captures}
+
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """Prometheus scrape endpoint (HTTP transports only)."""
+    return PlainTextResponse(
+        metrics.to_prometheus(gauges=_gauges()), media_type="text/plain; version=0.0.4"
+    )
+
+def register(mcp: FastMCP) -> None:
+    mcp.tool()(server_stats)
+    if PROFILE_TOOLS_ENABLED:
+        mcp.tool()(set_profiling)
+        mcp.tool()(get_profiles)
+    if METRICS_ROUTE:
+        mcp.custom_route(METRICS_ROUTE, methods=["GET"])(prometheus_metrics)
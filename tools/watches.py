@@ -0,0 +1,171 @@
+import os
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastmcp import Context, FastMCP
+from models.flight import FlightSearchParams
+from utils.validation import build_search
+from apis.watch import Watch, watcher
+from apis.scheduler import connection_key
+from data.subscriptions import subscriptions
+
+# cluster.py turns this off in its workers unless it is set explicitly, so one
+# shared watch file is not polled once per worker.
+WATCH_ENABLED: bool = os.getenv("WATCH_ENABLED", "true").lower() == "true"
+
+def _owner(ctx: Optional[Context]) -> Tuple[str, bool]:
+    """
+    Owner of a request's watches, and whether it outlives the connection.
+
+    Watches belong to the MCP client ID when there is one, else to the
+    connection, so nobody else can list, read or cancel them and
+    ``WATCH_MAX_PER_CLIENT`` applies per owner. A client ID, or the single
+    client of a stdio server, comes back after a restart; an HTTP session
+    ID does not, so watches owned by one end with its session.
+
+    Raises:
+        ValueError: When the request carries no identity that outlives it.
+    """
+    connection: Optional[str] = connection_key(ctx) if ctx is not None else None
+    client_id: Optional[str] = ctx.client_id if ctx is not None else None
+    if client_id is None and connection is None:
+        raise ValueError("Price watches need a client ID or an MCP session; this request has neither.")
+    return client_id or connection, client_id is not None or connection == "local"
+
+async def _attach(ctx: Optional[Context]) -> Tuple[str, bool]:
+    owner, durable = _owner(ctx)
+    if not durable:
+        watcher.attach(owner, ctx.session._connection)
+    await watcher.start()
+    return owner, durable
+
+def _describe(watch: Watch) -> Dict[str, Any]:
+    next_poll: Optional[float] = watcher.next_poll_in(watch)
+    return {**watch.to_dict(), "next_check_in_seconds": round(next_poll) if next_poll is not None else None}
+
+async def create_price_watch(
+    departure_id: str,
+    arrival_id: str,
+    departure_date: str,
+    threshold: float,
+    adults: int = 1,
+    return_date: Optional[str] = None,
+    flight_type: Optional[str] = "round_trip",
+    cabin_class: Optional[str] = "economy",
+    children: Optional[int] = 0,
+    infants_in_seat: Optional[int] = 0,
+    infants_in_lap: Optional[int] = 0,
+    no_stops: Optional[str] = "any",
+    bags: Optional[int] = 0,
+    search_location: Optional[str] = "us",
+    ctx: Optional[Context] = None
+) -> Dict[str, Any]:
+    """
+    Watch a search and get notified when its lowest price drops to a threshold.
+
+    The search is checked in the background, more often as departure nears
+    and less often while its price holds steady. When the lowest price
+    falls to or below ``threshold``, subscribers to the watch's "uri" get a
+    resource-updated notification; reading it returns the watch with the
+    price that triggered it. The watch stays active and fires again if the
+    price rises above the threshold and drops back. Without a client ID in
+    the request ``_meta``, the watch ends with the HTTP session.
+
+    Args:
+        departure_id (str): IATA code of the departure airport.
+        arrival_id (str): IATA code of the arrival airport.
+        departure_date (str): Departure date in YYYY-MM-DD format.
+        threshold (float): Alert when the lowest price is at or below this amount.
+        adults (int, optional): Number of adult passengers. Defaults to 1.
+        return_date (Optional[str], optional): Return date in YYYY-MM-DD format. Defaults to None.
+        flight_type (Optional[str], optional): Type of flight: "round_trip", "one_way". Defaults to "round_trip".
+        cabin_class (Optional[str], optional): Cabin class: "economy", "premium_economy", "business", "first". Defaults to "economy".
+        children (Optional[int], optional): Number of child passengers. Defaults to 0.
+        infants_in_seat (Optional[int], optional): Number of infants in seat. Defaults to 0.
+        infants_in_lap (Optional[int], optional): Number of infants in lap. Defaults to 0.
+        no_stops (Optional[str], optional): Number of stops: "any", "nonstop", "onestop", "twostop". Defaults to "any".
+        bags (Optional[int], optional): Number of bags. Defaults to 0.
+        search_location (Optional[str], optional): Search location (e.g., "us", "uk"). Defaults to "us".
+
+    Returns:
+        Dict[str, Any]: The new watch, with its "watch_id", its resource "uri" and the last known price when the route is already watched.
+    """
+    if threshold is None or threshold <= 0:
+        raise ValueError(f"Invalid threshold '{threshold}'. Must be a positive price.")
+    params: FlightSearchParams = build_search(
+        departure_id=departure_id,
+        arrival_id=arrival_id,
+        departure_date=departure_date,
+        return_date=return_date,
+        adults=adults,
+        children=children,
+        infants_in_seat=infants_in_seat,
+        infants_in_lap=infants_in_lap,
+        flight_type=flight_type,
+        cabin_class=cabin_class,
+        no_stops=no_stops,
+        bags=bags,
+        search_location=search_location
+    )
+    owner, durable = await _attach(ctx)
+    watch: Watch = await watcher.create(owner, params, float(threshold), durable)
+    return {"success": True, "watch": _describe(watch)}
+
+async def list_watches(ctx: Optional[Context] = None) -> Dict[str, Any]:
+    """
+    List this client's price watches with the latest price each one has seen.
+
+    Returns:
+        Dict[str, Any]: The watches, oldest first.
+    """
+    owner, _ = await _attach(ctx)
+    watches: List[Watch] = sorted(watcher.list(owner), key=lambda w: w.created_at)
+    return {"success": True, "watches": [_describe(w) for w in watches]}
+
+async def cancel_watch(watch_id: str, ctx: Optional[Context] = None) -> Dict[str, Any]:
+    """
+    Stop a price watch.
+
+    Args:
+        watch_id (str): ID returned by create_price_watch.
+
+    Returns:
+        Dict[str, Any]: Confirmation with the cancelled watch ID.
+    """
+    owner, _ = await _attach(ctx)
+    if not await watcher.cancel(owner, watch_id):
+        raise ValueError(f"Invalid watch_id '{watch_id}'. Must be one of this client's watches; see list_watches.")
+    return {"success": True, "cancelled": watch_id}
+
+async def watch_status(watch_id: str, ctx: Context) -> str:
+    """
+    Current state of a price watch: the latest price it has seen and when it last fired.
+
+    Subscribe to it to be notified when the watch fires.
+    """
+    owner, _ = await _attach(ctx)
+    watch: Optional[Watch] = watcher.get(owner, watch_id)
+    if watch is None:
+        raise ValueError(f"Invalid watch_id '{watch_id}'. Must be one of this client's watches; see list_watches.")
+    return json.dumps(_describe(watch))
+
+@asynccontextmanager
+async def lifespan() -> AsyncIterator[None]:
+    """Resume stored watches when the server starts, and stop polling when it exits."""
+    if not WATCH_ENABLED:
+        yield
+        return
+    await watcher.start()
+    try:
+        yield
+    finally:
+        await watcher.stop()
+
+def register(mcp: FastMCP) -> None:
+    if not WATCH_ENABLED:
+        return
+    subscriptions.register(mcp)
+    mcp.tool()(create_price_watch)
+    mcp.tool()(list_watches)
+    mcp.tool()(cancel_watch)
+    mcp.resource("watches://{watch_id}", mime_type="application/json")(watch_status)
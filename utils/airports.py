@@ -0,0 +1,630 @@
+import os
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+# IATA metropolitan area codes that group several airports. Codes that are
+# also airport codes (e.g. BKK, HOU) are left out to keep expansion unambiguous.
+METRO_AREAS: Dict[str, List[str]] = {
+    "BJS": ["PEK", "PKX"],
+    "BUE": ["EZE", "AEP"],
+    "CHI": ["ORD", "MDW"],
+    "DTT": ["DTW"],
+    "JKT": ["CGK", "HLP"],
+    "LON": ["LHR", "LGW", "STN", "LTN", "LCY", "SEN"],
+    "MIL": ["MXP", "LIN", "BGY"],
+    "MOW": ["SVO", "DME", "VKO"],
+    "NYC": ["JFK", "EWR", "LGA"],
+    "OSA": ["KIX", "ITM", "UKB"],
+    "PAR": ["CDG", "ORY", "BVA"],
+    "RIO": ["GIG", "SDU"],
+    "ROM": ["FCO", "CIA"],
+    "SAO": ["GRU", "CGH", "VCP"],
+    "SEL": ["ICN", "GMP"],
+    "STO": ["ARN", "BMA", "NYO"],
+    "TYO": ["HND", "NRT"],
+    "WAS": ["IAD", "DCA", "BWI"],
+    "YMQ": ["YUL", "YMX"],
+    "YTO": ["YYZ", "YTZ"],
+}
+
+def expand_airports(code: str) -> List[str]:
+    """Expand a metro area code to its airports; airport codes pass through."""
+    code = code.strip().upper()
+    return list(METRO_AREAS.get(code, [code]))
+
+# IANA timezone of every airport in _IATA_AIRPORTS below, as "Zone: codes".
+# SerpAPI reports local wall-clock times, so this is what turns them into
+# timezone-aware datetimes. Generated by scripts/airport_zones.py.
+_AIRPORT_ZONES: str = """
+    Africa/Abidjan: ABJ
+    Africa/Accra: ACC KMS TML TKD
+    Africa/Addis_Ababa: ADD DIR BJR GDQ LLI MQX AXU
+    Africa/Algiers: ALG ORN CZL AAE TLM BJA HME
+    Africa/Asmara: ASM
+    Africa/Bamako: BKO
+    Africa/Bangui: BGF
+    Africa/Banjul: BJL
+    Africa/Bissau: OXB
+    Africa/Blantyre: LLW BLZ
+    Africa/Brazzaville: BZV PNR
+    Africa/Bujumbura: BJM
+    Africa/Cairo: CAI HRG SSH LXR ASW HBE RMF SPX ATZ
+    Africa/Casablanca: CMN RAK AGA FEZ TNG RBA OUD NDR ESU OZZ VIL EUN
+    Africa/Conakry: CKY
+    Africa/Dakar: DKR DSS
+    Africa/Dar_es_Salaam: DAR JRO ZNZ MWZ DOD
+    Africa/Djibouti: JIB
+    Africa/Douala: DLA NSI
+    Africa/Freetown: FNA
+    Africa/Gaborone: GBE MUB BBK
+    Africa/Harare: HRE BUQ VFA
+    Africa/Johannesburg: JNB CPT DUR PLZ ELS GRJ BFN KIM MQP HLA PHW UTN
+    Africa/Juba: JUB
+    Africa/Kampala: EBB
+    Africa/Khartoum: KRT PZU
+    Africa/Kigali: KGL GOM
+    Africa/Kinshasa: FIH
+    Africa/Lagos: LOS ABV PHC KAN ENU QOW CBQ BNI ILR JOS KAD YOL MIU SKO
+    Africa/Libreville: LBV POG
+    Africa/Lome: LFW
+    Africa/Luanda: LAD
+    Africa/Lubumbashi: FBM FKI
+    Africa/Lusaka: LUN LVI NLA MFU
+    Africa/Malabo: SSG
+    Africa/Maputo: MPM BEW VNX POL TET APL INH
+    Africa/Maseru: MSU
+    Africa/Mbabane: SHO
+    Africa/Mogadishu: MGQ HGA
+    Africa/Monrovia: ROB MLW
+    Africa/Nairobi: NBO MBA WIL KIS EDL MYD LAU UKA
+    Africa/Ndjamena: NDJ
+    Africa/Niamey: NIM
+    Africa/Nouakchott: NKC
+    Africa/Ouagadougou: OUA BOY
+    Africa/Porto-Novo: COO
+    Africa/Sao_Tome: TMS
+    Africa/Tripoli: TIP MJI BEN
+    Africa/Tunis: TUN MIR NBE DJE SFA TOE
+    Africa/Windhoek: WDH ERS WVB OND
+    America/Anchorage: ANC FAI JNU KTN SIT BET OME BRW SCC ADQ DLG AKN CDV YAK WRG GST ENA HOM DUT
+        OTZ VDZ MCG UNK ANI GAL
+    America/Anguilla: AXA
+    America/Antigua: ANU
+    America/Araguaina: PMW MAB
+    America/Argentina/Buenos_Aires: EZE AEP MDQ BHI
+    America/Argentina/Catamarca: REL CRD CTC EQS
+    America/Argentina/Cordoba: COR IGR ROS SDE RES CNQ PSS SFN
+    America/Argentina/Jujuy: JUJ
+    America/Argentina/Mendoza: MDZ AFA
+    America/Argentina/Rio_Gallegos: FTE RGL
+    America/Argentina/Salta: BRC SLA NQN VDM CPC
+    America/Argentina/San_Juan: UAQ
+    America/Argentina/San_Luis: LUQ
+    America/Argentina/Tucuman: TUC
+    America/Argentina/Ushuaia: USH RGA
+    America/Aruba: AUA
+    America/Asuncion: ASU AGT
+    America/Bahia: SSA BPS IOS PNZ VDC
+    America/Barbados: BGI
+    America/Belem: BEL MCP STM
+    America/Belize: BZE
+    America/Boa_Vista: MAO BVB
+    America/Bogota: BOG MDE CLO CTG BAQ SMR ADZ BGA PEI CUC PSO LET AXM EOH MTR VUP UIB IBE NVA RCH
+    America/Boise: BOI IDA TWF
+    America/Campo_Grande: CGR
+    America/Cancun: CUN CTM CZM TQO
+    America/Caracas: CCS MAR VLN BLA PMV BRM MUN PZO
+    America/Cayenne: CAY
+    America/Cayman: GCM CYB
+    America/Chicago: AUS BNA DFW DAL HOU IAH MCI MDW MSP MSY ORD SAT STL AMA BHM BIS CID CRP DSM FAR
+        FSD GPT HSV ICT JAN LBB LIT MAF MEM MFE MKE MOB MSN OKC OMA PNS SGF SHV TUL VPS XNA CWA ATW
+        GRB LSE DLH RST MLI PIA BMI CMI SPI ALO DBQ EVV LNK GRI EAR MHK GCK HYS SLN TOP JLN COU CGI
+        PAH BWG ECP DHN AEX LFT LCH MLU BTR TXK ELD TYR LRD BRO HRL VCT CLL ACT GGG ABI SJT SPS LAW
+        BLV RFD BKG GFK MOT XWA JMS ABR PIR ATY FOD MCW SUX BRD BJI INL HIB LBF MCK DDC LBL IMT RHI
+        EAU DEC MWA UIN BRL MSL TUP GTR MEI PIB GLH HOT HRO FSM JBR TBN DRT
+    America/Costa_Rica: SJO LIR
+    America/Cuiaba: CGB
+    America/Curacao: CUR
+    America/Dawson_Creek: YXJ YDQ
+    America/Denver: DEN SLC ABQ BIL BZN COS ELP PVU OGD JAC SUN ASE EGE HDN GUC MTJ DRO GJT TEX FCA
+        GTF HLN MSO BTM RAP ROW HOB CNM SAF FMN GUP ALS PUB CYS LAR CPR RKS COD GCC SHR RIW CDC SGU
+        DIK PIH BFF VEL CNY SVC
+    America/Detroit: LAN AZO PLN
+    America/Dominica: DOM
+    America/Edmonton: YYC YEG YZF YMM YQL YPE YQU YXC YOJ YXH YQF
+    America/El_Salvador: SAL
+    America/Fortaleza: FOR AJU JPA THE SLZ IMP JDO FEN CPV JJD
+    America/Glace_Bay: YQY
+    America/Goose_Bay: YYR
+    America/Grand_Turk: PLS GDT
+    America/Grenada: GND
+    America/Guadeloupe: PTP
+    America/Guatemala: GUA FRS
+    America/Guayaquil: UIO GYE CUE OCC MEC
+    America/Guyana: GEO
+    America/Halifax: YHZ YQM YYG YSJ YWK
+    America/Havana: HAV VRA HOG SCU CCC CYO SNU
+    America/Hermosillo: HMO CEN GYM
+    America/Indiana/Indianapolis: SBN
+    America/Inuvik: YEV
+    America/Jamaica: KIN MBJ
+    America/Juneau: PSG
+    America/Kentucky/Louisville: SDF
+    America/Kralendijk: BON EUX
+    America/La_Paz: LPB VVI CBB SRE TJA TDD
+    America/Lima: LIM CUZ AQP JUL PIU TRU CIX IQT PCL TPP TCQ AYP TBP PEM
+    America/Los_Angeles: LAS LAX OAK PDX SAN SEA SFO SJC SMF BLI BUR EUG FAT GEG LGB ONT PSP RNO SBA
+        SNA STS ACV RDD MRY SBP SCK SMX IYK MMH CIC OXR PSC YKM ALW PUW LWS EAT MWH RDM MFR LMT OTH
+        SLE BFL VIS MCE EKO
+    America/Lower_Princes: SXM
+    America/Maceio: MCZ
+    America/Managua: MGA
+    America/Martinique: FDF
+    America/Mazatlan: SJD MZT CUL CJS CUU LTO LAP TPQ
+    America/Menominee: IWD
+    America/Merida: MID CPE
+    America/Mexico_City: MEX NLU GDL MTY PVR ACA ZIH HUX OAX VER BJX QRO SLP AGU TRC ZCL TAM REX MLM
+        UPN TGZ VSA CME PBC TLC NLD PXM ZLO PQM PAZ MAM PDS LZC CLQ
+    America/Moncton: YFC
+    America/Monterrey: DGO CVM
+    America/Montevideo: MVD PDP
+    America/Nassau: NAS FPO ELH GGT MHH ZSA
+    America/New_York: ATL BOS BWI CLT DCA DTW EWR FLL IAD JFK LGA MCO MIA PHL PIT RDU TPA CLE ALB
+        ABE ACY AGS AVL AVP BDL BGR BTV BUF CAE CAK CHA CHS CMH CRW CVG DAB DAY EYW FAY GRR GSO GSP
+        HPN IND ISP JAX LEX MDT MHT MLB MYR ORF PBI PIE PVD PWM RIC ROC RSW SAV SRQ SYR TLH TYS ACK
+        MVY HYA ORH FNT TVC MQT FWA TOL MBS ERI ELM ITH BGM PBG OGS SWF TTN CKB HTS LWB ROA LYH CHO
+        PHF SBY ILM OAJ EWN PGV GNV OCF ABY VLD BQK CSG MCN SFB PGD USA LCK SCE LBE IAG PSM VRB APF
+        FMY HGR HVN LEB RUT PQI BHB RKD AUG SLK ESC CMX APN CIU SHD PKB BKW MGW JST DUJ BFD
+    America/Nuuk: GOH SFJ
+    America/Panama: PTY DAV BOC
+    America/Paramaribo: PBM
+    America/Phoenix: PHX TUS YUM IFP FLG PGA GCN PRC AZA
+    America/Port-au-Prince: PAP CAP
+    America/Port_of_Spain: POS TAB
+    America/Porto_Velho: PVH
+    America/Puerto_Rico: SJU BQN PSE MAZ CPX VQS
+    America/Punta_Arenas: PUQ
+    America/Recife: REC NAT
+    America/Regina: YXE YQR YPA
+    America/Rio_Branco: RBR
+    America/Santiago: SCL PMC ANF IQQ CJC ARI CCP ZCO LSC ZAL BBA PNT CPO ZOS
+    America/Santo_Domingo: PUJ SDQ STI POP LRM AZS JBQ
+    America/Sao_Paulo: GRU CGH VCP GIG SDU BSB CNF PLU POA CWB FLN GYN VIX IGU NVT JOI LDB MGF RAO
+        UDI XAP CXJ PET CAC SJP UBA MOC
+    America/St_Barthelemy: SBH
+    America/St_Johns: YYT YDF YQX
+    America/St_Kitts: SKB NEV
+    America/St_Lucia: UVF SLU
+    America/St_Thomas: STT STX
+    America/St_Vincent: SVD
+    America/Tegucigalpa: TGU SAP XPL RTB LCE
+    America/Thunder_Bay: YQT
+    America/Tijuana: TIJ MXL
+    America/Toronto: YYZ YTZ YUL YMX YOW YQB YSB YFB YXU YKF YHM YQG YGK YVO YUY YNA YGR YGP YBC YZV
+        YAM YTS YQA
+    America/Tortola: EIS
+    America/Vancouver: YVR YYJ YLW YXX YKA YXS YCD YZP YPR YXT YBL YCG YWL YZT YPW YQQ
+    America/Whitehorse: YXY
+    America/Winnipeg: YWG YTH YRB YBR
+    Arctic/Longyearbyen: LYR
+    Asia/Aden: SAH ADE
+    Asia/Almaty: NQZ TSE ALA CIT KGF UKK
+    Asia/Amman: AMM AQJ
+    Asia/Anadyr: PKC
+    Asia/Aqtobe: AKX
+    Asia/Ashgabat: ASB
+    Asia/Baghdad: BGW BSR EBL ISU NJF
+    Asia/Bahrain: BAH
+    Asia/Baku: GYD
+    Asia/Bangkok: BKK DMK HKT CNX CEI USM KBV HDY UTH UBP KKC NST URT TST NAW UTP TDX NNT PHS LPT
+    Asia/Barnaul: BAX
+    Asia/Beirut: BEY
+    Asia/Bishkek: FRU OSS
+    Asia/Brunei: BWN
+    Asia/Chita: HTA
+    Asia/Colombo: CMB HRI JAF
+    Asia/Damascus: DAM ALP LTK
+    Asia/Dhaka: DAC CGP ZYL CXB JSR SPD RJH BZL
+    Asia/Dili: DIL
+    Asia/Dubai: DXB DWC AUH SHJ RKT FJR
+    Asia/Dushanbe: DYU LBD
+    Asia/Ho_Chi_Minh: SGN HAN DAD CXR PQC HPH HUI VCA VII DLI UIH BMV VDO THD VCL TBB PXU VKG CAH
+        DIN VDH
+    Asia/Hong_Kong: HKG
+    Asia/Irkutsk: IKT UUD
+    Asia/Jakarta: CGK HLP SUB KNO JOG YIA BDO PLM PKU BTH PDG SRG SOC BTJ DJB BKS TKG PGK TJQ BWX
+        MLG KJT
+    Asia/Jayapura: AMQ DJJ TTE SOQ BIK MKW TIM MKQ
+    Asia/Jerusalem: TLV ETM
+    Asia/Kabul: KBL
+    Asia/Karachi: KHI LHE ISB PEW MUX SKT LYP UET GIL KDU GWD
+    Asia/Kathmandu: KTM PKR BWA BIR BDP
+    Asia/Kolkata: DEL BOM BLR MAA CCU HYD COK AMD GOI GOX PNQ TRV CCJ IXE IXB JAI LKO VNS PAT GAU
+        IXC ATQ SXR IXJ IXL BBI RPR NAG IDR BHO VTZ IXM TRZ CJB IXZ IXR DED UDR JDH IXU STV BDQ RAJ
+        IXA IMF DIB IXS VGA TIR RJA HBX IXG MYQ GAY DBR JRH IXD GOP KNU AGR JLR GWL KLH ISK NDC CNN
+        TCR SAG IXY BHJ JGA PBD DHM KUU PGH HSR
+    Asia/Krasnoyarsk: OVB KJA NOZ
+    Asia/Kuala_Lumpur: KUL SZB PEN LGK KCH TWU JHB KBR KUA IPH AOR TGG MKZ
+    Asia/Kuching: BKI MYY SDK SBW BTU LBU
+    Asia/Kuwait: KWI
+    Asia/Macau: MFM
+    Asia/Magadan: GDX
+    Asia/Makassar: DPS UPG BPN MDC LOP LBJ KOE BDJ TRK KDI PLW GTO
+    Asia/Manila: MNL CEB CRK DVO ILO BCD KLO MPH PPS TAG BXU CGY GES ZAM TAC LGP DGT IAO USU LAO TUG
+    Asia/Muscat: MCT SLL DQM
+    Asia/Nicosia: LCA PFO ECN
+    Asia/Novokuznetsk: KEJ
+    Asia/Omsk: OMS
+    Asia/Oral: GUW URA
+    Asia/Phnom_Penh: PNH KTI REP SAI KOS
+    Asia/Pontianak: PNK
+    Asia/Qatar: DOH
+    Asia/Qyzylorda: PWQ
+    Asia/Riyadh: RUH JED DMM MED AHB TIF TUU ELQ GIZ YNB HAS
+    Asia/Samarkand: TAS SKD BHK UGC NMA
+    Asia/Seoul: ICN GMP PUS CJU TAE CJJ KWJ RSU USN MWX YNY KPO HIN WJU KUV
+    Asia/Shanghai: PEK PKX PVG SHA CAN SZX CTU TFU CKG KMG XIY HGH NKG WUH CSX XMN FOC TAO TSN SHE
+        DLC HRB CGO TYN SJW HFE NNG KWE LHW URC INC XNN HAK SYX JHG LXA KWL NGB WNZ TNA YNT WEH JJN
+        SWA ZUH HET BAV DSN CGQ YNJ MDG JMU HLD ZHA BHY LJG DLU DYG YIH XFN LYA CZX WUX YTY NTG HSN
+        JDZ KHN LYI WEF KRL KHG HTN AKU YIN DNH JGN ENH WDS LZO YBP MIG NAO DAX WXN ZYI AVA TEN KJH
+        LZH WUS HYN YIW HUZ MXZ TNH CIF TGO ERL XIL
+    Asia/Singapore: SIN
+    Asia/Taipei: TPE TSA KHH RMQ TNN HUN KNH MZG TTT
+    Asia/Tashkent: FEG
+    Asia/Tbilisi: TBS BUS KUT
+    Asia/Tehran: IKA THR MHD SYZ IFN TBZ KIH AWZ BND KSH ZAH RAS
+    Asia/Thimphu: PBH
+    Asia/Tokyo: HND NRT KIX ITM UKB NGO CTS FUK OKA KOJ KMJ HIJ SDJ OIT KMI NGS MYJ TAK KCZ TKS OKJ
+        IZO YGJ UBJ KKJ FSZ KMQ TOY KIJ AOJ AXT HNA MSJ GAJ SYO FKS HKD AKJ KUH OBO MMB WKJ SHB ISG
+        MMY SHI ASJ TKN KUM TNE IWK HSG AXJ NTQ MMJ IBR OIM HAC
+    Asia/Tomsk: TOF
+    Asia/Ulaanbaatar: ULN UBN
+    Asia/Vientiane: VTE LPQ PKZ
+    Asia/Vladivostok: VVO KHV UUS
+    Asia/Yakutsk: YKS BQS
+    Asia/Yangon: RGN MDL NYT HEH
+    Asia/Yekaterinburg: SVX UFA PEE CEK TJM SGC NJC HMA NUX
+    Asia/Yerevan: EVN
+    Atlantic/Azores: PDL TER HOR SMA FLW
+    Atlantic/Bermuda: BDA
+    Atlantic/Canary: LPA TFN TFS ACE FUE SPC GMZ VDE
+    Atlantic/Cape_Verde: RAI SID BVC VXE
+    Atlantic/Faroe: FAE
+    Atlantic/Reykjavik: KEF RKV AEY EGS IFJ
+    Australia/Adelaide: ADL
+    Australia/Brisbane: BNE OOL CNS TSV MKY ROK PPP ISA MCY HVB BDB GLT EMD WEI HID
+    Australia/Darwin: DRW ASP AYQ
+    Australia/Hobart: HBA MQL
+    Australia/Lindeman: HTI
+    Australia/Lord_Howe: LDH
+    Australia/Melbourne: MEL LST AVV DPO BWT KNS
+    Australia/Perth: PER BME KTA PHE KGI GET ALH EPR LEA KNX
+    Australia/Sydney: SYD CBR BNK CFS NTL ABX WGA DBO ARM TMW PQQ WSI
+    Europe/Amsterdam: AMS RTM EIN GRQ MST
+    Europe/Athens: ATH SKG HER CHQ RHO CFU JTR JMK KGS ZTH EFL KLX PVK KVA IOA AOK JSI SMI MJT LXS
+        JKH PAS JNX MLO KIT SKU LRS KZS JIK GPA VOL KSO
+    Europe/Belgrade: BEG INI PRN
+    Europe/Berlin: FRA MUC BER DUS HAM STR CGN HAJ NUE LEJ DRS BRE DTM FMM FKB PAD HHN NRN SCN ERF
+        GWT RLG KSF FDH HDF
+    Europe/Bratislava: BTS KSC
+    Europe/Brussels: BRU CRL ANR LGG OST
+    Europe/Bucharest: OTP CLJ TSR IAS SBZ CND BCM SUJ OMR CRA
+    Europe/Budapest: BUD DEB
+    Europe/Chisinau: KIV
+    Europe/Copenhagen: CPH BLL AAL AAR
+    Europe/Dublin: DUB ORK SNN KIR NOC
+    Europe/Guernsey: GCI
+    Europe/Helsinki: HEL TMP TKU OUL RVN KTT KUO VAA JOE IVL
+    Europe/Isle_of_Man: IOM
+    Europe/Istanbul: IST SAW ESB ADB AYT DLM BJV ADA TZX GZT VAN ERZ DIY KYA ASR NAV SZF MLX EZS GZP
+        DNZ BAL MQM KCM HTY GNY EDO KSY AJI OGU MSR BGG ERC VAS TEQ CKZ
+    Europe/Jersey: JER
+    Europe/Kaliningrad: KGD
+    Europe/Kyiv: KBP IEV LWO ODS HRK DNK
+    Europe/Lisbon: LIS OPO FAO FNC PXO
+    Europe/Ljubljana: LJU MBX
+    Europe/London: LHR LGW STN LTN LCY SEN MAN EDI BHX BRS NCL LPL GLA ABZ BFS BHD EMA LBA EXT NWI
+        SOU CWL INV MME HUY NQY BOH KOI LSI SYY BEB DND LDY
+    Europe/Luxembourg: LUX
+    Europe/Madrid: MAD BCN PMI IBZ MAH AGP ALC VLC SVQ BIO SCQ VGO OVD SDR LCG XRY GRX LEI MJV REU
+        GRO ZAZ VLL PNA EAS VIT LEN RGS SLM ODB RMU CDT HSK RJL GIB
+    Europe/Malta: MLA
+    Europe/Mariehamn: MHQ
+    Europe/Minsk: MSQ
+    Europe/Moscow: SVO DME VKO ZIA LED KZN AER KRR ROV MRV GOJ MMK ARH MCX GRV AAQ
+    Europe/Oslo: OSL BGO TRD SVG TOS BOO AES KRS HAU EVE ALF KKN MOL
+    Europe/Paris: CDG ORY BVA NCE LYS MRS TLS BOD NTE MPL BIQ LIL SXB MLH BSL RNS BES BIA AJA FSC
+        CLY TLN PUF PGF CFE LIG LRH EGC RDZ CCF FNI BZR AVN PIS TUF LDE DNR LAI UIP LRT CMF GNB ETZ
+    Europe/Podgorica: TGD TIV
+    Europe/Prague: PRG BRQ OSR
+    Europe/Riga: RIX
+    Europe/Rome: FCO CIA MXP LIN BGY VCE TSF NAP CTA PMO BLQ FLR PSA BRI BDS SUF REG CAG OLB AHO TRN
+        GOA VRN TRS PSR AOI PEG RMI FOG CRV TPS CIY LMP PNL BZO QSR CUF FRL
+    Europe/Samara: KUF
+    Europe/Sarajevo: BNX SJJ TZL OMO
+    Europe/Simferopol: SIP
+    Europe/Skopje: SKP OHD
+    Europe/Sofia: SOF VAR BOJ
+    Europe/Stockholm: ARN BMA NYO GOT MMX LLA UME LPI VBY OSD KRN SDL KSD
+    Europe/Tallinn: TLL TAY
+    Europe/Tirane: TIA
+    Europe/Vienna: VIE SZG INN GRZ LNZ KLU
+    Europe/Vilnius: VNO KUN PLQ
+    Europe/Volgograd: VOG
+    Europe/Warsaw: WAW WMI KRK KTW GDN WRO POZ RZE SZZ LUZ
+    Europe/Zagreb: ZAG SPU DBV ZAD PUY RJK OSI
+    Europe/Zurich: ZRH GVA BRN SIR
+    Indian/Antananarivo: TNR NOS TMM DIE MJN FTU TLE SMS
+    Indian/Comoro: HAH
+    Indian/Mahe: SEZ PRI
+    Indian/Maldives: MLE GAN
+    Indian/Mauritius: MRU RRG
+    Indian/Mayotte: DZA
+    Indian/Reunion: RUN ZSE
+    Pacific/Apia: APW
+    Pacific/Auckland: AKL WLG CHC ZQN DUD NPE NSN PMR ROT TRG NPL HLZ IVC BHE TUO GIS WRE KKE HKK
+        WSZ TIU WAG
+    Pacific/Chuuk: TKK YAP
+    Pacific/Easter: IPC
+    Pacific/Efate: VLI SON
+    Pacific/Fiji: NAN SUV
+    Pacific/Funafuti: FUN
+    Pacific/Galapagos: GPS SCY
+    Pacific/Guadalcanal: HIR
+    Pacific/Guam: GUM
+    Pacific/Honolulu: HNL OGG KOA LIH ITO MKK LNY
+    Pacific/Kiritimati: CXI
+    Pacific/Kosrae: KSA
+    Pacific/Kwajalein: KWA
+    Pacific/Majuro: MAJ
+    Pacific/Marquesas: NHV
+    Pacific/Nauru: INU
+    Pacific/Norfolk: NLK
+    Pacific/Noumea: NOU
+    Pacific/Pago_Pago: PPG
+    Pacific/Palau: ROR
+    Pacific/Pohnpei: PNI
+    Pacific/Port_Moresby: POM LAE
+    Pacific/Rarotonga: RAR
+    Pacific/Saipan: SPN
+    Pacific/Tahiti: PPT BOB MOZ
+    Pacific/Tarawa: TRW
+    Pacific/Tongatapu: TBU
+    Pacific/Wallis: WLS
+"""
+
+def _zone_table(text: str) -> Dict[str, str]:
+    table: Dict[str, str] = {}
+    zone: str = ""
+    for token in text.split():
+        if token.endswith(":"):
+            zone = token[:-1]
+        else:
+            table[token] = zone
+    return table
+
+# Codes from IATA_EXTRA_CODES may carry a timezone as "CODE=Zone/Name".
+_EXTRA_CODES: List[List[str]] = [
+    [part.strip() for part in entry.split("=", 1)]
+    for entry in os.getenv("IATA_EXTRA_CODES", "").split(",") if entry.strip()
+]
+
+AIRPORT_TIMEZONES: Dict[str, str] = {
+    **_zone_table(_AIRPORT_ZONES),
+    **{entry[0].upper(): entry[1] for entry in _EXTRA_CODES if len(entry) == 2 and entry[1]},
+}
+
+@lru_cache(maxsize=None)
+def airport_timezone(code: str) -> Optional[ZoneInfo]:
+    """Timezone of an airport, or None for one outside the built-in table (or an IATA_EXTRA_CODES code given without one)."""
+    name: Optional[str] = AIRPORT_TIMEZONES.get(code)
+    return ZoneInfo(name) if name else None
+
+@lru_cache(maxsize=4096)
+def _wall_time(value: str) -> Optional[datetime]:
+    """A SerpAPI "YYYY-MM-DD HH:MM" wall-clock time, or None when missing or malformed."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=4096)
+def parse_local_time(value: str, airport: str) -> Optional[datetime]:
+    """
+    Parse a SerpAPI "YYYY-MM-DD HH:MM" local time at ``airport``.
+
+    Always timezone-aware: None when the value is missing or malformed, or
+    when ``airport`` has no known timezone (``segment_times`` can still
+    place such a time from the rest of its itinerary). Results are memoized
+    since the same departure slots repeat across itineraries.
+    """
+    parsed: Optional[datetime] = _wall_time(value)
+    tz: Optional[ZoneInfo] = airport_timezone(airport)
+    return parsed.replace(tzinfo=tz) if parsed is not None and tz is not None else None
+
+def _implied_offset(local: datetime, instant: datetime) -> Optional[tzinfo]:
+    """Fixed UTC offset at which wall-clock ``local`` is the UTC ``instant``, to the quarter hour."""
+    minutes: int = round((local - instant.replace(tzinfo=None)).total_seconds() / 900) * 15
+    return timezone(timedelta(minutes=minutes)) if abs(minutes) <= 14 * 60 else None
+
+def segment_times(segments: List[Dict[str, Any]]) -> List[Tuple[Optional[datetime], Optional[datetime]]]:
+    """
+    Timezone-aware ``(departure, arrival)`` times of each segment of a SerpAPI itinerary.
+
+    Airports in the built-in table get their IANA timezone. Any other one
+    (a connection outside the table, or an IATA_EXTRA_CODES code given
+    without a zone) gets the fixed UTC offset implied by a neighbour: a
+    segment's duration links its departure and arrival, and a connection
+    leaves from the airport the previous segment landed at. A time is None
+    when it is missing or malformed, or when nothing in the itinerary
+    anchors its airport, so aware and naive values are never mixed.
+    """
+    ends: List[Tuple[Dict[str, Any], Dict[str, Any]]] = [
+        (segment.get("departure_airport") or {}, segment.get("arrival_airport") or {}) for segment in segments
+    ]
+    zones: Dict[str, Optional[tzinfo]] = {
+        side.get("id", ""): airport_timezone(side.get("id", "")) for pair in ends for side in pair
+    }
+    if None not in zones.values():
+        # Every airport is in the table, so the memoized per-airport parse covers it
+        return [
+            (
+                parse_local_time(departure.get("time", ""), departure.get("id", "")),
+                parse_local_time(arrival.get("time", ""), arrival.get("id", ""))
+            )
+            for departure, arrival in ends
+        ]
+
+    # A pass places the airports next to already placed ones; repeat while one makes progress
+    unresolved: int = sum(1 for tz in zones.values() if tz is None)
+    while unresolved:
+        for segment, (departure, arrival) in zip(segments, ends):
+            departs: Optional[datetime] = _wall_time(departure.get("time", ""))
+            arrives: Optional[datetime] = _wall_time(arrival.get("time", ""))
+            duration: Optional[int] = segment.get("duration")
+            if departs is None or arrives is None or not duration:
+                continue
+            from_tz: Optional[tzinfo] = zones[departure.get("id", "")]
+            to_tz: Optional[tzinfo] = zones[arrival.get("id", "")]
+            if from_tz is not None and to_tz is None:
+                landed: datetime = departs.replace(tzinfo=from_tz).astimezone(timezone.utc) + timedelta(minutes=duration)
+                zones[arrival.get("id", "")] = _implied_offset(arrives, landed)
+            elif to_tz is not None and from_tz is None:
+                left: datetime = arrives.replace(tzinfo=to_tz).astimezone(timezone.utc) - timedelta(minutes=duration)
+                zones[departure.get("id", "")] = _implied_offset(departs, left)
+        remaining: int = sum(1 for tz in zones.values() if tz is None)
+        if remaining == unresolved:
+            break
+        unresolved = remaining
+
+    def placed(side: Dict[str, Any]) -> Optional[datetime]:
+        parsed: Optional[datetime] = _wall_time(side.get("time", ""))
+        tz: Optional[tzinfo] = zones[side.get("id", "")]
+        return parsed.replace(tzinfo=tz) if parsed is not None and tz is not None else None
+
+    return [(placed(departure), placed(arrival)) for departure, arrival in ends]
+
+# IATA codes of airports with scheduled passenger service, by region. Searches
+# naming anything else (or a metro area code above) are rejected locally
+# instead of spending a SerpAPI call. IATA_EXTRA_CODES adds codes missing here
+# (comma-separated, each optionally "CODE=Zone/Name").
+_IATA_AIRPORTS: str = """
+    ATL BOS BWI CLT DCA DTW EWR FLL IAD JFK LGA MCO MIA PHL PIT RDU TPA CLE AUS BNA DFW DAL
+    HOU IAH MCI MDW MSP MSY ORD SAT STL DEN SLC PHX LAS LAX OAK PDX SAN SEA SFO SJC SMF ANC
+    HNL OGG KOA LIH ITO MKK LNY FAI JNU KTN SIT BET OME ABQ ALB AMA ABE ACY AGS AVL AVP BDL
+    BGR BHM BIL BIS BLI BOI BTV BUF BUR BZN CAE CAK CHA CHS CID CMH COS CRP CRW CVG DAB DAY
+    DSM ELP EUG EYW FAR FAT FAY FSD GEG GRR GSO GSP GPT HPN HSV ICT IND ISP JAN JAX LBB LEX
+    LGB LIT MAF MDT MEM MFE MHT MKE MLB MOB MSN MYR OKC OMA ONT ORF PBI PIE PNS PSP PVD PWM
+    RIC RNO ROC RSW SAV SBA SBN SDF SGF SHV SNA SRQ SYR TLH TUL TUS TYS VPS XNA ACK MVY HYA
+    ORH PVU OGD IDA JAC SUN ASE EGE HDN GUC MTJ DRO GJT TEX FCA GTF HLN MSO BTM RAP FNT LAN
+    AZO TVC MQT CWA ATW GRB LSE DLH RST MLI PIA BMI CMI SPI ALO DBQ EVV FWA TOL MBS ERI ELM
+    ITH BGM PBG OGS SWF TTN LNK GRI EAR MHK GCK HYS SLN TOP JLN COU CGI PAH BWG CKB HTS LWB
+    ROA LYH CHO PHF SBY ILM OAJ EWN PGV GNV OCF ECP DHN ABY VLD BQK CSG MCN AEX LFT LCH MLU
+    BTR TXK ELD TYR LRD BRO HRL VCT CLL ACT GGG ABI SJT SPS LAW ROW HOB CNM SAF FMN GUP ALS
+    PUB CYS LAR CPR RKS COD GCC SHR RIW CDC SGU YUM IFP FLG PGA GCN PRC STS ACV RDD MRY SBP
+    SCK SMX IYK MMH CIC OXR PSC YKM ALW PUW LWS EAT MWH RDM MFR LMT OTH SLE BFL VIS MCE BRW
+    SCC ADQ DLG AKN CDV YAK PSG WRG GST ENA HOM DUT OTZ VDZ MCG UNK ANI GAL SFB PGD USA AZA
+    BLV RFD LCK SCE LBE IAG PSM BKG VRB APF FMY HGR GFK MOT DIK XWA JMS ABR PIR ATY FOD MCW
+    SUX BRD BJI INL HIB TWF PIH EKO BFF LBF MCK DDC LBL VEL CNY HVN LEB RUT PQI BHB RKD AUG
+    SLK PLN ESC IMT IWD RHI EAU CMX APN CIU DEC MWA UIN BRL SHD PKB BKW MGW JST DUJ BFD MSL
+    TUP GTR MEI PIB GLH HOT HRO FSM JBR TBN SVC DRT
+    GUM SPN STT STX SJU BQN PSE MAZ CPX VQS PPG
+    YYZ YTZ YUL YMX YOW YVR YYC YEG YHZ YWG YQB YXE YQR YYJ YLW YXX YKA YXS YQT YSB YQM YFC
+    YYT YDF YQX YYG YSJ YZF YXY YFB YCD YZP YPR YXU YKF YHM YQG YGK YXT YXJ YMM YQL YPE YQU
+    YXC YBL YCG YVO YUY YNA YGR YGP YBC YZV YWK YQY YDQ YPA YTH YYR YRB YEV YOJ YWL YZT YPW
+    YAM YTS YQA YQQ YXH YBR YQF
+    MEX NLU CUN GDL MTY TIJ SJD PVR MZT ACA ZIH HUX OAX MID VER BJX QRO SLP AGU CUL HMO CJS
+    CUU TRC DGO ZCL TAM REX MLM UPN TGZ VSA CME CTM PBC TLC NLD PXM LTO LAP ZLO TPQ CZM TQO
+    PQM MXL CVM PAZ MAM PDS LZC CPE CEN GYM CLQ
+    AUA CUR BON SXM PUJ SDQ STI POP LRM AZS JBQ PAP CAP KIN MBJ NAS FPO ELH GGT MHH ZSA GCM
+    CYB HAV VRA HOG SCU CCC CYO SNU BGI POS TAB GND UVF SLU SVD ANU SKB NEV DOM EIS AXA SBH
+    PTP FDF BDA PLS GDT EUX
+    PTY SJO LIR GUA FRS SAL TGU SAP XPL RTB LCE MGA BZE DAV BOC
+    BOG MDE CLO CTG BAQ SMR ADZ BGA PEI CUC PSO LET AXM EOH MTR VUP UIB IBE NVA RCH UIO GYE
+    CUE GPS SCY OCC MEC LIM CUZ AQP JUL PIU TRU CIX IQT PCL TPP TCQ AYP TBP PEM LPB VVI CBB
+    SRE TJA TDD SCL PMC PUQ ANF IQQ CJC ARI CCP ZCO LSC ZAL BBA PNT IPC CPO ZOS EZE AEP COR
+    MDZ BRC IGR FTE USH SLA TUC NQN REL CRD RGL MDQ BHI ROS JUJ CTC SDE RES CNQ PSS SFN UAQ
+    LUQ AFA RGA EQS VDM CPC MVD PDP ASU AGT CCS MAR VLN BLA PMV BRM MUN PZO GEO PBM CAY
+    GRU CGH VCP GIG SDU BSB CNF PLU SSA REC FOR BEL MAO POA CWB FLN NAT MCZ AJU JPA THE SLZ
+    CGB CGR GYN VIX IGU NVT JOI LDB MGF RAO UDI BPS IOS PMW PVH RBR MCP BVB STM XAP CXJ PET
+    IMP MAB JDO PNZ FEN CAC SJP UBA MOC VDC CPV JJD
+    LHR LGW STN LTN LCY SEN MAN EDI BHX BRS NCL LPL GLA ABZ BFS BHD EMA LBA EXT NWI SOU CWL
+    INV JER GCI IOM MME HUY NQY BOH KOI LSI SYY BEB DND LDY DUB ORK SNN KIR NOC
+    CDG ORY BVA NCE LYS MRS TLS BOD NTE MPL BIQ LIL SXB MLH BSL RNS BES BIA AJA FSC CLY TLN
+    PUF PGF CFE LIG LRH EGC RDZ CCF FNI BZR AVN PIS TUF LDE DNR LAI UIP LRT CMF GNB ETZ
+    AMS RTM EIN GRQ MST BRU CRL ANR LGG LUX OST
+    FRA MUC BER DUS HAM STR CGN HAJ NUE LEJ DRS BRE DTM FMM FKB PAD HHN NRN SCN ERF GWT RLG
+    KSF FDH HDF ZRH GVA BRN SIR VIE SZG INN GRZ LNZ KLU
+    MAD BCN PMI IBZ MAH AGP ALC VLC SVQ BIO SCQ VGO OVD SDR LCG XRY GRX LEI MJV REU GRO ZAZ
+    VLL PNA LPA TFN TFS ACE FUE SPC GMZ VDE EAS VIT LEN RGS SLM ODB RMU CDT HSK RJL
+    LIS OPO FAO FNC PDL TER HOR PXO SMA FLW
+    FCO CIA MXP LIN BGY VCE TSF NAP CTA PMO BLQ FLR PSA BRI BDS SUF REG CAG OLB AHO TRN GOA
+    VRN TRS PSR AOI PEG RMI FOG CRV TPS CIY LMP PNL BZO QSR CUF FRL MLA GIB
+    ATH SKG HER CHQ RHO CFU JTR JMK KGS ZTH EFL KLX PVK KVA IOA AOK JSI SMI MJT LXS JKH PAS
+    JNX MLO KIT SKU LRS KZS JIK GPA VOL KSO LCA PFO ECN
+    IST SAW ESB ADB AYT DLM BJV ADA TZX GZT VAN ERZ DIY KYA ASR NAV SZF MLX EZS GZP DNZ BAL
+    MQM KCM HTY GNY EDO KSY AJI OGU MSR BGG ERC VAS TEQ CKZ
+    CPH BLL AAL AAR OSL BGO TRD SVG TOS BOO AES KRS HAU EVE ALF KKN LYR MOL ARN BMA NYO GOT
+    MMX LLA UME LPI VBY OSD KRN SDL KSD HEL TMP TKU OUL RVN KTT KUO VAA JOE IVL MHQ KEF RKV
+    AEY EGS IFJ FAE GOH SFJ
+    WAW WMI KRK KTW GDN WRO POZ RZE SZZ LUZ PRG BRQ OSR BTS KSC BUD DEB OTP CLJ TSR IAS SBZ
+    CND BCM SUJ OMR CRA SOF VAR BOJ BEG INI ZAG SPU DBV ZAD PUY RJK OSI BNX SJJ TZL OMO LJU
+    MBX TGD TIV TIA SKP OHD PRN KIV RIX TLL TAY VNO KUN PLQ MSQ KBP IEV LWO ODS HRK DNK
+    SVO DME VKO ZIA LED KZN SVX OVB AER KRR ROV MRV UFA KUF VOG GOJ PEE CEK TJM OMS KJA IKT
+    VVO KHV YKS MMK ARH KGD MCX GRV AAQ SIP UUS PKC GDX BAX KEJ NOZ TOF SGC NJC HMA NUX UUD
+    HTA BQS
+    TBS BUS KUT EVN GYD NQZ TSE ALA CIT AKX GUW KGF URA PWQ UKK TAS SKD BHK UGC NMA FEG FRU
+    OSS DYU LBD ASB ULN UBN
+    DXB DWC AUH SHJ RKT FJR DOH BAH KWI MCT SLL DQM RUH JED DMM MED AHB TIF TUU ELQ GIZ YNB
+    HAS TLV ETM AMM AQJ BEY DAM ALP LTK BGW BSR EBL ISU NJF IKA THR MHD SYZ IFN TBZ KIH AWZ
+    BND KSH ZAH RAS SAH ADE
+    CAI HRG SSH LXR ASW HBE RMF SPX ATZ CMN RAK AGA FEZ TNG RBA OUD NDR ESU OZZ VIL EUN ALG
+    ORN CZL AAE TLM BJA HME TUN MIR NBE DJE SFA TOE TIP MJI BEN KRT PZU ADD DIR BJR GDQ LLI
+    MQX AXU ASM JIB MGQ HGA NBO MBA WIL KIS EDL MYD LAU UKA EBB KGL BJM DAR JRO ZNZ MWZ DOD
+    JNB CPT DUR PLZ ELS GRJ BFN KIM MQP HLA PHW UTN GBE MUB BBK WDH ERS WVB OND LUN LVI NLA
+    MFU HRE BUQ VFA LLW BLZ MPM BEW VNX POL TET APL INH TNR NOS TMM DIE MJN FTU TLE SMS MRU
+    RRG RUN ZSE SEZ PRI DZA HAH MSU SHO LAD LOS ABV PHC KAN ENU QOW CBQ BNI ILR JOS KAD YOL
+    MIU SKO ACC KMS TML TKD ABJ DKR DSS BJL CKY FNA ROB MLW OUA BOY BKO NIM NDJ LFW COO DLA
+    NSI LBV POG SSG BZV PNR FIH FBM GOM FKI BGF NKC RAI SID BVC VXE OXB TMS JUB
+    DEL BOM BLR MAA CCU HYD COK AMD GOI GOX PNQ TRV CCJ IXE IXB JAI LKO VNS PAT GAU IXC ATQ
+    SXR IXJ IXL BBI RPR NAG IDR BHO VTZ IXM TRZ CJB IXZ IXR DED UDR JDH IXU STV BDQ RAJ IXA
+    IMF DIB IXS VGA TIR RJA HBX IXG MYQ GAY DBR JRH IXD GOP KNU AGR JLR GWL KLH ISK NDC CNN
+    TCR SAG IXY BHJ JGA PBD DHM KUU PGH HSR
+    KHI LHE ISB PEW MUX SKT LYP UET GIL KDU GWD DAC CGP ZYL CXB JSR SPD RJH BZL KTM PKR BWA
+    BIR BDP CMB HRI JAF MLE GAN PBH KBL
+    SIN KUL SZB PEN LGK BKI KCH MYY SDK TWU JHB KBR KUA IPH AOR TGG SBW BTU LBU MKZ BKK DMK
+    HKT CNX CEI USM KBV HDY UTH UBP KKC NST URT TST NAW UTP TDX NNT PHS LPT CGK HLP DPS SUB
+    KNO JOG YIA UPG BPN BDO PLM PKU BTH PDG SRG SOC MDC AMQ DJJ LOP LBJ KOE BTJ PNK BDJ TRK
+    DJB BKS TKG PGK TJQ KDI PLW GTO TTE SOQ BIK MKW TIM MKQ BWX MLG KJT MNL CEB CRK DVO ILO
+    BCD KLO MPH PPS TAG BXU CGY GES ZAM TAC LGP DGT IAO USU LAO TUG SGN HAN DAD CXR PQC HPH
+    HUI VCA VII DLI UIH BMV VDO THD VCL TBB PXU VKG CAH DIN VDH PNH KTI REP SAI KOS VTE LPQ
+    PKZ RGN MDL NYT HEH BWN DIL
+    HKG MFM TPE TSA KHH RMQ TNN HUN KNH MZG TTT PEK PKX PVG SHA CAN SZX CTU TFU CKG KMG XIY
+    HGH NKG WUH CSX XMN FOC TAO TSN SHE DLC HRB CGO TYN SJW HFE NNG KWE LHW URC INC XNN HAK
+    SYX JHG LXA KWL NGB WNZ TNA YNT WEH JJN SWA ZUH HET BAV DSN CGQ YNJ MDG JMU HLD ZHA BHY
+    LJG DLU DYG YIH XFN LYA CZX WUX YTY NTG HSN JDZ KHN LYI WEF KRL KHG HTN AKU YIN DNH JGN
+    ENH WDS LZO YBP MIG NAO DAX WXN ZYI AVA TEN KJH LZH WUS HYN YIW HUZ MXZ TNH CIF TGO ERL
+    XIL
+    ICN GMP PUS CJU TAE CJJ KWJ RSU USN MWX YNY KPO HIN WJU KUV
+    HND NRT KIX ITM UKB NGO CTS FUK OKA KOJ KMJ HIJ SDJ OIT KMI NGS MYJ TAK KCZ TKS OKJ IZO
+    YGJ UBJ KKJ FSZ KMQ TOY KIJ AOJ AXT HNA MSJ GAJ SYO FKS HKD AKJ KUH OBO MMB WKJ SHB ISG
+    MMY SHI ASJ TKN KUM TNE IWK HSG AXJ NTQ MMJ IBR OIM HAC
+    SYD MEL BNE PER ADL CBR OOL CNS DRW HBA LST TSV MKY ROK PPP HTI BNK CFS NTL ABX WGA DBO
+    ARM TMW PQQ MQL AVV ASP AYQ BME KTA PHE KGI GET ALH EPR LEA KNX ISA MCY HVB BDB GLT EMD
+    WEI HID DPO BWT KNS WSI LDH NLK AKL WLG CHC ZQN DUD NPE NSN PMR ROT TRG NPL HLZ IVC BHE
+    TUO GIS WRE KKE HKK WSZ TIU WAG
+    NAN SUV APW PPT BOB MOZ RAR TBU VLI SON HIR POM LAE NOU ROR MAJ KWA PNI TKK YAP KSA TRW
+    FUN INU CXI WLS NHV
+"""
+
+IATA_AIRPORTS: FrozenSet[str] = frozenset(_IATA_AIRPORTS.split()) | frozenset(AIRPORT_TIMEZONES) | frozenset(
+    entry[0].upper() for entry in _EXTRA_CODES
+)
+
+def is_known_airport(code: str) -> bool:
+    """Whether ``code`` (already uppercased) is an airport or metro area code in the built-in tables."""
+    return code in IATA_AIRPORTS or code in METRO_AREAS
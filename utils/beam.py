@@ -0,0 +1,67 @@
+import heapq
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+def beam_combine(
+    candidates: Sequence[Sequence[T]],
+    cost: Callable[[T], float],
+    compatible: Optional[Callable[[T, T], bool]] = None,
+    width: int = 50,
+    top_k: int = 10
+) -> Tuple[List[Tuple[float, Tuple[int, ...]]], int]:
+    """
+    Combine one candidate per stage into the cheapest complete sequences.
+
+    A bounded top-K (beam) search: after each stage only the ``width``
+    cheapest partial sequences survive, so the work is at most
+    ``stages * width * candidates`` instead of the full cross-product.
+    Candidates of a stage are tried cheapest first and a partial sequence
+    stops expanding as soon as it can no longer beat the worst survivor.
+    Costs are additive; without a ``compatible`` constraint and with
+    ``width >= top_k`` the result is exact.
+
+    Args:
+        candidates (Sequence[Sequence[T]]): Options per stage, in stage order.
+        cost (Callable[[T], float]): Cost of one option.
+        compatible (Optional[Callable[[T, T], bool]], optional): Whether an option may follow the previous
+            stage's pick. Defaults to allowing every pair.
+        width (int, optional): Partial sequences kept after each stage. Defaults to 50.
+        top_k (int, optional): Complete sequences to return. Defaults to 10.
+
+    Returns:
+        Tuple[List[Tuple[float, Tuple[int, ...]]], int]: ``(total cost, option index per stage)`` pairs, cheapest
+            first, and the number of partial sequences evaluated.
+    """
+    width = max(width, top_k, 1)
+    beam: List[Tuple[float, Tuple[int, ...]]] = [(0.0, ())]
+    evaluated: int = 0
+    previous: Sequence[T] = ()
+    for options in candidates:
+        costs: List[float] = [cost(option) for option in options]
+        order: List[int] = sorted(range(len(options)), key=costs.__getitem__)
+        if not order:
+            return [], evaluated
+        # Max-heap (by negated cost) of the best ``width`` extensions so far.
+        best: List[Tuple[float, Tuple[int, ...]]] = []
+        for total, picks in beam:
+            # The beam is sorted, so once its cheapest extension cannot get in, no later state can.
+            if len(best) == width and total + costs[order[0]] >= -best[0][0]:
+                break
+            for j in order:
+                extended: float = total + costs[j]
+                if len(best) == width and extended >= -best[0][0]:
+                    break
+                evaluated += 1
+                if picks and compatible is not None and not compatible(previous[picks[-1]], options[j]):
+                    continue
+                item: Tuple[float, Tuple[int, ...]] = (-extended, picks + (j,))
+                if len(best) < width:
+                    heapq.heappush(best, item)
+                else:
+                    heapq.heapreplace(best, item)
+        beam = sorted((-negated, picks) for negated, picks in best)
+        if not beam:
+            return [], evaluated
+        previous = options
+    return beam[:top_k], evaluated
@@ -0,0 +1,55 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Generic, Hashable, Iterable, Optional, Tuple, TypeVar
+from utils.rate_limit import RateLimiter
+
+K = TypeVar("K", bound=Hashable)
+
+@dataclass
+class FanoutResult(Generic[K]):
+    key: K
+    result: Any = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+async def bounded_fanout(
+    jobs: Iterable[Tuple[K, Callable[[], Awaitable[Any]]]],
+    concurrency: int,
+    limiter: Optional[RateLimiter] = None
+) -> AsyncIterator[FanoutResult[K]]:
+    """
+    Run jobs concurrently and yield each outcome as soon as it finishes.
+
+    At most ``concurrency`` jobs run at once and, when a ``limiter`` is given,
+    each job takes a token before starting. A failing job yields its error
+    instead of aborting the rest. Closing the iterator early cancels jobs
+    that have not finished.
+
+    Args:
+        jobs (Iterable[Tuple[K, Callable[[], Awaitable[Any]]]]): ``(key, coroutine factory)`` pairs.
+        concurrency (int): Maximum number of jobs in flight.
+        limiter (Optional[RateLimiter], optional): Rate limiter gating job starts. Defaults to None.
+
+    Yields:
+        FanoutResult[K]: Key, result or error, and wall time of each job.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(key: K, fn: Callable[[], Awaitable[Any]]) -> FanoutResult[K]:
+        async with semaphore:
+            if limiter is not None:
+                await limiter.acquire()
+            start: float = time.perf_counter()
+            try:
+                return FanoutResult(key=key, result=await fn(), elapsed=time.perf_counter() - start)
+            except Exception as e:
+                return FanoutResult(key=key, error=e, elapsed=time.perf_counter() - start)
+
+    tasks = [asyncio.ensure_future(run(key, fn)) for key, fn in jobs]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,137 @@
+import time
+import functools
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+from utils.profiling import profiler
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+# Upper bounds in seconds, from 0.1 ms to 60 s, roughly 2.5x apart.
+BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Memory stays constant no matter how many samples are recorded.
+    Quantiles are interpolated linearly within the bucket they fall in, as
+    Prometheus' ``histogram_quantile`` does.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        self.buckets: Tuple[float, ...] = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count: int = 0
+        self.sum: float = 0.0
+        self.max: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank: float = q * self.count
+        seen: int = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower: float = self.buckets[i - 1] if i > 0 else 0.0
+                upper: float = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Count plus mean, quantiles and max in milliseconds."""
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(1000 * value, 3) if value is not None else None
+
+        result: Dict[str, Optional[float]] = {"count": self.count, "mean_ms": ms(self.sum / self.count if self.count else None)}
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}_ms"] = ms(self.quantile(q))
+        result["max_ms"] = ms(self.max if self.count else None)
+        return result
+
+class Metrics:
+    """
+    Per-stage timing histograms and counters for the tool pipeline.
+
+    Stages are labelled by name and, optionally, by tool, e.g.
+    ``("upstream", "get_flights")``.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[Tuple[str, str], Histogram] = {}
+        self.counters: Dict[str, int] = {}
+
+    def observe(self, stage: str, seconds: float, tool: str = "") -> None:
+        histogram: Optional[Histogram] = self.stages.get((stage, tool))
+        if histogram is None:
+            histogram = self.stages[(stage, tool)] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def span(self, stage: str, tool: str = "") -> Iterator[None]:
+        """Time the enclosed block as one ``stage`` sample, whether or not it raises."""
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, tool)
+
+    def increment(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+        """Stage summaries grouped by tool ("" for stages shared by every tool)."""
+        grouped: Dict[str, Dict[str, Dict[str, Optional[float]]]] = {}
+        for (stage, tool), histogram in sorted(self.stages.items()):
+            grouped.setdefault(tool or "all", {})[stage] = histogram.summary()
+        return grouped
+
+    def to_prometheus(self, prefix: str = "flight_mcp", gauges: Optional[Dict[str, float]] = None) -> str:
+        """Render histograms, counters and extra ``gauges`` in the Prometheus text format."""
+        name: str = f"{prefix}_stage_seconds"
+        lines: List[str] = [f"# HELP {name} Time spent per pipeline stage.", f"# TYPE {name} histogram"]
+        for (stage, tool), histogram in sorted(self.stages.items()):
+            labels: str = f'stage="{stage}"' + (f',tool="{tool}"' if tool else "")
+            cumulative: int = 0
+            for bound, n in zip(histogram.buckets, histogram.counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        for counter, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}_{counter}_total counter")
+            lines.append(f"{prefix}_{counter}_total {value}")
+        for gauge, value in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE {prefix}_{gauge} gauge")
+            lines.append(f"{prefix}_{gauge} {value}")
+        return "\n".join(lines) + "\n"
+
+# Shared by the server and every tool module.
+metrics: Metrics = Metrics()
+
+def instrument(tool: str) -> Callable[[F], F]:
+    """
+    Time every call of an async tool as its "total" stage and let the
+    sampled profiler capture it. Apply below ``@mcp.tool()``.
+    """
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with profiler.maybe_profile(tool), metrics.span("total", tool):
+                return await fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorate
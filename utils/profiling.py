@@ -0,0 +1,74 @@
+import io
+import os
+import time
+import random
+import pstats
+import cProfile
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+class SampledProfiler:
+    """
+    Captures cProfile runs of a random sample of tool calls.
+
+    ``sample_rate`` may be changed at runtime; 0 disables capturing. Only one
+    capture runs at a time, since the interpreter allows a single active
+    profiler. Under asyncio a capture also sees other tasks that ran on the
+    event loop while the sampled call was awaiting.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, keep: int = 20, top: int = 25) -> None:
+        self.sample_rate: float = sample_rate
+        self.keep: int = keep
+        self.top: int = top
+        self.captures: Deque[Dict[str, Any]] = deque(maxlen=keep)
+        self._active: bool = False
+
+    @classmethod
+    def from_env(cls) -> "SampledProfiler":
+        """Build a profiler from the ``PROFILE_*`` environment variables."""
+        return cls(
+            sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+            keep=int(os.getenv("PROFILE_KEEP", "20"))
+        )
+
+    def set_sample_rate(self, sample_rate: float) -> None:
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"Invalid sample_rate '{sample_rate}'. Must be between 0 and 1.")
+        self.sample_rate = sample_rate
+
+    @contextmanager
+    def maybe_profile(self, label: str) -> Iterator[None]:
+        """Profile the enclosed block if it is sampled and no other capture is running."""
+        if self._active or self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            yield
+            return
+
+        self._active = True
+        profile = cProfile.Profile()
+        start: float = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._active = False
+            self.captures.append({
+                "label": label,
+                "captured_at": time.time(),
+                "wall_ms": round(1000 * (time.perf_counter() - start), 3),
+                "stats": self._format(profile),
+            })
+
+    def _format(self, profile: cProfile.Profile) -> str:
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(self.top)
+        return out.getvalue()
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most recent captures, newest first."""
+        return list(reversed(self.captures))[:limit]
+
+# Shared by the server and every tool module.
+profiler: SampledProfiler = SampledProfiler.from_env()
@@ -0,0 +1,144 @@
+import json
+import base64
+import hashlib
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from utils.airports import segment_times
+
+def _total_duration(row: Dict[str, Any]) -> int:
+    return row.get("total_duration") or 0
+
+def _departure_time(row: Dict[str, Any]) -> float:
+    # Compare instants, so itineraries from airports in different timezones
+    # (e.g. a batch search) order correctly. A time that cannot be placed
+    # has no instant, so it sorts last rather than at a guessed one.
+    segments: List[Dict[str, Any]] = row.get("flights") or []
+    departs: Optional[datetime] = segment_times(segments)[0][0] if segments else None
+    return departs.timestamp() if departs is not None else float("inf")
+
+def _stops(row: Dict[str, Any]) -> int:
+    return max(len(row.get("flights") or []) - 1, 0)
+
+def _price(row: Dict[str, Any]) -> float:
+    return row.get("price") or float("inf")
+
+SORT_KEYS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "price": _price,
+    "duration": _total_duration,
+    "departure_time": _departure_time,
+    "stops": _stops,
+}
+
+def _airline_codes(row: Dict[str, Any]) -> List[str]:
+    """Airline names and IATA designators (from "DL 123") of every segment, lowercased."""
+    codes: List[str] = []
+    for segment in row.get("flights") or []:
+        codes.append((segment.get("airline") or "").lower())
+        codes.append((segment.get("flight_number") or "").split(" ")[0].lower())
+    return codes
+
+@dataclass
+class FlightQuery:
+    """
+    Filters, sort order and paging applied to raw SerpAPI rows.
+
+    Runs before any result model is built, so only the returned page pays
+    for model construction and serialization.
+    """
+    sort_by: Optional[str] = None
+    descending: bool = False
+    include_airlines: List[str] = field(default_factory=list)
+    exclude_airlines: List[str] = field(default_factory=list)
+    max_layover_minutes: Optional[int] = None
+    no_overnight: bool = False
+    max_price: Optional[float] = None
+    max_stops: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.sort_by is not None and self.sort_by not in SORT_KEYS:
+            raise ValueError(f"Invalid sort_by '{self.sort_by}'. Must be one of {list(SORT_KEYS)}.")
+        self.include_airlines = [a.strip().lower() for a in self.include_airlines or []]
+        self.exclude_airlines = [a.strip().lower() for a in self.exclude_airlines or []]
+        if self.max_stops is not None and self.max_stops < 0:
+            raise ValueError(f"Invalid max_stops '{self.max_stops}'. Must be zero or more.")
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        if self.max_price is not None and _price(row) > self.max_price:
+            return False
+        if self.max_stops is not None and _stops(row) > self.max_stops:
+            return False
+        if self.include_airlines or self.exclude_airlines:
+            codes: List[str] = _airline_codes(row)
+            if self.include_airlines and not any(a in codes for a in self.include_airlines):
+                return False
+            if any(a in codes for a in self.exclude_airlines):
+                return False
+
+        layovers: List[Dict[str, Any]] = row.get("layovers") or []
+        if self.max_layover_minutes is not None:
+            if any((l.get("duration") or 0) > self.max_layover_minutes for l in layovers):
+                return False
+        if self.no_overnight:
+            if any(l.get("overnight") for l in layovers):
+                return False
+            if any(s.get("overnight") for s in row.get("flights") or []):
+                return False
+        return True
+
+    def apply(self, rows: List[Dict[str, Any]], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Filter and sort rows. Without ``sort_by`` the upstream ranking is kept.
+
+        With a ``limit`` only that many rows are returned; when unsorted,
+        filtering stops as soon as the limit is reached.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError(f"Invalid max_results '{limit}'. Must be at least 1.")
+        matching: Iterator[Dict[str, Any]] = (row for row in rows if self.matches(row))
+        if self.sort_by is None:
+            return list(islice(matching, limit))
+        # Stable sort, so ties keep the upstream ranking.
+        selected: List[Dict[str, Any]] = sorted(matching, key=SORT_KEYS[self.sort_by], reverse=self.descending)
+        return selected[:limit]
+
+    def fingerprint(self, search_key: str) -> str:
+        """Short digest tying a cursor to one search and one query."""
+        payload: str = json.dumps([search_key, asdict(self)], sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+def encode_cursor(offset: int, fingerprint: str) -> str:
+    raw: bytes = json.dumps({"o": offset, "f": fingerprint}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, fingerprint: str) -> int:
+    """Return the offset stored in ``cursor`` after checking it belongs to this query."""
+    try:
+        padded: str = cursor + "=" * (-len(cursor) % 4)
+        data: Dict[str, Any] = json.loads(base64.urlsafe_b64decode(padded))
+        offset: int = int(data["o"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(f"Invalid cursor '{cursor}'.")
+    if data.get("f") != fingerprint or offset < 0:
+        raise ValueError("Cursor does not belong to this search. Repeat the search without a cursor.")
+    return offset
+
+def paginate(
+    rows: List[Dict[str, Any]],
+    page_size: int,
+    fingerprint: str,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Slice one page out of ``rows``.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Optional[str]]: The page and the cursor for the next one, or None on the last page.
+    """
+    if page_size < 1:
+        raise ValueError(f"Invalid page_size '{page_size}'. Must be at least 1.")
+    offset: int = decode_cursor(cursor, fingerprint) if cursor else 0
+    end: int = offset + page_size
+    next_cursor: Optional[str] = encode_cursor(end, fingerprint) if end < len(rows) else None
+    return rows[offset:end], next_cursor
@@ -0,0 +1,34 @@
+import asyncio
+import time
+from typing import Optional
+
+class RateLimiter:
+    """
+    Async token bucket.
+
+    Tokens refill continuously at ``rate`` per second up to ``burst``; each
+    ``acquire()`` takes one token, sleeping until one is available.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None) -> None:
+        if rate <= 0:
+            raise ValueError(f"Invalid rate '{rate}'. Must be greater than 0.")
+        self.rate: float = rate
+        self.burst: float = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens: float = self.burst
+        self._updated: float = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        # The lock makes waiters queue in arrival order.
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
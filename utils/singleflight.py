@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+class _Call:
+    def __init__(self, task: "asyncio.Task[Any]") -> None:
+        self.task: "asyncio.Task[Any]" = task
+        self.waiters: int = 0
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls that share a key.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is running await the same task. Each caller waits through
+    ``asyncio.shield`` so cancelling one caller leaves the shared call running
+    for the rest; the work is only cancelled once every caller has gone.
+    Errors are delivered to every waiter and the key is released, so the next
+    call starts fresh.
+    """
+
+    def __init__(self) -> None:
+        self.coalesced: int = 0
+        self._calls: Dict[str, _Call] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def is_in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``fn`` for ``key`` unless an identical call is already in flight.
+
+        Args:
+            key (str): Identity of the call, e.g. a normalized search key.
+            fn (Callable[[], Awaitable[Any]]): Coroutine factory doing the work.
+
+        Returns:
+            Any: The shared result of ``fn``.
+        """
+        call: _Call | None = self._calls.get(key)
+
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task, call=call: self._release(key, call))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _release(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every waiter already left.
+        if not call.task.cancelled():
+            call.task.exception()
@@ -1,10 +1,23 @@
-from datetime import datetime
+from datetime import date
+from functools import lru_cache
+
+@lru_cache(maxsize=4096)
+def parse_date(date_str: str, field_name: str) -> date:
+    """
+    Parse a strict YYYY-MM-DD date.
+
+    Memoized, since the same handful of travel dates repeat across requests
+    and across the cells of batch and calendar searches.
+    """
+    if isinstance(date_str, str) and len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-":
+        try:
+            return date.fromisoformat(date_str)
+        except ValueError:
+            pass
+    raise ValueError(
+        f"Invalid {field_name} '{date_str}'. Must be in YYYY-MM-DD format."
+    )
 
 def validate_date(date_str: str, field_name: str) -> str:
-    try:
-        datetime.strptime(date_str, "%Y-%m-%d")  # just validates format
-        return date_str  # keep as string
-    except ValueError:
-        raise ValueError(
-            f"Invalid {field_name} '{date_str}'. Must be in YYYY-MM-DD format."
-        )
\ No newline at end of file
+    parse_date(date_str, field_name)  # just validates format
+    return date_str  # keep as string
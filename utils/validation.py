@@ -0,0 +1,235 @@
+"""
+One validation pass for search parameters, run before any upstream call.
+
+``build_search`` checks every argument exactly once (strict memoized date
+parsing, IATA codes against the built-in airport table, memoized enum
+lookups, passenger counts, dates not in the past and the return not before
+departure) and then builds ``FlightSearchParams``, whose own field validators
+only hit the memoized results. ``build_searches`` does the
+same for thousands of parameter sets column by column: each distinct
+airport, date and enum string is checked once for the whole batch and
+failures are reported per row instead of raising.
+"""
+import os
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from models.flight import CabinClassParam, FlightSearchParams, FlightTypeParam, StopsParam
+from utils.airports import is_known_airport
+from utils.validate_date import parse_date
+
+# "off" only checks that airport codes are three letters.
+IATA_VALIDATION: str = os.getenv("IATA_VALIDATION", "strict").lower()
+# Google Flights accepts at most nine travellers per search.
+MAX_PASSENGERS: int = 9
+
+# Defaults applied when a tool argument is None, matching the tool signatures.
+DEFAULTS: Dict[str, Any] = {
+    "return_date": None,
+    "adults": 1,
+    "children": 0,
+    "infants_in_seat": 0,
+    "infants_in_lap": 0,
+    "flight_type": "round_trip",
+    "cabin_class": "economy",
+    "no_stops": "any",
+    "bags": 0,
+    "max_price": None,
+    "search_location": "us",
+    "departure_token": None,
+    "booking_token": None,
+}
+
+@lru_cache(maxsize=4096)
+def airport(code: str, field_name: str) -> str:
+    """Uppercase an IATA airport or metro code, rejecting codes not in the built-in table."""
+    normalized: str = code.strip().upper() if isinstance(code, str) else ""
+    if len(normalized) != 3 or not normalized.isalpha() or not normalized.isascii():
+        raise ValueError(f"Invalid {field_name} '{code}'. Must be a 3-letter IATA code.")
+    if IATA_VALIDATION != "off" and not is_known_airport(normalized):
+        raise ValueError(
+            f"Unknown {field_name} '{code}'. Must be an IATA airport or metro area code "
+            f"(set IATA_EXTRA_CODES to allow airports missing from the built-in table)."
+        )
+    return normalized
+
+def earliest_departure() -> date:
+    """
+    First departure date still accepted.
+
+    Yesterday in UTC, so a date that is still today somewhere west of UTC
+    is not rejected.
+    """
+    return datetime.now(timezone.utc).date() - timedelta(days=1)
+
+@lru_cache(maxsize=4096)
+def trip_dates(
+    departure_date: str,
+    return_date: Optional[str],
+    earliest: date,
+    departure_field: str = "departure_date",
+    return_field: str = "return_date"
+) -> Tuple[date, Optional[date]]:
+    """Parse both dates and reject a departure before ``earliest`` or a return before departure."""
+    departure: date = parse_date(departure_date, departure_field)
+    if departure < earliest:
+        raise ValueError(f"Invalid {departure_field} '{departure_date}'. Must not be in the past.")
+    if return_date is None:
+        return departure, None
+    returning: date = parse_date(return_date, return_field)
+    if returning < departure:
+        raise ValueError(
+            f"Invalid {return_field} '{return_date}'. Must not be before {departure_field} '{departure_date}'."
+        )
+    return departure, returning
+
+@lru_cache(maxsize=256)
+def passengers(adults: int, children: int, infants_in_seat: int, infants_in_lap: int) -> None:
+    """Reject impossible passenger mixes before they reach upstream."""
+    if adults < 1:
+        raise ValueError(f"Invalid adults '{adults}'. Must be at least 1.")
+    for name, count in (("children", children), ("infants_in_seat", infants_in_seat), ("infants_in_lap", infants_in_lap)):
+        if count < 0:
+            raise ValueError(f"Invalid {name} '{count}'. Must not be negative.")
+    if infants_in_lap > adults:
+        raise ValueError(f"Invalid infants_in_lap '{infants_in_lap}'. Each lap infant needs an adult.")
+    if adults + children + infants_in_seat + infants_in_lap > MAX_PASSENGERS:
+        raise ValueError(f"Too many passengers. A search allows at most {MAX_PASSENGERS}.")
+
+def _fill(fields: Mapping[str, Any]) -> Dict[str, Any]:
+    return {**DEFAULTS, **{k: v for k, v in fields.items() if v is not None}}
+
+def _construct(
+    values: Dict[str, Any],
+    origin: str,
+    destination: str,
+    flight_type: FlightTypeParam,
+    cabin_class: CabinClassParam,
+    stops: StopsParam
+) -> FlightSearchParams:
+    if origin == destination:
+        raise ValueError(f"Invalid arrival_id '{destination}'. Must differ from departure_id.")
+    if flight_type == FlightTypeParam.MULTI_CITY:
+        # One search carries one origin and destination; multi-city trips are planned leg by leg.
+        raise ValueError("Invalid flight_type 'multi_city'. Use search_multi_city for multi-city trips.")
+    return FlightSearchParams(
+        departure_id=origin,
+        arrival_id=destination,
+        departure_date=values["departure_date"],
+        return_date=values["return_date"],
+        adults=int(values["adults"]),
+        children=int(values["children"]),
+        infants_in_seat=int(values["infants_in_seat"]),
+        infants_in_lap=int(values["infants_in_lap"]),
+        type=int(flight_type.value),
+        cabin_class=int(cabin_class.value),
+        stops=int(stops.value),
+        bags=int(values["bags"]),
+        max_price=values["max_price"],
+        search_location=values["search_location"],
+        departure_token=values["departure_token"],
+        booking_token=values["booking_token"],
+    )
+
+def build_search(earliest: Optional[date] = None, **fields: Any) -> FlightSearchParams:
+    """
+    Validate one set of search arguments and build its ``FlightSearchParams``.
+
+    Args:
+        earliest (Optional[date], optional): First departure date allowed. Defaults to ``earliest_departure()``.
+        **fields: The ``get_flights`` search arguments (``departure_id``, ``arrival_id``, ``departure_date``,
+            ``flight_type``, ``cabin_class``, ``no_stops``, passenger counts, ...). None means the default.
+
+    Returns:
+        FlightSearchParams: The validated parameters.
+    """
+    values: Dict[str, Any] = _fill(fields)
+    trip_dates(values["departure_date"], values["return_date"], earliest or earliest_departure())
+    passengers(values["adults"], values["children"], values["infants_in_seat"], values["infants_in_lap"])
+    return _construct(
+        values,
+        airport(values["departure_id"], "departure_id"),
+        airport(values["arrival_id"], "arrival_id"),
+        FlightTypeParam.from_str(values["flight_type"]),
+        CabinClassParam.from_str(values["cabin_class"]),
+        StopsParam.from_str(values["no_stops"]),
+    )
+
+def _column(rows: Sequence[Dict[str, Any]], key: str, check: Callable[[Any], Any]) -> Tuple[List[Any], Dict[int, str]]:
+    """Run ``check`` once per distinct value of a column; returns per-row results and per-row errors."""
+    outcomes: Dict[Any, Tuple[Any, Optional[str]]] = {}
+    results: List[Any] = []
+    errors: Dict[int, str] = {}
+    for i, row in enumerate(rows):
+        value: Any = row[key]
+        outcome: Optional[Tuple[Any, Optional[str]]] = outcomes.get(value)
+        if outcome is None:
+            try:
+                outcome = (check(value), None)
+            except ValueError as e:
+                outcome = (None, str(e))
+            outcomes[value] = outcome
+        results.append(outcome[0])
+        if outcome[1] is not None:
+            errors[i] = outcome[1]
+    return results, errors
+
+def build_searches(
+    searches: Sequence[Mapping[str, Any]],
+    earliest: Optional[date] = None
+) -> Tuple[List[Optional[FlightSearchParams]], Dict[int, str]]:
+    """
+    Validate many search argument sets in one pass.
+
+    Every distinct value of a column (airport, date pair, enum string,
+    passenger mix) is checked once for the whole batch, so a 5,000-cell grid
+    over a few routes and dates costs a few dozen checks plus one cheap
+    model construction per valid row.
+
+    Args:
+        searches (Sequence[Mapping[str, Any]]): Argument sets as accepted by ``build_search``.
+        earliest (Optional[date], optional): First departure date allowed. Defaults to ``earliest_departure()``.
+
+    Returns:
+        Tuple[List[Optional[FlightSearchParams]], Dict[int, str]]: Parameters per input row (None where invalid)
+            and the first error message for each invalid row, by row index.
+    """
+    earliest = earliest or earliest_departure()
+    rows: List[Dict[str, Any]] = [_fill(fields) for fields in searches]
+    for row in rows:
+        row["_dates"] = (row["departure_date"], row["return_date"])
+        row["_passengers"] = (row["adults"], row["children"], row["infants_in_seat"], row["infants_in_lap"])
+
+    columns: Dict[str, List[Any]] = {}
+    errors: Dict[int, str] = {}
+    for key, check in (
+        ("departure_id", lambda v: airport(v, "departure_id")),
+        ("arrival_id", lambda v: airport(v, "arrival_id")),
+        ("_dates", lambda v: trip_dates(v[0], v[1], earliest)),
+        ("_passengers", lambda v: passengers(*v)),
+        ("flight_type", FlightTypeParam.from_str),
+        ("cabin_class", CabinClassParam.from_str),
+        ("no_stops", StopsParam.from_str),
+    ):
+        columns[key], column_errors = _column(rows, key, check)
+        for i, message in column_errors.items():
+            errors.setdefault(i, message)
+
+    params: List[Optional[FlightSearchParams]] = []
+    for i, row in enumerate(rows):
+        if i in errors:
+            params.append(None)
+            continue
+        try:
+            params.append(_construct(
+                row,
+                columns["departure_id"][i],
+                columns["arrival_id"][i],
+                columns["flight_type"][i],
+                columns["cabin_class"][i],
+                columns["no_stops"][i],
+            ))
+        except ValueError as e:
+            errors[i] = str(e)
+            params.append(None)
+    return params, errors